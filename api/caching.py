@@ -1,3 +1,9 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import re
+import time
 import typing
 import orjson
 import hashlib
@@ -5,10 +11,46 @@ from redis import asyncio as async_pyredis
 
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi.encoders import jsonable_encoder
-from fastapi_cache import Coder
+from fastapi_cache import Coder, FastAPICache
+from fastapi_cache.backends import Backend
+from fastapi_cache.backends.redis import RedisBackend
 
 from helpers.fastapi.config import settings
+from helpers.generics.utils.caching import ThreadSafeLRUCache
+
+
+logger = logging.getLogger(__name__)
+
+
+_request_cache_tags: contextvars.ContextVar[typing.Set[str]] = contextvars.ContextVar(
+    "_request_cache_tags"
+)
+
+_request_cache_misses: contextvars.ContextVar[
+    typing.List[typing.Callable[[], None]]
+] = contextvars.ContextVar("_request_cache_misses")
+"""Releases of the coalesced cache misses registered while handling the current request"""
+
+UID_PATTERN = re.compile(rb'"uid":\s*"(petriz_\w+)"')
+"""Pattern matching the UIDs of the resources in a (JSON) response body"""
+
+
+def get_cache_tags(value: bytes) -> typing.Set[str]:
+    """
+    Get the tags of a cache entry.
+
+    An entry is tagged with the UIDs of all the resources in it, and the
+    UIDs in the path of the request it was cached for, so that it can be
+    invalidated when any of those resources change.
+
+    :param value: The encoded cache entry
+    :return: The tags of the entry
+    """
+    tags = {uid.decode() for uid in UID_PATTERN.findall(value)}
+    tags.update(_request_cache_tags.get(set()))
+    return tags
 
 
 def _safe_serialize(obj: typing.Any) -> str:
@@ -49,8 +91,29 @@ def request_key_builder_factory(
     :param use_args: Whether to include positional arguments in cache key
     :param use_kwargs: List of keyword arguments to include in cache key
     :returns: Function that builds a cache key based on request parameters
+
+    Options are resolved when the key builder is created, and the hash state
+    for each route is computed on the route's first call. Per request, only
+    the (normalized) path, query parameters and relevant headers are hashed,
+    using a short blake2b digest.
     """
 
+    header_names = frozenset(
+        header.lower().encode("latin-1") for header in (use_headers or [])
+    )
+    kwarg_names = frozenset(use_kwargs or [])
+    # Hash state seeded with each route's identity, resolved once per route
+    route_hashers: typing.Dict[typing.Callable[..., typing.Any], typing.Any] = {}
+
+    def get_route_hasher(func: typing.Callable[..., typing.Any]) -> typing.Any:
+        hasher = route_hashers.get(func)
+        if hasher is None:
+            hasher = hashlib.blake2b(
+                f"{func.__module__}:{func.__qualname__}".encode(), digest_size=16
+            )
+            route_hashers[func] = hasher
+        return hasher
+
     async def key_builder(
         func: typing.Callable[..., typing.Any],
         namespace: str = default_namespace,
@@ -61,36 +124,50 @@ def request_key_builder_factory(
         kwargs: typing.Dict[typing.Any, typing.Any],
     ) -> str:
         """Builds a cache key based on request parameters in a deterministic way."""
-        nonlocal use_headers, use_path, use_query, use_args, use_kwargs
-
-        key_parts = [func.__module__, func.__name__]
+        hasher = get_route_hasher(func).copy()
 
         if request:
+            scope = request.scope
+            path_params = scope.get("path_params")
+            if path_params:
+                _request_cache_tags.set(
+                    {
+                        value
+                        for value in path_params.values()
+                        if isinstance(value, str) and value.startswith("petriz_")
+                    }
+                )
             if use_path:
-                key_parts.append(request.url.path)
+                hasher.update(b"\x00p")
+                hasher.update(scope["path"].encode())
 
-            if use_query and request.query_params:
-                query_items = sorted(request.query_params.items())
-                key_parts.append(repr(query_items))
+            if use_query and scope.get("query_string"):
+                hasher.update(b"\x00q")
+                for name, value in sorted(request.query_params.multi_items()):
+                    hasher.update(f"{name}\x1f{value}\x1e".encode())
 
-            if use_headers and request.headers:
-                relevant_headers = {
-                    k: v for k, v in request.headers.items() if k.lower() in use_headers
-                }
+            if header_names:
+                relevant_headers = sorted(
+                    (name, value)
+                    for name, value in scope["headers"]
+                    if name in header_names
+                )
                 if relevant_headers:
-                    key_parts.append(repr(sorted(relevant_headers.items())))
+                    hasher.update(b"\x00h")
+                    for name, value in relevant_headers:
+                        hasher.update(name + b"\x1f" + value + b"\x1e")
 
         if use_args and args:
-            key_parts.append(_safe_serialize(args))
+            hasher.update(b"\x00a")
+            hasher.update(_safe_serialize(args).encode())
 
-        if use_kwargs and kwargs:
-            clean_kwargs = {k: v for k, v in kwargs.items() if k in use_kwargs}
+        if kwarg_names and kwargs:
+            clean_kwargs = {k: v for k, v in kwargs.items() if k in kwarg_names}
             if clean_kwargs:
-                key_parts.append(_safe_serialize(clean_kwargs))
+                hasher.update(b"\x00k")
+                hasher.update(_safe_serialize(clean_kwargs).encode())
 
-        cache_key = ":".join(str(part) for part in key_parts)
-        key_hash = hashlib.md5(cache_key.encode()).hexdigest()
-        return f"{namespace}:{key_hash}"
+        return f"{namespace}:{hasher.hexdigest()}"
 
     return key_builder
 
@@ -123,3 +200,336 @@ class ORJsonCoder(Coder):
 
 
 redis = async_pyredis.from_url(settings.REDIS_URL, decode_responses=False)
+
+
+class _LocalEntry(typing.NamedTuple):
+    expires_at: float
+    value: bytes
+
+
+class TwoTierBackend(Backend):
+    """
+    Cache backend with a bounded in-process (L1) cache in front of Redis (L2).
+
+    L1 entries live for at most `local_ttl` seconds, and never outlive
+    their Redis counterparts. Cache clears are published over Redis pub/sub,
+    so that every worker drops the affected L1 entries.
+
+    Expired entries are kept in Redis for a further `stale_ttl` seconds.
+    During that window, only one caller (across all workers), holding a
+    Redis `SET NX` refresh lock, gets a miss and recomputes the entry,
+    while every other caller is served the stale entry. Concurrent misses
+    for the same key within a worker are coalesced, such that only the
+    first caller recomputes the entry and the others await its result.
+    """
+
+    def __init__(
+        self,
+        redis: async_pyredis.Redis,
+        *,
+        maxsize: int,
+        local_ttl: int = 60,
+        channel: str = "petriz-cache-invalidation",
+        tags_prefix: str = "petriz-cache-tags",
+        stale_ttl: int = 0,
+        refresh_lock_timeout: int = 30,
+        coalesce_timeout: float = 10.0,
+    ) -> None:
+        """
+        Create a new two-tier cache backend.
+
+        :param redis: The Redis client to use as the L2 cache and pub/sub broker
+        :param maxsize: The maximum total size (in bytes) of the values in the L1 cache
+        :param local_ttl: The maximum time in seconds a value is kept in the L1 cache
+        :param channel: The Redis pub/sub channel to publish invalidations on
+        :param tags_prefix: Prefix of the Redis sets holding the keys of tagged entries
+        :param stale_ttl: How long in seconds expired entries may still be served
+            while they are being refreshed. Stale entries are not served if zero.
+        :param refresh_lock_timeout: How long in seconds a stale entry's refresh lock is held,
+            if the entry is not refreshed
+        :param coalesce_timeout: How long in seconds concurrent misses for a key
+            wait for the first miss to be recomputed, before recomputing it themselves
+        """
+        self.redis = redis
+        self.remote = RedisBackend(redis)
+        self.local = ThreadSafeLRUCache(maxsize, lambda entry: len(entry.value))
+        self.local_maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.channel = channel
+        self.tags_prefix = tags_prefix
+        self.stale_ttl = max(stale_ttl, 0)
+        self.refresh_lock_timeout = refresh_lock_timeout
+        self.coalesce_timeout = coalesce_timeout
+        self._listener: typing.Optional[asyncio.Task] = None
+        self._inflight: typing.Dict[str, asyncio.Future] = {}
+
+    def _get_refresh_lock_key(self, key: str) -> str:
+        return f"{key}:refresh-lock"
+
+    def _resolve_inflight(
+        self,
+        key: str,
+        result: typing.Tuple[int, typing.Optional[bytes]],
+        future: typing.Optional[asyncio.Future] = None,
+    ) -> None:
+        inflight = self._inflight.get(key)
+        if inflight is None or (future is not None and inflight is not future):
+            return
+        del self._inflight[key]
+        if not inflight.done():
+            inflight.set_result(result)
+
+    async def _coalesce_miss(
+        self, key: str
+    ) -> typing.Tuple[int, typing.Optional[bytes]]:
+        """
+        Wait for the result of an in-flight miss for the key, if any.
+        Otherwise, register the caller's miss as in-flight, and return a miss.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(inflight), self.coalesce_timeout
+                )
+            except asyncio.TimeoutError:
+                return 0, None
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        release = functools.partial(self._resolve_inflight, key, (0, None), future)
+        # If the first caller does not set the entry (e.g. it failed), release
+        # waiting callers when its request finishes (see `CacheMissReleaseMiddleware`),
+        # or after the coalesce timeout, outside requests.
+        request_misses = _request_cache_misses.get(None)
+        if request_misses is not None:
+            request_misses.append(release)
+        loop.call_later(self.coalesce_timeout, release)
+        return 0, None
+
+    def _get_local(self, key: str) -> typing.Optional[_LocalEntry]:
+        try:
+            entry = self.local[key]
+        except KeyError:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._delete_local(key)
+            return None
+        return entry
+
+    def _delete_local(self, key: str) -> bool:
+        try:
+            del self.local[key]
+        except KeyError:
+            return False
+        return True
+
+    def _set_local(self, key: str, value: bytes, ttl: typing.Optional[int]) -> None:
+        if ttl is None or ttl < 0:
+            ttl = self.local_ttl
+        else:
+            ttl = min(ttl, self.local_ttl)
+        if ttl <= 0 or len(value) > self.local_maxsize:
+            return
+        self.local[key] = _LocalEntry(time.monotonic() + ttl, value)
+
+    def _clear_local(
+        self, namespace: typing.Optional[str] = None, key: typing.Optional[str] = None
+    ) -> int:
+        if key:
+            return int(self._delete_local(key))
+        if not namespace:
+            return 0
+        prefix = f"{namespace}:"
+        count = 0
+        for cache_key in list(self.local):
+            if cache_key.startswith(prefix) and self._delete_local(cache_key):
+                count += 1
+        return count
+
+    async def get_with_ttl(self, key: str) -> typing.Tuple[int, typing.Optional[bytes]]:
+        entry = self._get_local(key)
+        if entry is not None:
+            return max(int(entry.expires_at - time.monotonic()), 0), entry.value
+
+        ttl, value = await self.remote.get_with_ttl(key)
+        if value is None:
+            return await self._coalesce_miss(key)
+
+        if self.stale_ttl and ttl >= 0:
+            ttl -= self.stale_ttl
+            if ttl <= 0:
+                refresh = await self.redis.set(
+                    self._get_refresh_lock_key(key),
+                    b"1",
+                    nx=True,
+                    ex=self.refresh_lock_timeout,
+                )
+                if refresh:
+                    return 0, None
+                return 0, value
+
+        self._set_local(key, value, ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> typing.Optional[bytes]:
+        entry = self._get_local(key)
+        if entry is not None:
+            return entry.value
+        return await self.remote.get(key)
+
+    async def set(
+        self, key: str, value: bytes, expire: typing.Optional[int] = None
+    ) -> None:
+        tags = get_cache_tags(value)
+        remote_expire = expire + self.stale_ttl if expire else expire
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=remote_expire)
+            if self.stale_ttl:
+                pipe.delete(self._get_refresh_lock_key(key))
+            for tag in tags:
+                tag_key = f"{self.tags_prefix}:{tag}"
+                pipe.sadd(tag_key, key)
+                if remote_expire:
+                    # Tag sets are shared by entries with different TTLs. Only ever
+                    # extend their TTL, so they outlive all the entries in them.
+                    pipe.expire(tag_key, remote_expire, nx=True)
+                    pipe.expire(tag_key, remote_expire, gt=True)
+            await pipe.execute()
+        self._set_local(key, value, expire)
+        self._resolve_inflight(key, (expire or 0, value))
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Delete all cache entries with any of the given tags.
+
+        :param tags: The tags, that is, resource UIDs, to invalidate
+        :return: The number of entries deleted
+        """
+        tag_keys = [f"{self.tags_prefix}:{tag}" for tag in set(tags) if tag]
+        if not tag_keys:
+            return 0
+
+        keys = await self.redis.sunion(tag_keys)
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+        count = 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if keys:
+                pipe.delete(*keys)
+            pipe.delete(*tag_keys)
+            for key in keys:
+                self._clear_local(key=key)
+                pipe.publish(self.channel, orjson.dumps({"key": key}))
+            results = await pipe.execute()
+            if keys:
+                count = results[0]
+        return count
+
+    async def clear(
+        self, namespace: typing.Optional[str] = None, key: typing.Optional[str] = None
+    ) -> int:
+        self._clear_local(namespace, key)
+        count = await self.remote.clear(namespace, key)
+        await self.redis.publish(
+            self.channel, orjson.dumps({"namespace": namespace, "key": key})
+        )
+        return count
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            invalidation = orjson.loads(message["data"])
+                        except orjson.JSONDecodeError:
+                            continue
+                        self._clear_local(
+                            invalidation.get("namespace"), invalidation.get("key")
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Entries cached while disconnected may have missed invalidations
+                self.local.clear()
+                logger.error(
+                    f"Cache invalidation listener failed: {exc}. Reconnecting..."
+                )
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """Start listening for cache invalidations published by other workers."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening for cache invalidations."""
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+        self.local.clear()
+
+
+class CacheMissReleaseMiddleware:
+    """
+    Releases the cache misses a request registered as in-flight, once the request
+    finishes. Callers waiting on a miss the request did not set (because computing
+    the response failed, or the response was not cacheable) then recompute it
+    right away, instead of waiting for the coalesce timeout.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        releases: typing.List[typing.Callable[[], None]] = []
+        token = _request_cache_misses.set(releases)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_cache_misses.reset(token)
+            # Misses that were set are no longer in-flight, so releasing them is a no-op
+            for release in releases:
+                release()
+
+
+async def invalidate_cache(
+    *tags: str, namespaces: typing.Iterable[str] = ()
+) -> None:
+    """
+    Invalidate cached responses by tags and/or namespaces.
+
+    If the cache backend does not support tags, all cached responses
+    are cleared when tags are given, so none are served stale.
+
+    :param tags: Tags (resource UIDs) of the cached responses to invalidate
+    :param namespaces: Namespaces to invalidate all cached responses in
+    """
+    backend = FastAPICache.get_backend()
+    tags = tuple(tag for tag in tags if tag)
+    if tags:
+        if isinstance(backend, TwoTierBackend):
+            await backend.invalidate_tags(*tags)
+        else:
+            # Without tag indexes, the affected responses cannot be found,
+            # and may be in any namespace, so all cached responses are cleared
+            logger.warning(
+                "Cache backend does not support tags. Clearing all cached responses."
+            )
+            await FastAPICache.clear()
+            return
+    for namespace in namespaces:
+        await FastAPICache.clear(namespace=namespace)
@@ -0,0 +1,241 @@
+import asyncio
+import collections
+import logging
+import typing
+import asyncpg
+import orjson
+from sqlalchemy.engine import make_url
+
+from helpers.fastapi.config import settings
+from api.caching import redis
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent(typing.NamedTuple):
+    """A row change notified by a database trigger."""
+
+    table: str
+    """Name of the table the row belongs to"""
+    operation: str
+    """The change made to the row. One of "INSERT", "UPDATE" or "DELETE" """
+    uid: typing.Optional[str]
+    """UID of the row"""
+    txid: typing.Optional[int] = None
+    """ID of the transaction that made the change"""
+
+
+ChangeHandler = typing.Callable[
+    [typing.List[ChangeEvent]], typing.Awaitable[typing.Any]
+]
+"""Handles a batch of change events, on tables it was registered for"""
+
+
+def get_listener_dsn() -> str:
+    """Return a DSN asyncpg can connect to, from the async SQLAlchemy engine URL."""
+    url = make_url(settings.SQLALCHEMY["async_engine"]["url"])
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class ChangeFeedListener:
+    """
+    Listens for row change notifications (Postgres `LISTEN/NOTIFY`) on a channel,
+    and dispatches them to the handlers registered for the changed tables.
+
+    Notifications are batched for `debounce` seconds before being dispatched,
+    so that bulk changes result in a few handler calls, not one per row.
+    Each handler gets the (de-duplicated) events on the tables it was registered for.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        *,
+        debounce: float = 1.0,
+        reconnect_interval: float = 5.0,
+    ) -> None:
+        """
+        Create a new change feed listener.
+
+        :param channel: The notification channel to listen on
+        :param debounce: Number of seconds to batch notifications for before dispatching them
+        :param reconnect_interval: Number of seconds to wait before reconnecting
+            after the listening connection is lost
+        """
+        self.channel = channel
+        self.debounce = debounce
+        self.reconnect_interval = reconnect_interval
+        self._handlers: typing.DefaultDict[str, typing.List[ChangeHandler]] = (
+            collections.defaultdict(list)
+        )
+        self._pending: typing.Dict[ChangeEvent, None] = {}
+        self._dispatch_handle: typing.Optional[asyncio.TimerHandle] = None
+        self._dispatches: typing.Set[asyncio.Task] = set()
+        self._task: typing.Optional[asyncio.Task] = None
+
+    def register(
+        self, *tables: str
+    ) -> typing.Callable[[ChangeHandler], ChangeHandler]:
+        """
+        Register a handler for changes on the given tables.
+
+        Usage:
+        ```python
+        @change_feed.register("search__terms")
+        async def on_terms_changed(events: List[ChangeEvent]) -> None:
+            ...
+        ```
+        """
+
+        def decorator(handler: ChangeHandler) -> ChangeHandler:
+            for table in tables:
+                self._handlers[table].append(handler)
+            return handler
+
+        return decorator
+
+    def _on_notification(
+        self,
+        connection: asyncpg.Connection,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        try:
+            data = orjson.loads(payload)
+            # A notification is sent per changed row (`uid`),
+            # or per statement, for a chunk of the changed rows (`uids`)
+            uids = data["uids"] if "uids" in data else [data.get("uid")]
+            events = [
+                ChangeEvent(data["table"], data["operation"], uid, data.get("txid"))
+                for uid in uids
+            ]
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning(f"Ignoring malformed change notification: {payload!r}")
+            return
+
+        for event in events:
+            self._pending[event] = None
+        if self._dispatch_handle is None:
+            self._dispatch_handle = asyncio.get_running_loop().call_later(
+                self.debounce, self._schedule_dispatch
+            )
+
+    def _schedule_dispatch(self) -> None:
+        self._dispatch_handle = None
+        task = asyncio.create_task(self.dispatch())
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def dispatch(self) -> None:
+        """Dispatch all pending change events to their handlers."""
+        events, self._pending = list(self._pending), {}
+        if not events:
+            return
+
+        events_by_handler: typing.Dict[ChangeHandler, typing.List[ChangeEvent]] = {}
+        for event in events:
+            for handler in self._handlers.get(event.table, ()):
+                events_by_handler.setdefault(handler, []).append(event)
+
+        for handler, handler_events in events_by_handler.items():
+            try:
+                await handler(handler_events)
+            except Exception as exc:
+                logger.error(
+                    f"Change handler {handler.__qualname__} failed "
+                    f"on {len(handler_events)} events: {exc}"
+                )
+
+    async def _listen(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(get_listener_dsn())
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._on_notification)
+                logger.info(f"Listening for changes on {self.channel!r}")
+                await closed.wait()
+                raise ConnectionError("Connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Changes made while disconnected are missed. Handlers
+                # relying on them must also expire what they hold (TTLs).
+                logger.error(
+                    f"Change feed listener failed: {exc}. "
+                    f"Reconnecting in {self.reconnect_interval} seconds..."
+                )
+                await asyncio.sleep(self.reconnect_interval)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+    def start(self) -> None:
+        """Start listening for change notifications."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening for change notifications, and dispatch pending events."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+        await self.dispatch()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+
+async def claim_change_events(
+    events: typing.Iterable[ChangeEvent], *, name: str, ttl: int = 300
+) -> typing.List[ChangeEvent]:
+    """
+    Claim change events for work that only one worker should do, e.g. invalidating
+    what is shared by all workers (Redis), as every worker receives every event.
+
+    :param events: The change events to claim
+    :param name: Name of the work the events are claimed for
+    :param ttl: Number of seconds for which claims are kept
+    :return: The events claimed by the caller, that is, not already claimed by another worker
+    """
+    events = list(events)
+    if not events:
+        return []
+    async with redis.pipeline(transaction=False) as pipe:
+        for event in events:
+            pipe.set(
+                f"petriz-change-claims:{name}:{event.table}:{event.operation}:"
+                f"{event.uid}:{event.txid}",
+                b"1",
+                nx=True,
+                ex=ttl,
+            )
+        claimed = await pipe.execute()
+    return [event for event, is_claimed in zip(events, claimed) if is_claimed]
+
+
+GLOSSARY_CHANGES_CHANNEL = "petriz_glossary_changes"
+"""Channel notified of changes to glossary terms, topics and sources"""
+
+change_feed = ChangeFeedListener(
+    GLOSSARY_CHANGES_CHANNEL, debounce=settings.CHANGE_FEED_DEBOUNCE
+)
+
+
+__all__ = [
+    "ChangeEvent",
+    "ChangeHandler",
+    "ChangeFeedListener",
+    "claim_change_events",
+    "GLOSSARY_CHANGES_CHANNEL",
+    "change_feed",
+]
@@ -0,0 +1,213 @@
+import base64
+import binascii
+import typing
+import fastapi
+import orjson
+import pydantic
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from starlette.requests import Request
+
+from helpers.fastapi.config import settings
+
+
+T = typing.TypeVar("T")
+
+
+def encode_cursor(values: typing.Sequence[typing.Any]) -> str:
+    """
+    Encode a sequence of (JSON serializable) values into an opaque pagination cursor.
+
+    :param values: The values identifying the position of the last item in a page
+    :return: A URL-safe cursor string
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(list(values))).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> typing.List[typing.Any]:
+    """
+    Decode an opaque pagination cursor back into its values.
+
+    :param cursor: The cursor string, as returned by `encode_cursor`
+    :return: The list of values encoded in the cursor
+    :raises ValueError: If the cursor is malformed
+    """
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, orjson.JSONDecodeError, UnicodeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("Malformed cursor")
+    return values
+
+
+class CursorPaginatedResponse(pydantic.BaseModel, typing.Generic[T]):
+    """Cursor (keyset) paginated response schema."""
+
+    limit: int = pydantic.Field(description="Maximum number of results in the page")
+    next_cursor: typing.Optional[str] = pydantic.Field(
+        None,
+        description="Cursor to pass to retrieve the next page. Null on the last page",
+    )
+    next: typing.Optional[str] = pydantic.Field(
+        None, description="URL of the next page. Null on the last page"
+    )
+    results: typing.List[T] = pydantic.Field(
+        default_factory=list, description="Page results"
+    )
+
+
+def cursor_paginated_data(
+    request: Request,
+    data: typing.Sequence[typing.Any],
+    limit: int,
+    next_cursor: typing.Optional[str] = None,
+    cursor_param: str = "cursor",
+) -> typing.Dict[str, typing.Any]:
+    """
+    Cursor (keyset) pagination counterpart of `paginated_data`.
+
+    :param request: The current request
+    :param data: The page results
+    :param limit: The page size
+    :param next_cursor: The cursor pointing past the last result, if there are more results
+    :param cursor_param: Name of the query parameter the cursor is passed in
+    :return: A mapping matching `CursorPaginatedResponse`
+    """
+    next_url = None
+    if next_cursor:
+        next_url = str(
+            request.url.include_query_params(**{cursor_param: next_cursor})
+        )
+    return {
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "next": next_url,
+        "results": list(data),
+    }
+
+
+CountMode: typing.TypeAlias = typing.Literal["estimate", "exact", "none"]
+
+ResultCountMode: typing.TypeAlias = typing.Annotated[
+    CountMode,
+    fastapi.Query(
+        alias="count",
+        description=(
+            "How to count the total number of results. "
+            "'estimate' uses the database planner's estimate, 'exact' counts results "
+            "up to a cap, and 'none' does not count them"
+        ),
+    ),
+]
+"""Annotated type for the `count` query parameter of paginated endpoints"""
+
+
+class ResultCount(typing.NamedTuple):
+    """Total number of results of a paginated query."""
+
+    value: int
+    type: typing.Literal["exact", "estimate", "at_least"]
+    """
+    How the count was obtained. "at_least" means there are more results
+    than the count cap, and the value is a lower bound
+    """
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: sa.Select) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kwargs) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+async def estimate_row_count(session: AsyncSession, query: sa.Select) -> int:
+    """
+    Return the planner's estimate of the number of rows the query returns.
+
+    The query is planned, but not executed. Estimates are as good as the
+    table statistics, and can be far off for selective filters.
+    """
+    result = await session.execute(_Explain(query))
+    plan = result.scalar_one()
+    if isinstance(plan, (str, bytes)):
+        plan = orjson.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def capped_row_count(session: AsyncSession, query: sa.Select, cap: int) -> int:
+    """
+    Count the rows the query returns, counting no more than `cap + 1` rows.
+
+    :return: The row count, which is greater than `cap` if the count was capped
+    """
+    result = await session.execute(
+        sa.select(sa.func.count()).select_from(query.limit(cap + 1).subquery())
+    )
+    return result.scalar_one()
+
+
+async def count_results(
+    session: AsyncSession,
+    query: sa.Select,
+    mode: CountMode,
+    *,
+    page_size: int,
+    limit: int,
+    offset: typing.Optional[int] = 0,
+    cap: typing.Optional[int] = None,
+) -> typing.Optional[ResultCount]:
+    """
+    Count the total number of results of a paginated query, without a full `COUNT(*)`.
+
+    If the page is not full, the count is known from the page itself, so
+    no query is made. Otherwise, it is estimated by the planner ("estimate"),
+    or counted up to `cap` results ("exact").
+
+    :param session: The database session
+    :param query: The query selecting all results, without ordering, limit or offset
+    :param mode: How to count the results. No count is returned for "none"
+    :param page_size: The number of results in the current page
+    :param limit: The page size limit
+    :param offset: The offset of the current page. None if unknown,
+        e.g. for cursor paginated pages other than the first
+    :param cap: The maximum number of results to count exactly.
+        Defaults to `settings.PAGINATION_COUNT_CAP`
+    """
+    if mode == "none":
+        return None
+    if offset is not None and page_size < limit and (page_size or not offset):
+        return ResultCount(offset + page_size, "exact")
+
+    seen = (offset or 0) + page_size
+    if mode == "estimate":
+        estimate = await estimate_row_count(session, query)
+        return ResultCount(max(estimate, seen), "estimate")
+
+    cap = settings.PAGINATION_COUNT_CAP if cap is None else cap
+    count = await capped_row_count(session, query, cap)
+    if count > cap:
+        return ResultCount(max(count, seen), "at_least")
+    return ResultCount(count, "exact")
+
+
+def add_result_count(
+    data: typing.Dict[str, typing.Any], count: typing.Optional[ResultCount]
+) -> typing.Dict[str, typing.Any]:
+    """
+    Add the total result count to paginated response data, if it was counted.
+
+    :return: The response data
+    """
+    if count is not None:
+        data["total_count"] = count.value
+        data["total_count_type"] = count.type
+    return data
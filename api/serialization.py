@@ -0,0 +1,104 @@
+import datetime
+import typing
+import orjson
+import pydantic
+
+
+FieldMapper = typing.Callable[[typing.Any], typing.Any]
+"""Maps a row value to its JSON serializable output value"""
+
+_datetime_adapter = pydantic.TypeAdapter(datetime.datetime)
+
+
+def isoformat(
+    value: typing.Union[datetime.datetime, str, None],
+) -> typing.Optional[str]:
+    """
+    Map a datetime to its ISO 8601 string, formatted the way pydantic schemas
+    format datetimes (e.g. "Z" for UTC). Datetimes already rendered as strings,
+    e.g. by Postgres in JSON aggregates, are reformatted the same way.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # Rendered in the database session's time zone, while
+        # datetimes are loaded (by asyncpg) in UTC
+        value = _datetime_adapter.validate_python(value).astimezone(
+            datetime.timezone.utc
+        )
+    return _datetime_adapter.dump_python(value, mode="json")
+
+
+def nullable(mapper: FieldMapper) -> FieldMapper:
+    """Wrap a mapper, so that None values are output as is."""
+
+    def map_nullable(value: typing.Any) -> typing.Any:
+        return None if value is None else mapper(value)
+
+    return map_nullable
+
+
+class RowSerializer:
+    """
+    Serializes database rows (mappings) into JSON ready dictionaries,
+    with field mappers compiled once, when the serializer is created.
+
+    Unlike validating rows into pydantic schemas before encoding them,
+    rows are not validated. So it should only be used for list endpoints
+    whose rows are selected, already in the expected shape, from the database.
+
+    Usage:
+    ```python
+    term_serializer = RowSerializer(
+        {"uid": None, "name": None, "created_at": isoformat},
+        sources={"name": "term_name"},
+    )
+    data = term_serializer.many(result.mappings().all())
+    ```
+    """
+
+    def __init__(
+        self,
+        fields: typing.Mapping[str, typing.Optional[FieldMapper]],
+        *,
+        sources: typing.Optional[typing.Mapping[str, str]] = None,
+    ) -> None:
+        """
+        Create a new row serializer.
+
+        :param fields: Mapping of output fields, in order, to the mappers of their
+            row values. Values of fields without a mapper are output as is.
+        :param sources: Mapping of output fields to the row keys they are read from,
+            for fields whose row key differs from the output field name.
+        """
+        sources = sources or {}
+        unknown = set(sources) - set(fields)
+        if unknown:
+            raise ValueError(f"Sources given for unknown fields: {sorted(unknown)}")
+
+        self._fields = tuple(
+            (field, sources.get(field, field), mapper)
+            for field, mapper in fields.items()
+        )
+
+    def __call__(
+        self, row: typing.Mapping[str, typing.Any]
+    ) -> typing.Dict[str, typing.Any]:
+        """Serialize a row."""
+        return {
+            field: row[key] if mapper is None else mapper(row[key])
+            for field, key, mapper in self._fields
+        }
+
+    def many(
+        self, rows: typing.Iterable[typing.Mapping[str, typing.Any]]
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Serialize rows."""
+        return [self(row) for row in rows]
+
+    def dumps(self, rows: typing.Iterable[typing.Mapping[str, typing.Any]]) -> bytes:
+        """Serialize rows, and encode them as a JSON array."""
+        return orjson.dumps(self.many(rows))
+
+
+__all__ = ["FieldMapper", "isoformat", "nullable", "RowSerializer"]
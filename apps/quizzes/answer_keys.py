@@ -0,0 +1,127 @@
+import typing
+import orjson
+from fastapi_cache import FastAPICache
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from helpers.fastapi.config import settings
+from . import crud
+
+
+class AnswerKey(typing.NamedTuple):
+    """What is needed to check an answer to a question in a quiz version."""
+
+    id: int
+    """ID of the question (version)"""
+    correct_option_index: int
+    """Index of the question's correct option"""
+    options_count: int
+    """Number of options the question has"""
+
+
+AnswerKeys: typing.TypeAlias = typing.Dict[str, AnswerKey]
+"""Mapping of question UIDs to their answer keys"""
+
+
+class AnswerKeyCache:
+    """
+    Cache of the answer keys of quiz versions, so answers are graded
+    with a dictionary lookup instead of a query per answer.
+
+    Answer keys are stored in the application's cache backend, that is,
+    in process memory with Redis backing. Entries of the affected quiz
+    versions are deleted (on every worker) when questions are added to or
+    removed from a quiz, or changed in place (see `invalidate`).
+    """
+
+    namespace = "quiz_answer_keys"
+
+    def __init__(self, *, ttl: int = 3600) -> None:
+        """
+        Create a new answer key cache.
+
+        :param ttl: Number of seconds after which cached answer keys expire
+        """
+        self.ttl = ttl
+
+    def get_key(self, quiz_uid: str, quiz_id: int) -> str:
+        return f"{FastAPICache.get_prefix()}:{self.namespace}:{quiz_uid}:{quiz_id}"
+
+    async def __call__(
+        self, session: AsyncSession, quiz_uid: str, quiz_id: int
+    ) -> AnswerKeys:
+        """
+        Return the answer keys of the questions in a quiz version,
+        loading them on the first attempt to answer the quiz version.
+
+        :param session: The database session, used on cache misses
+        :param quiz_uid: The UID of the quiz
+        :param quiz_id: The ID of the quiz version
+        :return: A mapping of the UIDs of the (undeleted) questions
+            in the quiz version, to their answer keys.
+        """
+        backend = FastAPICache.get_backend()
+        key = self.get_key(quiz_uid, quiz_id)
+        _, value = await backend.get_with_ttl(key)
+        if value is not None:
+            data = orjson.loads(value)
+            return {
+                question["uid"]: AnswerKey(
+                    question["id"],
+                    question["correct_option_index"],
+                    question["options_count"],
+                )
+                for question in data["questions"]
+            }
+
+        rows = await crud.retrieve_question_answer_keys(session, quiz_id=quiz_id)
+        answer_keys = {
+            uid: AnswerKey(row.id, row.correct_option_index, row.options_count)
+            for uid, row in rows.items()
+        }
+        value = orjson.dumps(
+            {
+                "uid": quiz_uid,
+                "questions": [
+                    {"uid": uid, **answer_key._asdict()}
+                    for uid, answer_key in answer_keys.items()
+                ],
+            }
+        )
+        await backend.set(key, value, expire=self.ttl)
+        return answer_keys
+
+    async def invalidate(self, quiz_uid: str, *quiz_ids: int) -> None:
+        """
+        Drop the cached answer keys of the given versions of a quiz.
+        Call after the questions in the quiz versions change.
+
+        Keys are deleted explicitly, on every worker, whatever the cache backend.
+
+        :param quiz_uid: The UID of the quiz
+        :param quiz_ids: The IDs of the quiz versions
+        """
+        backend = FastAPICache.get_backend()
+        for quiz_id in set(quiz_ids):
+            await backend.clear(key=self.get_key(quiz_uid, quiz_id))
+
+    async def invalidate_question(
+        self, session: AsyncSession, question_uid: str
+    ) -> None:
+        """
+        Drop the cached answer keys of every quiz version containing
+        the question with the given UID. Call after the question is
+        changed in place, or deleted.
+
+        :param session: The database session, used to find the quiz versions
+        :param question_uid: The UID of the question
+        """
+        for quiz_uid, quiz_id in await crud.retrieve_question_quiz_versions(
+            session, question_uid
+        ):
+            await self.invalidate(quiz_uid, quiz_id)
+
+
+quiz_answer_keys = AnswerKeyCache(ttl=settings.QUIZ_ANSWER_KEY_CACHE_TTL)
+
+
+__all__ = ["AnswerKey", "AnswerKeys", "AnswerKeyCache", "quiz_answer_keys"]
@@ -0,0 +1,69 @@
+import click
+import sqlalchemy as sa
+
+from helpers.fastapi import commands
+from helpers.fastapi.utils.sync import async_to_sync
+from helpers.fastapi.sqlalchemy.setup import get_async_session
+from .models import QuizAttempt
+from . import crud
+
+
+@commands.register("reconcile_quiz_attempts")
+@click.option(
+    "--batch-size",
+    "-b",
+    type=click.IntRange(min=1),
+    default=5000,
+    show_default=True,
+    help="Number of quiz attempts (by ID range) to reconcile per transaction",
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Only report the drifted quiz attempts, without correcting them",
+)
+@async_to_sync
+async def reconcile_quiz_attempts(batch_size: int = 5000, dry_run: bool = False):
+    """
+    Recount the attempted questions and scores of quiz attempts from their answers,
+    and correct the drifted ones.
+
+    Both are maintained incrementally by database triggers, as answers are
+    given. Run this after answers were changed with the triggers disabled,
+    or to check that the counts are consistent.
+    """
+    async with get_async_session() as session:
+        result = await session.execute(
+            sa.select(sa.func.min(QuizAttempt.id), sa.func.max(QuizAttempt.id))
+        )
+        min_id, max_id = result.one()
+    if min_id is None:
+        click.echo("No quiz attempts to reconcile")
+        return
+
+    drifted = 0
+    for start_id in range(min_id, max_id + 1, batch_size):
+        async with get_async_session() as session:
+            drifted_ids = await crud.reconcile_quiz_attempt_progress(
+                session,
+                start_id=start_id,
+                end_id=start_id + batch_size - 1,
+                dry_run=dry_run,
+            )
+            if not dry_run:
+                await session.commit()
+        drifted += len(drifted_ids)
+        for attempt_id in drifted_ids:
+            click.echo(f"Quiz attempt {attempt_id} has drifted")
+
+    action = "Found" if dry_run else "Reconciled"
+    click.echo(
+        click.style(
+            f"\n{action} {drifted} drifted quiz attempts",
+            fg="green",
+        )
+    )
+
+
+__all__ = ["reconcile_quiz_attempts"]
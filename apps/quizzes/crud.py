@@ -4,11 +4,13 @@ import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy as sa
-from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload, selectinload, lazyload
 from sqlalchemy.sql import func
 from apps.accounts.models import Account
 from apps.quizzes.models import (
     Quiz,
+    QuizDifficulty,
     Question,
     QuizAttempt,
     QuizAttemptQuestionAnswer,
@@ -86,6 +88,7 @@ async def retrieve_quiz_by_uid(
     uid: str,
     version: typing.Optional[int] = None,
     for_update: bool = False,
+    load_questions: bool = True,
 ) -> typing.Optional[Quiz]:
     """
     Retrieve a quiz by its UID.
@@ -94,6 +97,7 @@ async def retrieve_quiz_by_uid(
     :param uid: The UID of the quiz to retrieve.
     :param version: The version of the quiz to retrieve. If None, the latest version is retrieved.
     :param for_update: Whether to lock the row for update but still allow reading.
+    :param load_questions: Whether to load the questions in the quiz.
     :return: The quiz object if found, otherwise None.
     """
     query = (
@@ -105,7 +109,11 @@ async def retrieve_quiz_by_uid(
         .options(
             joinedload(Quiz.created_by.and_(~Account.is_deleted)),
             joinedload(Quiz.deleted_by.and_(~Account.is_deleted)),
-            selectinload(Quiz.questions.and_(~Question.is_deleted)),
+            (
+                selectinload(Quiz.questions.and_(~Question.is_deleted))
+                if load_questions
+                else lazyload(Quiz.questions)
+            ),
         )
     )
     if version is not None:
@@ -160,24 +168,161 @@ async def check_quiz_has_attempts(
     return result.scalars().first() is not None
 
 
-async def copy_quiz(quiz: Quiz, **update_fields) -> Quiz:
-    new_quiz = Quiz(
-        **{
-            "uid": quiz.uid,
-            "title": quiz.title,
-            "description": quiz.description,
-            "created_by_id": quiz.created_by_id,
-            "difficulty": quiz.difficulty,
-            "duration": quiz.duration,
-            "search_tsvector": quiz.search_tsvector,
-            "questions": quiz.questions,
-            "is_public": quiz.is_public,
-            "is_deleted": quiz.is_deleted,
-            "extradata": quiz.extradata,
-            **update_fields,
-        }
+QUIZ_COPY_FIELDS = (
+    "uid",
+    "title",
+    "description",
+    "created_by_id",
+    "duration",
+    "search_tsvector",
+    "is_public",
+    "is_deleted",
+    "extradata",
+)
+"""Fields copied into new versions of a quiz"""
+
+
+def quiz_difficulty(question_ids: sa.Select) -> sa.ScalarSelect[str]:
+    """
+    Return a sub-select of the difficulty of a quiz with the given questions,
+    that is, the most common difficulty of the (undeleted) questions.
+
+    :param question_ids: A select of the IDs of the questions in the quiz.
+    """
+    return (
+        sa.select(
+            func.coalesce(
+                func.mode().within_group(Question.difficulty),
+                QuizDifficulty.NOT_SET.value,
+            )
+        )
+        .where(Question.id.in_(question_ids), ~Question.is_deleted)
+        .scalar_subquery()
+    )
+
+
+def _quiz_question_ids(
+    quiz_id: int,
+    add_question_ids: typing.Iterable[int] = (),
+    remove_question_ids: typing.Iterable[int] = (),
+) -> sa.Select:
+    """Return a select of the IDs of the questions in a quiz (version), after changes."""
+    question_ids = sa.select(QuestionToQuizAssociation.question_id).where(
+        QuestionToQuizAssociation.quiz_id == quiz_id
+    )
+    remove_question_ids = list(remove_question_ids)
+    if remove_question_ids:
+        question_ids = question_ids.where(
+            QuestionToQuizAssociation.question_id.not_in(remove_question_ids)
+        )
+    add_question_ids = list(add_question_ids)
+    if add_question_ids:
+        question_ids = sa.union(
+            question_ids, sa.select(Question.id).where(Question.id.in_(add_question_ids))
+        )
+    return sa.select(question_ids.subquery().c.question_id)
+
+
+async def copy_quiz(
+    session: AsyncSession,
+    quiz_id: int,
+    add_question_ids: typing.Iterable[int] = (),
+    remove_question_ids: typing.Iterable[int] = (),
+    **update_fields,
+) -> int:
+    """
+    Copy a quiz (version) into a new version of the quiz.
+
+    The new version and its question associations are inserted in one
+    statement (`INSERT ... SELECT`), so the questions are not loaded.
+    The difficulty of the new version is computed from its questions, and
+    the new version number is assigned by the `update_quiz_version` trigger.
+
+    :param session: The database session.
+    :param quiz_id: The ID of the quiz (version) to copy.
+    :param add_question_ids: The IDs of questions to add to the new version.
+    :param remove_question_ids: The IDs of questions of the copied version,
+        to leave out of the new version.
+    :param update_fields: Values of fields to change in the new version.
+    :return: The ID of the new quiz version.
+    """
+    question_ids = _quiz_question_ids(
+        quiz_id, add_question_ids, remove_question_ids
+    ).cte("question_ids")
+
+    values: typing.Dict[str, typing.Any] = {
+        field: getattr(Quiz, field) for field in QUIZ_COPY_FIELDS
+    }
+    values["difficulty"] = quiz_difficulty(sa.select(question_ids.c.question_id))
+    for field, value in update_fields.items():
+        values[field] = sa.literal(value, type_=Quiz.__table__.c[field].type)
+    values["created_at"] = values["updated_at"] = func.now()
+
+    new_quiz = (
+        sa.insert(Quiz)
+        .from_select(
+            list(values),
+            sa.select(*values.values()).where(Quiz.id == quiz_id),
+        )
+        .returning(Quiz.id)
+        .cte("new_quiz")
+    )
+    new_associations = (
+        sa.insert(QuestionToQuizAssociation)
+        .from_select(
+            ["quiz_id", "question_id"],
+            sa.select(new_quiz.c.id, question_ids.c.question_id),
+        )
+        .cte("new_associations")
+    )
+    result = await session.execute(
+        sa.select(new_quiz.c.id).add_cte(new_associations)
+    )
+    return result.scalar_one()
+
+
+async def update_quiz_questions(
+    session: AsyncSession,
+    quiz_id: int,
+    add_question_ids: typing.Iterable[int] = (),
+    remove_question_ids: typing.Iterable[int] = (),
+) -> None:
+    """
+    Add and remove questions of a quiz (version) in place, and update its difficulty.
+
+    Only the association rows of the given questions are written,
+    so the questions already in the quiz are not loaded.
+
+    :param session: The database session.
+    :param quiz_id: The ID of the quiz (version) to update.
+    :param add_question_ids: The IDs of questions to add to the quiz.
+    :param remove_question_ids: The IDs of questions to remove from the quiz.
+    """
+    add_question_ids = list(add_question_ids)
+    if add_question_ids:
+        await session.execute(
+            pg_insert(QuestionToQuizAssociation)
+            .values(
+                [
+                    {"quiz_id": quiz_id, "question_id": question_id}
+                    for question_id in add_question_ids
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+    remove_question_ids = list(remove_question_ids)
+    if remove_question_ids:
+        await session.execute(
+            sa.delete(QuestionToQuizAssociation).where(
+                QuestionToQuizAssociation.quiz_id == quiz_id,
+                QuestionToQuizAssociation.question_id.in_(remove_question_ids),
+            )
+        )
+    await session.execute(
+        sa.update(Quiz)
+        .where(Quiz.id == quiz_id)
+        .values(difficulty=quiz_difficulty(_quiz_question_ids(quiz_id)))
     )
-    return new_quiz
 
 
 async def delete_quiz_by_uid(
@@ -312,8 +457,33 @@ async def delete_question_by_uid(
     return list(result.scalars().all())
 
 
-async def search_quizzes(
-    session: AsyncSession,
+def quiz_projection() -> typing.List[sa.ColumnElement[typing.Any]]:
+    """
+    Return the columns of a lean quiz projection.
+
+    The projection has just the columns `BaseQuizSchema` needs,
+    so quizzes can be listed without loading `Quiz` instances.
+    """
+    return [
+        Quiz.id,
+        Quiz.uid,
+        Quiz.title,
+        Quiz.description,
+        Quiz.duration,
+        Quiz.is_public,
+        Quiz.is_latest,
+        Quiz.extradata,
+        Quiz.version,
+        Quiz.questions_count,
+        Quiz.difficulty,
+        Quiz.duration.is_not(None).label("is_timed"),
+        Quiz.created_at,
+        Quiz.updated_at,
+        Quiz.deleted_at,
+    ]
+
+
+def build_quiz_search_conditions(
     query: typing.Optional[str] = None,
     *,
     created_by_id: typing.Optional[uuid.UUID] = None,
@@ -325,45 +495,30 @@ async def search_quizzes(
     created_at_lte: typing.Optional[datetime.datetime] = None,
     updated_at_gte: typing.Optional[datetime.datetime] = None,
     updated_at_lte: typing.Optional[datetime.datetime] = None,
-    limit: int = 100,
-    offset: int = 0,
     exclude: typing.Optional[typing.List[typing.Union[str, int]]] = None,
-    ordering: typing.Sequence[sa.UnaryExpression] = Quiz.DEFAULT_ORDERING,
     version: typing.Optional[int] = None,
     **filters,
-) -> typing.List[Quiz]:
+) -> typing.Tuple[
+    typing.List[sa.ColumnExpressionArgument[bool]],
+    typing.Optional[sa.ColumnElement[float]],
+]:
     """
-    Search for quizzes based on various filters and a full-text search query.
+    Build the filter conditions for a quiz search.
 
-    :param session: The database session.
-    :param query: The full-text search query.
-    :param created_by_id: Filter quizzes created by a specific account.
-    :param difficulty: Filter quizzes by difficulty levels.
-    :param title: Filter quizzes by exact title.
-    :param duration_gte: Filter quizzes with duration greater than or equal to this value.
-    :param duration_lte: Filter quizzes with duration less than or equal to this value.
-    :param created_at_gte: Filter quizzes created after this datetime.
-    :param created_at_lte: Filter quizzes created before this datetime.
-    :param updated_at_gte: Filter quizzes updated after this datetime.
-    :param updated_at_lte: Filter quizzes updated before this datetime.
-    :param limit: The maximum number of quizzes to return.
-    :param offset: The number of quizzes to skip.
-    :param exclude: A list of quiz IDs or UIDs to exclude from the search results.
-    :param ordering: A list of SQLAlchemy ordering expressions to apply to the query.
-    :param version: The version of the quiz to filter by.
-    :param filters: Additional filters to apply to the query.
-    :return: A list of quizzes matching the search criteria.
+    Takes the same filters as `search_quizzes`.
+
+    :return: A tuple of the query conditions and the relevance rank expression,
+        if a search query was given.
     """
-    query_conditions = [~Quiz.is_deleted]
+    query_conditions: typing.List[sa.ColumnExpressionArgument[bool]] = [
+        ~Quiz.is_deleted
+    ]
+    rank = None
 
     if query:
         tsquery = text_to_tsquery(query)
         query_conditions.append(Quiz.search_tsvector.op("@@")(tsquery))
-        # Update ordering to rank by relevance
-        ordering = (
-            sa.desc(func.ts_rank_cd(Quiz.search_tsvector, tsquery)),
-            *ordering,
-        )
+        rank = func.ts_rank_cd(Quiz.search_tsvector, tsquery)
 
     if created_by_id:
         query_conditions.append(Quiz.created_by_id == created_by_id)
@@ -403,17 +558,68 @@ async def search_quizzes(
     if version is not None and not filters.get("is_latest", False):
         query_conditions.append(Quiz.version == version)
 
-    result = await session.execute(
-        sa.select(Quiz)
-        .where(*query_conditions, *build_conditions(filters, Quiz))
-        .limit(limit)
-        .offset(offset)
-        .options(
+    query_conditions.extend(build_conditions(filters, Quiz))
+    return query_conditions, rank
+
+
+def select_matching_quizzes(
+    query: typing.Optional[str] = None, **params
+) -> sa.Select[typing.Tuple[int]]:
+    """
+    Select the IDs of the quizzes matching a search, e.g. to count the matches.
+
+    Takes the same parameters as `search_quizzes`. Pagination,
+    ordering and projection parameters are ignored.
+    """
+    for param in ("limit", "offset", "ordering", "lean"):
+        params.pop(param, None)
+    query_conditions, _ = build_quiz_search_conditions(query, **params)
+    return sa.select(Quiz.id).where(*query_conditions)
+
+
+async def search_quizzes(
+    session: AsyncSession,
+    query: typing.Optional[str] = None,
+    *,
+    limit: int = 100,
+    offset: int = 0,
+    ordering: typing.Sequence[sa.UnaryExpression] = Quiz.DEFAULT_ORDERING,
+    lean: bool = False,
+    **filters,
+) -> typing.List[typing.Any]:
+    """
+    Search for quizzes based on various filters and a full-text search query.
+
+    :param session: The database session.
+    :param query: The full-text search query.
+    :param limit: The maximum number of quizzes to return.
+    :param offset: The number of quizzes to skip.
+    :param ordering: A list of SQLAlchemy ordering expressions to apply to the query.
+    :param lean: Whether to return mappings of lean projection rows (see `quiz_projection`),
+        instead of `Quiz` instances.
+    :param filters: Filters to apply to the query. See `build_quiz_search_conditions`.
+    :return: A list of quizzes matching the search criteria.
+    """
+    query_conditions, rank = build_quiz_search_conditions(query, **filters)
+    if rank is not None:
+        # Update ordering to rank by relevance
+        ordering = (sa.desc(rank), *ordering)
+
+    if lean:
+        select = sa.select(*quiz_projection())
+    else:
+        select = sa.select(Quiz).options(
             # selectinload(Quiz.questions.and_(~Question.is_deleted)),
             joinedload(Quiz.created_by.and_(~Account.is_deleted)),
         )
+    result = await session.execute(
+        select.where(*query_conditions)
+        .limit(limit)
+        .offset(offset)
         .order_by(*ordering)
     )
+    if lean:
+        return [dict(row) for row in result.mappings().all()]
     return list(result.scalars().all())
 
 
@@ -422,8 +628,8 @@ async def search_questions(
     query: typing.Optional[str] = None,
     *,
     difficulty: typing.Optional[typing.Iterable[str]] = None,
-    related_topics: typing.Optional[typing.Iterable[typing.Union[int, str]]] = None,
-    related_terms: typing.Optional[typing.Iterable[typing.Union[int, str]]] = None,
+    related_topics: typing.Optional[typing.Iterable[int]] = None,
+    related_terms: typing.Optional[typing.Iterable[int]] = None,
     in_quizzes: typing.Optional[typing.Iterable[typing.Union[int, str]]] = None,
     created_at_gte: typing.Optional[datetime.datetime] = None,
     created_at_lte: typing.Optional[datetime.datetime] = None,
@@ -442,8 +648,8 @@ async def search_questions(
     :param session: The database session.
     :param query: The full-text search query.
     :param difficulty: Filter questions by difficulty levels.
-    :param related_topics: Filter questions associated with specific topic IDs.
-    :param related_terms: Filter questions associated with specific term IDs.
+    :param related_topics: Filter questions associated with specific (undeleted) topic IDs.
+    :param related_terms: Filter questions associated with specific (undeleted) term IDs.
     :param in_quizzes: Filter questions belonging to specific quiz IDs.
     :param created_at_gte: Filter questions created after this datetime.
     :param created_at_lte: Filter questions created before this datetime.
@@ -484,30 +690,11 @@ async def search_questions(
         query_conditions.append(Question.updated_at <= updated_at_lte)
 
     if related_topics:
-        related_topics_ids, related_topics_uids = sort_id_uids(related_topics)
-        if not related_topics_ids and not related_topics_uids:
-            raise ValueError(
-                "At least one ID or UID must be provided for related topics."
-            )
-        query_conditions.append(
-            Question.related_topics.any(
-                (Topic.id.in_(related_topics_ids) | Topic.uid.in_(related_topics_uids))
-                & ~Topic.is_deleted,
-            )
-        )
+        # Denormalized arrays keep this a single GIN index probe
+        query_conditions.append(Question.topic_ids.overlap(list(related_topics)))
 
     if related_terms:
-        related_terms_ids, related_terms_uids = sort_id_uids(related_terms)
-        if not related_terms_ids and not related_terms_uids:
-            raise ValueError(
-                "At least one ID or UID must be provided for related terms."
-            )
-        query_conditions.append(
-            Question.related_terms.any(
-                (Term.id.in_(related_terms_ids) | Term.uid.in_(related_terms_uids))
-                & ~Term.is_deleted,
-            )
-        )
+        query_conditions.append(Question.term_ids.overlap(list(related_terms)))
 
     if in_quizzes:
         quiz_ids, quiz_uids = sort_id_uids(in_quizzes)
@@ -634,6 +821,95 @@ async def retrieve_quiz_attempts(
     return list(result.scalars().all())
 
 
+async def retrieve_quiz_attempt_for_answering(
+    session: AsyncSession,
+    quiz_uid: str,
+    attempt_uid: str,
+    attempted_by_id: uuid.UUID,
+) -> typing.Optional[QuizAttempt]:
+    """
+    Retrieve a quiz attempt to record answers in, without loading its
+    relationships (quiz, answers or account).
+
+    :param session: The database session.
+    :param quiz_uid: The UID of the (undeleted) quiz attempted.
+    :param attempt_uid: The UID of the quiz attempt.
+    :param attempted_by_id: The ID of the account that made the attempt.
+    :return: The QuizAttempt object if found, otherwise None.
+    """
+    result = await session.execute(
+        sa.select(QuizAttempt)
+        .join(QuizAttempt.quiz.and_(~Quiz.is_deleted))
+        .where(
+            Quiz.uid == quiz_uid,
+            QuizAttempt.uid == attempt_uid,
+            QuizAttempt.attempted_by_id == attempted_by_id,
+        )
+        .options(lazyload("*"))
+    )
+    return result.scalars().first()
+
+
+async def retrieve_question_answer_keys(
+    session: AsyncSession,
+    quiz_id: int,
+    question_uids: typing.Optional[typing.Iterable[str]] = None,
+) -> typing.Dict[str, sa.Row[typing.Tuple[int, int, int]]]:
+    """
+    Retrieve what is needed to check answers to questions in a quiz, without loading the questions.
+
+    :param session: The database session.
+    :param quiz_id: The ID of the quiz (version) the questions are in.
+    :param question_uids: The UIDs of the questions. All questions in the quiz if not given.
+    :return: A mapping of the UIDs of the (undeleted) questions found in the quiz,
+        to rows of their ID, correct option index and number of options.
+    """
+    query = (
+        sa.select(
+            Question.uid,
+            Question.id,
+            Question.correct_option_index,
+            func.cardinality(Question.options).label("options_count"),
+        )
+        .join(
+            QuestionToQuizAssociation,
+            QuestionToQuizAssociation.question_id == Question.id,
+        )
+        .where(
+            QuestionToQuizAssociation.quiz_id == quiz_id,
+            ~Question.is_deleted,
+        )
+    )
+    if question_uids is not None:
+        query = query.where(Question.uid.in_(list(question_uids)))
+    result = await session.execute(query)
+    return {row.uid: row for row in result.all()}
+
+
+async def retrieve_question_quiz_versions(
+    session: AsyncSession,
+    question_uid: str,
+) -> typing.List[sa.Row[typing.Tuple[str, int]]]:
+    """
+    Retrieve the quiz versions containing any version of a question.
+
+    :param session: The database session.
+    :param question_uid: The UID of the question.
+    :return: Rows of the UID and ID of each quiz version containing the question.
+    """
+    result = await session.execute(
+        sa.select(Quiz.uid, Quiz.id)
+        .join(
+            QuestionToQuizAssociation,
+            QuestionToQuizAssociation.quiz_id == Quiz.id,
+        )
+        .join(Question, Question.id == QuestionToQuizAssociation.question_id)
+        .where(Question.uid == question_uid)
+        .distinct()
+    )
+    return list(result.all())
+
+
 async def retrieve_question_in_quiz(
     session: AsyncSession,
     question_uid: str,
@@ -722,3 +998,122 @@ async def create_quiz_attempt_question_answer(
     )
     session.add(quiz_attempt_question_answer)
     return quiz_attempt_question_answer
+
+
+async def upsert_quiz_attempt_question_answers(
+    session: AsyncSession,
+    quiz_attempt_id: int,
+    answered_by_id: uuid.UUID,
+    answers: typing.Sequence[typing.Mapping[str, typing.Any]],
+) -> typing.List[int]:
+    """
+    Create or update answers to questions in a quiz attempt, with a single
+    `INSERT ... ON CONFLICT DO UPDATE` statement.
+
+    Answers that were already final (locked in) are left unchanged.
+
+    :param session: The database session.
+    :param quiz_attempt_id: The ID of the quiz attempt.
+    :param answered_by_id: The ID of the account that gave the answers.
+    :param answers: The answers, as mappings of `question_id`, `answer_index`,
+        `is_final` and `is_correct`. Each question must be answered at most once.
+    :return: The IDs of the questions whose answers were created or updated.
+    """
+    if not answers:
+        return []
+
+    insert = pg_insert(QuizAttemptQuestionAnswer).values(
+        [
+            {
+                **answer,
+                "quiz_attempt_id": quiz_attempt_id,
+                "answered_by_id": answered_by_id,
+            }
+            for answer in answers
+        ]
+    )
+    result = await session.execute(
+        insert.on_conflict_do_update(
+            constraint="uq_quiz_attempt_question_answer",
+            set_={
+                "answer_index": insert.excluded.answer_index,
+                "is_final": insert.excluded.is_final,
+                "is_correct": insert.excluded.is_correct,
+                "updated_at": timezone.now(),
+            },
+            where=~QuizAttemptQuestionAnswer.is_final,
+        ).returning(QuizAttemptQuestionAnswer.question_id)
+    )
+    return list(result.scalars().all())
+
+
+async def reconcile_quiz_attempt_progress(
+    session: AsyncSession,
+    *,
+    start_id: int,
+    end_id: int,
+    dry_run: bool = False,
+) -> typing.List[int]:
+    """
+    Recount the attempted questions and scores of quiz attempts from their answers,
+    and correct the attempts whose (incrementally maintained) counts have drifted.
+
+    Scores of attempts without final answers are left as they are.
+
+    :param session: The database session.
+    :param start_id: The smallest ID of the quiz attempts to reconcile.
+    :param end_id: The largest ID of the quiz attempts to reconcile.
+    :param dry_run: Whether to only find the drifted attempts, without correcting them.
+    :return: The IDs of the drifted quiz attempts.
+    """
+    answer = QuizAttemptQuestionAnswer
+    counts = (
+        sa.select(
+            answer.quiz_attempt_id,
+            func.count(sa.distinct(answer.question_id)).label("attempted_questions"),
+            func.count()
+            .filter(answer.is_final & answer.is_correct)
+            .label("score"),
+            func.count().filter(answer.is_final).label("final_answers"),
+        )
+        .where(answer.quiz_attempt_id.between(start_id, end_id))
+        .group_by(answer.quiz_attempt_id)
+        .subquery()
+    )
+    attempted_questions = func.coalesce(counts.c.attempted_questions, 0)
+    score = sa.case(
+        (counts.c.final_answers > 0, counts.c.score),
+        else_=QuizAttempt.score,
+    )
+    drifted = (
+        sa.select(
+            QuizAttempt.id,
+            attempted_questions.label("attempted_questions"),
+            score.label("score"),
+        )
+        .outerjoin(counts, counts.c.quiz_attempt_id == QuizAttempt.id)
+        .where(
+            QuizAttempt.id.between(start_id, end_id),
+            sa.or_(
+                QuizAttempt.attempted_questions.is_distinct_from(attempted_questions),
+                QuizAttempt.score.is_distinct_from(score),
+            ),
+        )
+    )
+    if dry_run:
+        result = await session.execute(drifted)
+        return list(result.scalars().all())
+
+    # Lock the drifted attempts, so answers (and their triggers) wait for the correction
+    drifted = drifted.with_for_update(of=QuizAttempt).subquery()
+    result = await session.execute(
+        sa.update(QuizAttempt)
+        .where(QuizAttempt.id == drifted.c.id)
+        .values(
+            attempted_questions=drifted.c.attempted_questions,
+            score=drifted.c.score,
+        )
+        .returning(QuizAttempt.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars().all())
@@ -8,7 +8,10 @@ from apps.quizzes.models import (
     Question,
     QuizAttempt,
     QuizAttemptQuestionAnswer,
+    QuizVersionCounter,
     QuestionToQuizAssociation,
+    QuestionToTermAssociation,
+    QuestionToTopicAssociation,
 )
 
 
@@ -147,124 +150,277 @@ QUESTION_SEARCH_VECTOR_DDLS = (
 )
 
 
-QUIZ_ATTEMPT_DDLS = (
+# Maintain the questions count of quizzes with statement level triggers, that adjust
+# the count of each quiz affected by a statement once, by the number of (undeleted)
+# questions added to or removed from it, instead of recounting on every row change.
+# Transition tables cannot be used by triggers on more than one event, so each
+# event has its own trigger.
+QUIZ_QUESTION_COUNT_DDLS = (
     sa.DDL(f"""
-    DROP TRIGGER IF EXISTS update_attempted_questions_trigger ON {QuizAttemptQuestionAnswer.__tablename__};
-    DROP FUNCTION IF EXISTS update_attempted_questions();
+    DROP TRIGGER IF EXISTS update_questions_count_trigger ON {QuestionToQuizAssociation.__tablename__};
+    DROP TRIGGER IF EXISTS update_questions_count_on_question_update_trigger ON {Question.__tablename__};
+    DROP TRIGGER IF EXISTS add_questions_count_trigger ON {QuestionToQuizAssociation.__tablename__};
+    DROP TRIGGER IF EXISTS subtract_questions_count_trigger ON {QuestionToQuizAssociation.__tablename__};
+    DROP FUNCTION IF EXISTS update_questions_count();
+    DROP FUNCTION IF EXISTS add_questions_count();
+    DROP FUNCTION IF EXISTS subtract_questions_count();
+    DROP FUNCTION IF EXISTS update_questions_count_on_question_update();
     """),
     sa.DDL(f"""
-    CREATE OR REPLACE FUNCTION update_attempted_questions() RETURNS trigger AS 
+    CREATE OR REPLACE FUNCTION add_questions_count() RETURNS trigger AS 
     $$
     BEGIN
-        UPDATE {QuizAttempt.__tablename__}
-        SET attempted_questions = (
-            SELECT COUNT(DISTINCT question_id)
-            FROM {QuizAttemptQuestionAnswer.__tablename__}
-            WHERE quiz_attempt_id = NEW.quiz_attempt_id
-        )
-        WHERE id = NEW.quiz_attempt_id;
-        RETURN NEW;
+        UPDATE {Quiz.__tablename__} AS quiz
+        SET questions_count = quiz.questions_count + delta.added
+        FROM (
+            SELECT new_rows.quiz_id, COUNT(*) AS added
+            FROM new_rows
+            JOIN {Question.__tablename__} AS q ON q.id = new_rows.question_id
+            WHERE q.is_deleted = FALSE
+            GROUP BY new_rows.quiz_id
+        ) AS delta
+        WHERE quiz.id = delta.quiz_id;
+        RETURN NULL;
     END;
     $$ LANGUAGE plpgsql;
     """),
     sa.DDL(f"""
-    CREATE TRIGGER update_attempted_questions_trigger
-        AFTER INSERT OR UPDATE ON {QuizAttemptQuestionAnswer.__tablename__}
-        FOR EACH ROW
-        EXECUTE FUNCTION update_attempted_questions();
-    """),
-)
-
+    CREATE OR REPLACE FUNCTION subtract_questions_count() RETURNS trigger AS 
+    $$
+    BEGIN
+        UPDATE {Quiz.__tablename__} AS quiz
+        SET questions_count = quiz.questions_count - delta.removed
+        FROM (
+            SELECT old_rows.quiz_id, COUNT(*) AS removed
+            FROM old_rows
+            JOIN {Question.__tablename__} AS q ON q.id = old_rows.question_id
+            WHERE q.is_deleted = FALSE
+            GROUP BY old_rows.quiz_id
+        ) AS delta
+        WHERE quiz.id = delta.quiz_id;
 
-# Update the trigger function to handle DELETE operations using OLD
-QUIZ_QUESTION_COUNT_DDLS = (
-    sa.DDL(f"""
-    DROP TRIGGER IF EXISTS update_questions_count_trigger ON {QuestionToQuizAssociation.__tablename__};
-    DROP TRIGGER IF EXISTS update_questions_count_on_question_update_trigger ON {Question.__tablename__};
-    DROP FUNCTION IF EXISTS update_questions_count();
+        -- Whether questions deleted along with their associations (cascade) were
+        -- counted is unknown, so the quizzes they were in are recounted instead
+        UPDATE {Quiz.__tablename__} AS quiz
+        SET questions_count = (
+            SELECT COUNT(*)
+            FROM {QuestionToQuizAssociation.__tablename__} AS assoc
+            JOIN {Question.__tablename__} AS q ON assoc.question_id = q.id
+            WHERE assoc.quiz_id = quiz.id AND q.is_deleted = FALSE
+        )
+        WHERE quiz.id IN (
+            SELECT old_rows.quiz_id
+            FROM old_rows
+            LEFT JOIN {Question.__tablename__} AS q ON q.id = old_rows.question_id
+            WHERE q.id IS NULL
+        );
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
     """),
     sa.DDL(f"""
-    CREATE OR REPLACE FUNCTION update_questions_count() RETURNS trigger AS 
+    CREATE OR REPLACE FUNCTION update_questions_count_on_question_update() RETURNS trigger AS 
     $$
     BEGIN
-        -- Use OLD for DELETE operations
-        IF (TG_OP = 'DELETE') THEN
-            UPDATE {Quiz.__tablename__}
-            SET questions_count = (
-                SELECT COUNT(*)
-                FROM {QuestionToQuizAssociation.__tablename__} AS assoc
-                JOIN {Question.__tablename__} AS q
-                ON assoc.question_id = q.id
-                WHERE assoc.quiz_id = OLD.quiz_id AND q.is_deleted = FALSE
-            )
-            WHERE id = OLD.quiz_id;
-        ELSE
-            UPDATE {Quiz.__tablename__}
-            SET questions_count = (
-                SELECT COUNT(*)
-                FROM {QuestionToQuizAssociation.__tablename__} AS assoc
-                JOIN {Question.__tablename__} AS q
-                ON assoc.question_id = q.id
-                WHERE assoc.quiz_id = NEW.quiz_id AND q.is_deleted = FALSE
-            )
-            WHERE id = NEW.quiz_id;
+        -- Most updates (e.g. of `term_ids`/`topic_ids`) do not change `is_deleted`
+        IF NOT EXISTS (
+            SELECT 1
+            FROM new_rows
+            JOIN old_rows ON old_rows.id = new_rows.id
+            WHERE old_rows.is_deleted IS DISTINCT FROM new_rows.is_deleted
+        ) THEN
+            RETURN NULL;
         END IF;
-        RETURN NEW;
+
+        UPDATE {Quiz.__tablename__} AS quiz
+        SET questions_count = quiz.questions_count + delta.change
+        FROM (
+            SELECT
+                assoc.quiz_id,
+                SUM(CASE WHEN new_rows.is_deleted THEN -1 ELSE 1 END) AS change
+            FROM new_rows
+            JOIN old_rows ON old_rows.id = new_rows.id
+            JOIN {QuestionToQuizAssociation.__tablename__} AS assoc ON assoc.question_id = new_rows.id
+            WHERE old_rows.is_deleted IS DISTINCT FROM new_rows.is_deleted
+            GROUP BY assoc.quiz_id
+        ) AS delta
+        WHERE quiz.id = delta.quiz_id AND delta.change <> 0;
+        RETURN NULL;
     END;
     $$ LANGUAGE plpgsql;
     """),
     sa.DDL(f"""
-    CREATE TRIGGER update_questions_count_trigger
-        AFTER INSERT OR DELETE ON {QuestionToQuizAssociation.__tablename__}
-        FOR EACH ROW
-        EXECUTE FUNCTION update_questions_count();
+    CREATE TRIGGER add_questions_count_trigger
+        AFTER INSERT ON {QuestionToQuizAssociation.__tablename__}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION add_questions_count();
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER subtract_questions_count_trigger
+        AFTER DELETE ON {QuestionToQuizAssociation.__tablename__}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION subtract_questions_count();
     """),
+    # Triggers with transition tables cannot have column lists (`UPDATE OF is_deleted`),
+    # so the trigger fires on every update of questions, and the function returns
+    # early for updates that do not change `is_deleted`
     sa.DDL(f"""
     CREATE TRIGGER update_questions_count_on_question_update_trigger
-        AFTER UPDATE OF is_deleted ON {Question.__tablename__}
-        FOR EACH ROW
-        EXECUTE FUNCTION update_questions_count();
+        AFTER UPDATE ON {Question.__tablename__}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_questions_count_on_question_update();
     """),
 )
 
 
-# Trigger function to update the score field in QuizAttempt on QuizAttemptQuestionAnswer insert/update
-QUIZ_ATTEMPT_SCORE_DDLS = (
+# Maintain the attempted questions count and score of quiz attempts incrementally,
+# from the answers changed by each statement, instead of recounting all answers of
+# the attempt. An attempted question is a question with at least one answer in the
+# attempt, and the score is the number of final, correct answers.
+# Drift (e.g. from changes made with the triggers disabled) is corrected by the
+# `reconcile_quiz_attempts` command.
+QUIZ_ATTEMPT_PROGRESS_DDLS = (
     sa.DDL(f"""
+    DROP TRIGGER IF EXISTS update_attempted_questions_trigger ON {QuizAttemptQuestionAnswer.__tablename__};
     DROP TRIGGER IF EXISTS update_quiz_attempt_score_on_final_trigger ON {QuizAttemptQuestionAnswer.__tablename__};
     DROP TRIGGER IF EXISTS update_quiz_attempt_score_on_correct_trigger ON {QuizAttemptQuestionAnswer.__tablename__};
+    DROP TRIGGER IF EXISTS add_quiz_attempt_progress_trigger ON {QuizAttemptQuestionAnswer.__tablename__};
+    DROP TRIGGER IF EXISTS subtract_quiz_attempt_progress_trigger ON {QuizAttemptQuestionAnswer.__tablename__};
+    DROP TRIGGER IF EXISTS update_quiz_attempt_progress_trigger ON {QuizAttemptQuestionAnswer.__tablename__};
+    DROP FUNCTION IF EXISTS update_attempted_questions();
     DROP FUNCTION IF EXISTS update_quiz_attempt_score();
+    DROP FUNCTION IF EXISTS update_quiz_attempt_progress();
     """),
     sa.DDL(f"""
-    CREATE OR REPLACE FUNCTION update_quiz_attempt_score() RETURNS trigger AS 
+    CREATE OR REPLACE FUNCTION update_quiz_attempt_progress() RETURNS trigger AS 
     $$
+    DECLARE
+        changes text;
     BEGIN
-        UPDATE {QuizAttempt.__tablename__}
-        SET score = (
-            SELECT COUNT(*)
-            FROM {QuizAttemptQuestionAnswer.__tablename__}
-            WHERE quiz_attempt_id = NEW.quiz_attempt_id AND is_correct = TRUE
-        )
-        WHERE id = NEW.quiz_attempt_id;
-        RETURN NEW;
+        -- Inserted answers count +1, deleted answers -1, and updated answers both
+        IF (TG_OP = 'INSERT') THEN
+            changes := 'SELECT *, 1 AS sign FROM new_rows';
+        ELSIF (TG_OP = 'DELETE') THEN
+            changes := 'SELECT *, -1 AS sign FROM old_rows';
+        ELSE
+            -- Most updates (e.g. of `answer_index`) change neither count
+            IF NOT EXISTS (
+                SELECT 1
+                FROM new_rows
+                JOIN old_rows ON old_rows.id = new_rows.id
+                WHERE (old_rows.quiz_attempt_id, old_rows.question_id, old_rows.is_final, old_rows.is_correct)
+                    IS DISTINCT FROM (new_rows.quiz_attempt_id, new_rows.question_id, new_rows.is_final, new_rows.is_correct)
+            ) THEN
+                RETURN NULL;
+            END IF;
+            changes := 'SELECT *, 1 AS sign FROM new_rows UNION ALL SELECT *, -1 AS sign FROM old_rows';
+        END IF;
+
+        -- Lock the attempts first, so answers are counted after concurrent
+        -- changes to answers of the same attempts are committed
+        EXECUTE format($query$
+            SELECT 1
+            FROM {QuizAttempt.__tablename__}
+            WHERE id IN (SELECT quiz_attempt_id FROM (%s) AS changes)
+            ORDER BY id
+            FOR UPDATE
+        $query$, changes);
+
+        EXECUTE format($query$
+            WITH changes AS (
+                SELECT
+                    quiz_attempt_id,
+                    question_id,
+                    sign,
+                    sign * (coalesce(is_final, FALSE) AND coalesce(is_correct, FALSE))::integer AS points,
+                    sign > 0 AND coalesce(is_final, FALSE) AS is_final
+                FROM (%s) AS changes
+            ),
+            -- Number of answers to each changed question in each changed attempt,
+            -- after and before the statement
+            answer_counts AS (
+                SELECT
+                    changed.quiz_attempt_id,
+                    counted.answers AS answers_after,
+                    counted.answers - changed.answers AS answers_before
+                FROM (
+                    SELECT quiz_attempt_id, question_id, SUM(sign) AS answers
+                    FROM changes
+                    GROUP BY quiz_attempt_id, question_id
+                ) AS changed
+                CROSS JOIN LATERAL (
+                    SELECT COUNT(*) AS answers
+                    FROM {QuizAttemptQuestionAnswer.__tablename__} AS answer
+                    WHERE answer.question_id = changed.question_id
+                        AND answer.quiz_attempt_id = changed.quiz_attempt_id
+                ) AS counted
+            ),
+            -- A question is attempted when its first answer is added,
+            -- and no longer attempted when its last answer is removed
+            deltas AS (
+                SELECT
+                    quiz_attempt_id,
+                    SUM(attempted) AS attempted,
+                    SUM(points) AS points,
+                    bool_or(is_final) AS has_final
+                FROM (
+                    SELECT
+                        quiz_attempt_id,
+                        (answers_after > 0)::integer - (answers_before > 0)::integer AS attempted,
+                        0 AS points,
+                        FALSE AS is_final
+                    FROM answer_counts
+                    UNION ALL
+                    SELECT quiz_attempt_id, 0, points, is_final
+                    FROM changes
+                ) AS delta
+                GROUP BY quiz_attempt_id
+            )
+            -- The score is set (from NULL) once the attempt has a final answer
+            UPDATE {QuizAttempt.__tablename__} AS attempt
+            SET attempted_questions = greatest(attempt.attempted_questions + deltas.attempted, 0),
+                score = CASE
+                    WHEN deltas.points = 0 AND NOT deltas.has_final THEN attempt.score
+                    ELSE greatest(coalesce(attempt.score, 0) + deltas.points, 0)
+                END
+            FROM deltas
+            WHERE attempt.id = deltas.quiz_attempt_id
+                AND (
+                    deltas.attempted <> 0
+                    OR deltas.points <> 0
+                    OR (deltas.has_final AND attempt.score IS NULL)
+                )
+        $query$, changes);
+        RETURN NULL;
     END;
     $$ LANGUAGE plpgsql;
     """),
+    # Transition tables cannot be used by triggers on more than one event, or
+    # with column lists, so each event has its own trigger, and the function
+    # returns early for updates that change neither count
     sa.DDL(f"""
-    CREATE TRIGGER update_quiz_attempt_score_on_final_trigger
-        AFTER INSERT OR UPDATE OF is_final ON {QuizAttemptQuestionAnswer.__tablename__}
-        FOR EACH ROW
-        WHEN (NEW.is_final = TRUE)
-        EXECUTE FUNCTION update_quiz_attempt_score();
+    CREATE TRIGGER add_quiz_attempt_progress_trigger
+        AFTER INSERT ON {QuizAttemptQuestionAnswer.__tablename__}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_quiz_attempt_progress();
     """),
-    # Add this just to be safe incase `is_correct` is updated even after `is_final` is set to true.
-    # So that the attempt score remains accurate.
     sa.DDL(f"""
-    CREATE TRIGGER update_quiz_attempt_score_on_correct_trigger
-        AFTER UPDATE OF is_correct ON {QuizAttemptQuestionAnswer.__tablename__}
-        FOR EACH ROW
-        WHEN (NEW.is_final = TRUE)
-        EXECUTE FUNCTION update_quiz_attempt_score();
+    CREATE TRIGGER subtract_quiz_attempt_progress_trigger
+        AFTER DELETE ON {QuizAttemptQuestionAnswer.__tablename__}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_quiz_attempt_progress();
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER update_quiz_attempt_progress_trigger
+        AFTER UPDATE ON {QuizAttemptQuestionAnswer.__tablename__}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_quiz_attempt_progress();
     """),
 )
 
@@ -274,15 +430,18 @@ QUIZ_VERSION_DDLS = (
     DROP TRIGGER IF EXISTS update_quiz_version_trigger ON {Quiz.__tablename__};
     DROP FUNCTION IF EXISTS update_quiz_version();
     """),
+    # Take the next version number from the quiz's counter, instead of
+    # scanning its versions for the highest. The counter row lock also
+    # serializes concurrent inserts of versions of the same quiz.
     sa.DDL(f"""
     CREATE OR REPLACE FUNCTION update_quiz_version() RETURNS trigger AS 
     $$
     BEGIN
-        NEW.version := (
-            SELECT COALESCE(MAX(version), -1) + 1
-            FROM {Quiz.__tablename__}
-            WHERE uid = NEW.uid
-        );
+        INSERT INTO {QuizVersionCounter.__tablename__} AS counter (uid, last_version)
+        VALUES (NEW.uid, 0)
+        ON CONFLICT (uid) DO UPDATE
+        SET last_version = counter.last_version + 1
+        RETURNING counter.last_version INTO NEW.version;
         RETURN NEW;
     END;
     $$ LANGUAGE plpgsql;
@@ -322,14 +481,145 @@ QUESTION_VERSION_DDLS = (
 )
 
 
+# Keep the denormalized `term_ids` and `topic_ids` arrays of questions in sync with
+# their term/topic associations, so questions can be filtered by a GIN index probe.
+# Statement level triggers rewrite each affected question once per statement, so
+# linking many terms or topics to a question does not rewrite it once per link.
+# Transition tables cannot be used by triggers on more than one event, so each
+# event has its own trigger.
+QUESTION_RELATED_IDS_DDLS = (
+    sa.DDL(f"""
+    DROP TRIGGER IF EXISTS update_question_term_ids_trigger ON {QuestionToTermAssociation.__tablename__};
+    DROP TRIGGER IF EXISTS add_question_term_ids_trigger ON {QuestionToTermAssociation.__tablename__};
+    DROP TRIGGER IF EXISTS remove_question_term_ids_trigger ON {QuestionToTermAssociation.__tablename__};
+    DROP TRIGGER IF EXISTS update_question_topic_ids_trigger ON {QuestionToTopicAssociation.__tablename__};
+    DROP TRIGGER IF EXISTS add_question_topic_ids_trigger ON {QuestionToTopicAssociation.__tablename__};
+    DROP TRIGGER IF EXISTS remove_question_topic_ids_trigger ON {QuestionToTopicAssociation.__tablename__};
+    DROP FUNCTION IF EXISTS update_question_term_ids();
+    DROP FUNCTION IF EXISTS update_question_topic_ids();
+    """),
+    sa.DDL(f"""
+    CREATE OR REPLACE FUNCTION update_question_term_ids() RETURNS trigger AS 
+    $$
+    DECLARE
+        question_ids integer[];
+    BEGIN
+        IF (TG_OP = 'INSERT') THEN
+            SELECT array_agg(DISTINCT question_id) INTO question_ids FROM new_rows;
+        ELSIF (TG_OP = 'DELETE') THEN
+            SELECT array_agg(DISTINCT question_id) INTO question_ids FROM old_rows;
+        ELSE
+            SELECT array_agg(question_id) INTO question_ids FROM (
+                SELECT question_id FROM new_rows
+                UNION
+                SELECT question_id FROM old_rows
+            ) AS changed;
+        END IF;
+
+        UPDATE {Question.__tablename__} AS q
+        SET term_ids = related.term_ids
+        FROM unnest(question_ids) AS changed(question_id)
+        CROSS JOIN LATERAL (
+            SELECT ARRAY(
+                SELECT assoc.term_id
+                FROM {QuestionToTermAssociation.__tablename__} AS assoc
+                WHERE assoc.question_id = changed.question_id
+                ORDER BY assoc.term_id
+            ) AS term_ids
+        ) AS related
+        WHERE q.id = changed.question_id
+            AND q.term_ids IS DISTINCT FROM related.term_ids;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """),
+    sa.DDL(f"""
+    CREATE OR REPLACE FUNCTION update_question_topic_ids() RETURNS trigger AS 
+    $$
+    DECLARE
+        question_ids integer[];
+    BEGIN
+        IF (TG_OP = 'INSERT') THEN
+            SELECT array_agg(DISTINCT question_id) INTO question_ids FROM new_rows;
+        ELSIF (TG_OP = 'DELETE') THEN
+            SELECT array_agg(DISTINCT question_id) INTO question_ids FROM old_rows;
+        ELSE
+            SELECT array_agg(question_id) INTO question_ids FROM (
+                SELECT question_id FROM new_rows
+                UNION
+                SELECT question_id FROM old_rows
+            ) AS changed;
+        END IF;
+
+        UPDATE {Question.__tablename__} AS q
+        SET topic_ids = related.topic_ids
+        FROM unnest(question_ids) AS changed(question_id)
+        CROSS JOIN LATERAL (
+            SELECT ARRAY(
+                SELECT assoc.topic_id
+                FROM {QuestionToTopicAssociation.__tablename__} AS assoc
+                WHERE assoc.question_id = changed.question_id
+                ORDER BY assoc.topic_id
+            ) AS topic_ids
+        ) AS related
+        WHERE q.id = changed.question_id
+            AND q.topic_ids IS DISTINCT FROM related.topic_ids;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER add_question_term_ids_trigger
+        AFTER INSERT ON {QuestionToTermAssociation.__tablename__}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_question_term_ids();
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER remove_question_term_ids_trigger
+        AFTER DELETE ON {QuestionToTermAssociation.__tablename__}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_question_term_ids();
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER update_question_term_ids_trigger
+        AFTER UPDATE ON {QuestionToTermAssociation.__tablename__}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_question_term_ids();
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER add_question_topic_ids_trigger
+        AFTER INSERT ON {QuestionToTopicAssociation.__tablename__}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_question_topic_ids();
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER remove_question_topic_ids_trigger
+        AFTER DELETE ON {QuestionToTopicAssociation.__tablename__}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_question_topic_ids();
+    """),
+    sa.DDL(f"""
+    CREATE TRIGGER update_question_topic_ids_trigger
+        AFTER UPDATE ON {QuestionToTopicAssociation.__tablename__}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION update_question_topic_ids();
+    """),
+)
+
+
 QUIZ_DDLS = (
     *QUIZ_SEARCH_VECTOR_DDLS,
     *QUESTION_SEARCH_VECTOR_DDLS,
-    *QUIZ_ATTEMPT_DDLS,
     *QUIZ_QUESTION_COUNT_DDLS,
-    *QUIZ_ATTEMPT_SCORE_DDLS,
-    *QUIZ_VERSION_DDLS,
+    *QUIZ_ATTEMPT_PROGRESS_DDLS,
     *QUIZ_VERSION_DDLS,
+    *QUESTION_RELATED_IDS_DDLS,
 )
 
 
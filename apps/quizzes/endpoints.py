@@ -3,6 +3,7 @@ from annotated_types import Le
 import fastapi
 import pydantic
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import lazyload
 from fastapi_cache.decorator import cache
 
 from helpers.fastapi import response
@@ -22,9 +23,10 @@ from helpers.generics.utils import merge_mappings
 from helpers.fastapi.dependencies.connections import AsyncDBSession, User
 from helpers.fastapi.response.pagination import paginated_data, PaginatedResponse
 from helpers.fastapi.requests.query import Limit, Offset, clean_params
+from api.pagination import ResultCountMode, count_results, add_result_count
 
 from . import crud, schemas
-from .models import Question
+from .models import Question, Quiz
 from .query import (
     SearchQuery,
     QuizTitle,
@@ -46,11 +48,9 @@ from .query import (
     QuestionVersion,
 )
 from .utils import guess_quiz_difficulty
+from .answer_keys import quiz_answer_keys
 from apps.search.query import Terms, Topics
-from apps.search.crud import (
-    retrieve_topics_by_name_or_uid,
-    retrieve_terms_by_name_or_uid,
-)
+from apps.search.lookups import term_ids_lookup, topic_ids_lookup
 from apps.accounts.models import Account
 
 
@@ -190,14 +190,14 @@ async def retrieve_quiz_questions(
         offset=offset,
     )
     if related_terms:
-        terms = await retrieve_terms_by_name_or_uid(session, related_terms)
-        if terms:
-            filters["related_terms"] = {term.uid: term for term in terms if term}
+        term_ids = await term_ids_lookup(session, related_terms)
+        if term_ids:
+            filters["related_terms"] = term_ids
 
     if related_topics:
-        topics = await retrieve_topics_by_name_or_uid(session, related_topics)
-        if topics:
-            filters["related_topics"] = {topic.uid: topic for topic in topics if topic}
+        topic_ids = await topic_ids_lookup(session, related_topics)
+        if topic_ids:
+            filters["related_topics"] = topic_ids
 
     filters["is_latest"] = True
     questions = await crud.search_questions(session, **filters)
@@ -311,6 +311,9 @@ async def update_quiz_question(
         session.add(target_question)
         await session.commit()
 
+    if not has_been_attempted:
+        # The answer keys of quizzes containing the question may have changed
+        await quiz_answer_keys.invalidate_question(session, question_uid)
     await session.refresh(
         target_question,
         attribute_names=[
@@ -361,6 +364,7 @@ async def delete_quiz_question(
         return response.notfound("Quiz question not found")
 
     await session.commit()
+    await quiz_answer_keys.invalidate_question(session, question_uid)
     return response.success("Quiz question deleted")
 
 
@@ -458,6 +462,7 @@ async def retrieve_quizzes(
     is_public: QuizIsPublic,
     private_only: OnlyPrivateQuizzes,
     ordering: QuizOrdering,
+    count: ResultCountMode = "none",
     limit: typing.Annotated[Limit, Le(50)] = 50,
     offset: Offset = 0,
 ):
@@ -480,14 +485,25 @@ async def retrieve_quizzes(
         filters["created_by_id"] = user.id
 
     filters["is_latest"] = True
-    quizzes = await crud.search_quizzes(session, **filters)
-    response_data = [schemas.BaseQuizSchema.model_validate(quiz) for quiz in quizzes]
+    quizzes = await crud.search_quizzes(session, lean=True, **filters)
+    response_data = schemas.quiz_serializer.many(quizzes)
+    total_count = await count_results(
+        session,
+        crud.select_matching_quizzes(**filters),
+        count,
+        page_size=len(quizzes),
+        limit=limit,
+        offset=offset,
+    )
     return response.success(
-        data=paginated_data(
-            request,
-            data=response_data,
-            limit=limit,
-            offset=offset,
+        data=add_result_count(
+            paginated_data(
+                request,
+                data=response_data,
+                limit=limit,
+                offset=offset,
+            ),
+            total_count,
         )
     )
 
@@ -636,7 +652,9 @@ async def add_quiz_questions(
         code=409,
         content="Cannot update quiz due to conflict",
     ):
-        quiz = await crud.retrieve_quiz_by_uid(session, quiz_uid, for_update=True)
+        quiz = await crud.retrieve_quiz_by_uid(
+            session, quiz_uid, for_update=True, load_questions=False
+        )
 
     if not quiz or (quiz.created_by != user and not user.is_staff):
         return response.notfound("Quiz not found")
@@ -658,25 +676,31 @@ async def add_quiz_questions(
                 )
             new_questions.add(question)
 
+        await session.flush()  # Assign IDs to created questions
+        new_question_ids = [question.id for question in new_questions]
         target_quiz = quiz
         has_been_attempted = await crud.check_quiz_has_attempts(session, quiz_uid)
         if has_been_attempted:
-            new_quiz = await crud.copy_quiz(quiz, is_latest=True)
-            target_quiz = new_quiz
-            new_quiz.questions |= new_questions
+            new_quiz_id = await crud.copy_quiz(
+                session, quiz.id, add_question_ids=new_question_ids
+            )
             quiz.is_latest = False
             session.add(quiz)
+            target_quiz = await session.get_one(
+                Quiz, new_quiz_id, options=[lazyload(Quiz.questions)]
+            )
         else:
-            quiz.questions |= new_questions
-
-        target_quiz.difficulty = guess_quiz_difficulty(target_quiz.questions).value  # type: ignore
-        session.add(target_quiz)
+            await crud.update_quiz_questions(
+                session, quiz.id, add_question_ids=new_question_ids
+            )
         await session.commit()
 
+    await quiz_answer_keys.invalidate(quiz_uid, quiz.id, target_quiz.id)
     await session.refresh(
         target_quiz,
         attribute_names=[
             "version",
+            "difficulty",
             "questions_count",
             "created_by",
             "deleted_by",
@@ -727,40 +751,49 @@ async def remove_quiz_questions(
             session,
             uid=quiz_uid,
             for_update=True,
+            load_questions=False,
         )
 
     if not quiz or (quiz.created_by != user and not user.is_staff):
         return response.notfound("Quiz not found")
 
-    removed_questions = set()
+    removed_question_ids = set()
     for question_uid in data.questions:
-        question = await crud.retrieve_question_by_uid(session, question_uid)
+        question = await crud.retrieve_question_in_quiz(
+            session, question_uid=question_uid, quiz_id=quiz.id
+        )
         if not question:
-            return response.notfound(f"Question with uid '{question_uid}' not found")
-        if question not in quiz.questions:
+            if not await crud.retrieve_question_by_uid(session, question_uid):
+                return response.notfound(
+                    f"Question with uid '{question_uid}' not found"
+                )
             return response.notfound(
                 f"Question with uid '{question_uid}' does not belong in quiz with uid '{quiz_uid}'"
             )
-        removed_questions.add(question)
+        removed_question_ids.add(question.id)
 
     target_quiz = quiz
     has_been_attempted = await crud.check_quiz_has_attempts(session, quiz_uid)
     if has_been_attempted:
-        new_quiz = await crud.copy_quiz(quiz, is_latest=True)
-        target_quiz = new_quiz
-        new_quiz.questions -= removed_questions
+        new_quiz_id = await crud.copy_quiz(
+            session, quiz.id, remove_question_ids=removed_question_ids
+        )
         quiz.is_latest = False
         session.add(quiz)
+        target_quiz = await session.get_one(
+            Quiz, new_quiz_id, options=[lazyload(Quiz.questions)]
+        )
     else:
-        quiz.questions -= removed_questions
-
-    target_quiz.difficulty = guess_quiz_difficulty(target_quiz.questions).value  # type: ignore
-    session.add(target_quiz)
+        await crud.update_quiz_questions(
+            session, quiz.id, remove_question_ids=removed_question_ids
+        )
     await session.commit()
+    await quiz_answer_keys.invalidate(quiz_uid, quiz.id, target_quiz.id)
     await session.refresh(
         target_quiz,
         attribute_names=[
             "version",
+            "difficulty",
             "questions_count",
             "created_by",
             "questions",
@@ -1042,12 +1075,9 @@ async def upsert_quiz_attempt_question_answer(
     if attempt.is_expired:
         return response.unprocessable_entity("Quiz attempt duration elapsed")
 
-    question = await crud.retrieve_question_in_quiz(
-        session,
-        question_uid=question_uid,
-        quiz_id=attempt.quiz_id,
-    )
-    if not question:
+    answer_keys = await quiz_answer_keys(session, quiz_uid, attempt.quiz_id)
+    answer_key = answer_keys.get(question_uid)
+    if not answer_key:
         return response.notfound(
             "Question not found. Are you sure it belongs to this quiz?"
         )
@@ -1060,7 +1090,7 @@ async def upsert_quiz_attempt_question_answer(
         question_answer = await crud.retrieve_quiz_attempt_question_answer(
             session,
             quiz_attempt_id=attempt.id,
-            question_id=question.id,
+            question_id=answer_key.id,
             answered_by_id=user.id,
             for_update=True,
         )
@@ -1068,7 +1098,7 @@ async def upsert_quiz_attempt_question_answer(
             question_answer = await crud.create_quiz_attempt_question_answer(
                 session,
                 quiz_attempt_id=attempt.id,
-                question_id=question.id,
+                question_id=answer_key.id,
                 answered_by_id=user.id,
                 **data.model_dump(),
             )
@@ -1082,7 +1112,7 @@ async def upsert_quiz_attempt_question_answer(
 
             if question_answer.is_final:
                 question_answer.is_correct = (
-                    question_answer.answer_index == question.correct_option_index
+                    question_answer.answer_index == answer_key.correct_option_index
                 )
         session.add(question_answer)
         await session.commit()
@@ -1102,6 +1132,115 @@ async def upsert_quiz_attempt_question_answer(
     )
 
 
+@router.put(
+    "/{quiz_uid}/attempts/{attempt_uid}/question-answers",
+    dependencies=[
+        event(
+            "quiz_attempt_question_answers_upsert",
+            target="quiz_attempts",
+            target_uid=fastapi.Path(
+                alias="attempt_uid",
+                alias_priority=1,
+                include_in_schema=False,
+            ),
+            description="Create or update many quiz attempt question answers.",
+        ),
+        permissions_required(
+            "quizzes::*::attempt",
+        ),
+        authentication_required,
+    ],
+    description=(
+        "Create or update many quiz attempt question answers at once. "
+        "Answers to questions that were already locked in are not changed, "
+        "and are reported in `locked`."
+    ),
+    response_model=response.DataSchema[
+        schemas.QuizAttemptQuestionAnswersUpsertResultSchema
+    ],
+    status_code=200,
+    operation_id="upsert_quiz_attempt_question_answers",
+)
+async def upsert_quiz_attempt_question_answers(
+    quiz_uid: QuizUID,
+    attempt_uid: QuizAttemptUID,
+    data: schemas.QuizAttemptQuestionAnswersUpsertSchema,
+    session: AsyncDBSession,
+    user: ActiveUser[Account],
+):
+    attempt = await crud.retrieve_quiz_attempt_for_answering(
+        session,
+        quiz_uid=quiz_uid,
+        attempt_uid=attempt_uid,
+        attempted_by_id=user.id,
+    )
+    if not attempt:
+        return response.notfound("Quiz attempt not found")
+    if attempt.is_submitted:
+        return response.unprocessable_entity("Quiz attempt already submitted")
+    if attempt.is_expired:
+        return response.unprocessable_entity("Quiz attempt duration elapsed")
+
+    # The last answer to a question wins, as a row can only be upserted once per statement
+    answers_by_question = {answer.question: answer for answer in data.answers}
+    answer_keys = await quiz_answer_keys(session, quiz_uid, attempt.quiz_id)
+    unknown = [uid for uid in answers_by_question if uid not in answer_keys]
+    if unknown:
+        return response.notfound(
+            f"Questions not found in this quiz: {', '.join(unknown)}"
+        )
+
+    answers = []
+    for question_uid, answer in answers_by_question.items():
+        answer_key = answer_keys[question_uid]
+        if not 0 <= answer.answer_index < answer_key.options_count:
+            return response.unprocessable_entity(
+                f"Invalid answer index for question {question_uid}"
+            )
+        answers.append(
+            {
+                "question_id": answer_key.id,
+                "answer_index": answer.answer_index,
+                "is_final": answer.is_final,
+                "is_correct": answer.is_final
+                and answer.answer_index == answer_key.correct_option_index,
+            }
+        )
+
+    async with capture.capture(
+        OperationalError,
+        code=409,
+        content="Answers could not be registered due to conflict.",
+    ):
+        saved_question_ids = set(
+            await crud.upsert_quiz_attempt_question_answers(
+                session,
+                quiz_attempt_id=attempt.id,
+                answered_by_id=user.id,
+                answers=answers,
+            )
+        )
+        await session.commit()
+
+    # Attempted questions and score are updated by database triggers
+    await session.refresh(attempt, attribute_names=["attempted_questions", "score"])
+    saved, locked = [], []
+    for question_uid in answers_by_question:
+        if answer_keys[question_uid].id in saved_question_ids:
+            saved.append(question_uid)
+        else:
+            locked.append(question_uid)
+    return response.success(
+        "Quiz question answers updated!",
+        data=schemas.QuizAttemptQuestionAnswersUpsertResultSchema(
+            saved=saved,
+            locked=locked,
+            attempted_questions=attempt.attempted_questions,
+            score=attempt.score,
+        ),
+    )
+
+
 @router.post(
     "/{quiz_uid}/attempts/{attempt_uid}/submit",
     dependencies=[
@@ -163,6 +163,16 @@ class Question(mixins.TimestampMixin, models.Model):
         nullable=True,
         doc="Full-text search vector for the question.",
     )
+    term_ids: orm.Mapped[typing.List[int]] = orm.mapped_column(
+        sa.ARRAY(sa.Integer, dimensions=1),
+        server_default=sa.text("'{}'"),
+        doc="IDs of the related terms. Maintained by database triggers.",
+    )
+    topic_ids: orm.Mapped[typing.List[int]] = orm.mapped_column(
+        sa.ARRAY(sa.Integer, dimensions=1),
+        server_default=sa.text("'{}'"),
+        doc="IDs of the related topics. Maintained by database triggers.",
+    )
     created_by_id: orm.Mapped[typing.Optional[uuid.UUID]] = orm.mapped_column(
         sa.UUID,
         sa.ForeignKey("accounts__client_accounts.id", ondelete="SET NULL"),
@@ -228,6 +238,8 @@ class Question(mixins.TimestampMixin, models.Model):
         sa.Index(
             "ix_question_search_tsvector", "search_tsvector", postgresql_using="gin"
         ),
+        sa.Index("ix_question_term_ids", "term_ids", postgresql_using="gin"),
+        sa.Index("ix_question_topic_ids", "topic_ids", postgresql_using="gin"),
     )
 
     @orm.validates("options")
@@ -420,6 +432,25 @@ class Quiz(mixins.TimestampMixin, models.Model):
         return self.duration is not None
 
 
+class QuizVersionCounter(models.Model):
+    """Model for the last version number assigned to each quiz (UID)."""
+
+    __auto_tablename__ = True
+
+    uid: orm.Mapped[typing.Annotated[str, MaxLen(50)]] = orm.mapped_column(
+        sa.String(50),
+        unique=True,
+        doc="Unique ID of the quiz.",
+    )
+    last_version: orm.Mapped[int] = orm.mapped_column(
+        sa.Integer,
+        nullable=False,
+        default=0,
+        server_default=sa.text("0"),
+        doc="Last version number assigned to the quiz.",
+    )
+
+
 class QuizAttempt(mixins.TimestampMixin, models.Model):
     """Model for quiz attempts."""
 
@@ -3,6 +3,7 @@ import pydantic
 from annotated_types import Interval, MaxLen
 
 from helpers.generics.pydantic import partial
+from api.serialization import RowSerializer, isoformat
 from apps.quizzes.models import QuestionDifficulty, QuizDifficulty
 from apps.search.schemas import BaseTermSchema, TopicSchema
 from apps.accounts.schemas import BaseAccountSchema
@@ -330,6 +331,42 @@ class QuizAttemptQuestionAnswerUpdateSchema(QuizAttemptQuestionAnswerBaseSchema)
     pass
 
 
+class QuizAttemptQuestionAnswerBulkItemSchema(QuizAttemptQuestionAnswerBaseSchema):
+    """Quiz attempt question answer, in a bulk upsert."""
+
+    question: typing.Annotated[pydantic.StrictStr, MaxLen(50)] = pydantic.Field(
+        description="UID of the question answered",
+    )
+
+
+class QuizAttemptQuestionAnswersUpsertSchema(pydantic.BaseModel):
+    """Quiz attempt question answers bulk upsert schema."""
+
+    answers: typing.List[QuizAttemptQuestionAnswerBulkItemSchema] = pydantic.Field(
+        description="Answers to the quiz questions. If a question is answered more than once, the last answer is used",
+        min_length=1,
+        max_length=1000,
+    )
+
+
+class QuizAttemptQuestionAnswersUpsertResultSchema(pydantic.BaseModel):
+    """Quiz attempt question answers bulk upsert result schema. For serialization purposes only."""
+
+    saved: typing.List[pydantic.StrictStr] = pydantic.Field(
+        description="UIDs of the questions whose answers were saved",
+    )
+    locked: typing.List[pydantic.StrictStr] = pydantic.Field(
+        description="UIDs of the questions whose answers were not saved, as they were already locked in (final)",
+    )
+    attempted_questions: pydantic.StrictInt = pydantic.Field(
+        description="Number of questions attempted in the quiz attempt",
+    )
+    score: typing.Optional[pydantic.StrictInt] = pydantic.Field(
+        default=None,
+        description="Quiz attempt score",
+    )
+
+
 class BaseQuizAttemptQuestionAnswerSchema(QuizAttemptQuestionAnswerBaseSchema):
     """Base Quiz attempt question answer schema. For serialization purposes only."""
 
@@ -439,3 +476,25 @@ class QuizAttemptSchema(BaseQuizAttemptSchema):
     question_answers: typing.List[QuizAttemptQuestionAnswerSchema] = pydantic.Field(
         description="Quiz attempt question answers",
     )
+
+
+quiz_serializer = RowSerializer(
+    {
+        "title": None,
+        "description": None,
+        "duration": None,
+        "is_public": None,
+        "is_latest": None,
+        "metadata": None,
+        "uid": None,
+        "version": None,
+        "questions_count": None,
+        "difficulty": None,
+        "is_timed": None,
+        "created_at": isoformat,
+        "updated_at": isoformat,
+        "deleted_at": isoformat,
+    },
+    sources={"metadata": "extradata"},
+)
+"""Serializes lean quiz rows (see `crud.quiz_projection`) in the shape of `BaseQuizSchema`"""
@@ -0,0 +1,118 @@
+import asyncio
+import bisect
+import logging
+import time
+import typing
+import sqlalchemy as sa
+
+from helpers.fastapi.config import settings
+from helpers.fastapi.sqlalchemy.setup import get_async_session
+from .models import Term
+from . import crud
+
+
+logger = logging.getLogger(__name__)
+
+
+class TermNameIndex:
+    """
+    Per-worker, in-memory sorted index of (verified) term names,
+    for prefix lookups without a database round trip.
+
+    The index is loaded on first use, and reloaded in the background once
+    it is older than `ttl` seconds, while lookups keep using the old index.
+    """
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        """
+        Create a new term name index.
+
+        :param ttl: Number of seconds after which the index is reloaded
+        """
+        self.ttl = ttl
+        self._keys: typing.List[str] = []
+        self._entries: typing.List[typing.Tuple[str, str]] = []
+        self._loaded_at: typing.Optional[float] = None
+        self._load_lock: typing.Optional[asyncio.Lock] = None
+        self._reload_task: typing.Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.ttl
+        )
+
+    async def load(self) -> None:
+        """Load the term names from the database, replacing the current index."""
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            name_lower = crud.term_name_lower()
+            async with get_async_session() as session:
+                result = await session.execute(
+                    sa.select(name_lower, Term.uid, Term.name)
+                    .where(~Term.is_deleted, Term.verified.is_(True))
+                    .order_by(name_lower)
+                )
+                rows = result.all()
+            # Swap both lists at once, so lookups never see a partial index
+            self._keys, self._entries = (
+                [row[0] for row in rows],
+                [(row[1], row[2]) for row in rows],
+            )
+            self._loaded_at = time.monotonic()
+
+    async def _reload(self) -> None:
+        try:
+            await self.load()
+        except Exception as exc:
+            logger.error(f"Failed to reload term name index: {exc}")
+
+    async def ready(self) -> "TermNameIndex":
+        """
+        Return the index, loading it if it was never loaded, or
+        scheduling a background reload if it is stale.
+        """
+        if self._loaded_at is None:
+            await self.load()
+        elif self.is_stale and (
+            self._reload_task is None or self._reload_task.done()
+        ):
+            self._reload_task = asyncio.create_task(self._reload())
+        return self
+
+    def invalidate(self) -> None:
+        """Mark the index as stale, so it is reloaded on next use."""
+        if self._loaded_at is not None:
+            self._loaded_at = float("-inf")
+
+    def lookup(
+        self, prefix: str, limit: int = 10
+    ) -> typing.List[typing.Dict[str, str]]:
+        """
+        Return the UIDs and names of terms whose names start with the given prefix,
+        ordered by name.
+
+        :param prefix: The prefix to match term names against, case insensitively
+        :param limit: The maximum number of terms to return
+        """
+        prefix = prefix.lower()
+        keys, entries = self._keys, self._entries
+        start = bisect.bisect_left(keys, prefix)
+        results = []
+        for index in range(start, min(start + limit, len(keys))):
+            if not keys[index].startswith(prefix):
+                break
+            uid, name = entries[index]
+            results.append({"uid": uid, "name": name})
+        return results
+
+
+term_name_index = TermNameIndex(ttl=settings.TERM_AUTOCOMPLETE_INDEX_TTL)
+
+
+__all__ = ["TermNameIndex", "term_name_index"]
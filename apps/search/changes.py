@@ -0,0 +1,71 @@
+import typing
+
+from helpers.fastapi.sqlalchemy.setup import get_async_session
+from api.caching import invalidate_cache
+from api.changefeed import ChangeEvent, change_feed, claim_change_events
+from . import crud
+from .autocomplete import term_name_index
+from .engine import glossary_search_index
+from .lookups import term_ids_lookup, topic_ids_lookup
+from .models import Term, Topic, TermSource
+
+
+NAMESPACES_BY_TABLE = {
+    Term.__tablename__: ("search", "term_autocomplete"),
+    Topic.__tablename__: ("topics_list",),
+    TermSource.__tablename__: ("term_sources_list",),
+}
+"""Cache namespaces listing rows of each glossary table"""
+
+
+@change_feed.register(
+    Term.__tablename__,
+    Topic.__tablename__,
+    TermSource.__tablename__,
+)
+async def invalidate_cached_responses(events: typing.List[ChangeEvent]) -> None:
+    """
+    Invalidate the cached responses that included, or may now include, the changed rows.
+
+    Changes are notified however they are made (endpoints, commands, or directly
+    in the database), so responses cached by every worker are kept fresh.
+    When the change feed is enabled, endpoints leave invalidation to this handler.
+
+    Every worker receives the changes, but cached responses are shared (Redis),
+    so only the worker that claims a change invalidates for it. Other workers
+    drop their in-memory copies when the invalidation is published.
+    """
+    events = await claim_change_events(events, name="invalidate_cached_responses")
+    uids = {event.uid for event in events if event.uid}
+    # Responses of the topics, sources and relatives of changed terms
+    # may now include the terms, so are not tagged with their UIDs
+    term_uids = {
+        event.uid
+        for event in events
+        if event.uid and event.table == Term.__tablename__
+    }
+    if term_uids:
+        async with get_async_session() as session:
+            uids |= await crud.retrieve_term_related_uids(session, term_uids)
+    namespaces = {
+        namespace
+        for event in events
+        if event.operation != "UPDATE" or event.table == Term.__tablename__
+        for namespace in NAMESPACES_BY_TABLE[event.table]
+    }
+    await invalidate_cache(*uids, namespaces=namespaces)
+
+
+@change_feed.register(Term.__tablename__, Topic.__tablename__)
+async def rebuild_in_memory_indexes(events: typing.List[ChangeEvent]) -> None:
+    """Rebuild the in-memory term indexes, and clear the cached term/topic IDs."""
+    term_name_index.invalidate()
+    glossary_search_index.invalidate()
+    tables = {event.table for event in events}
+    if Term.__tablename__ in tables:
+        term_ids_lookup.clear()
+    if Topic.__tablename__ in tables:
+        topic_ids_lookup.clear()
+
+
+__all__ = ["invalidate_cached_responses", "rebuild_in_memory_indexes"]
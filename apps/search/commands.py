@@ -1,13 +1,26 @@
 import typing
 import csv
+import concurrent.futures
+import io
+import itertools
 import click
 from pathlib import Path
 from urllib3.util.url import parse_url
+import sqlalchemy as sa
 from sqlalchemy.orm import Session
 
 from helpers.fastapi import commands
-from helpers.fastapi.sqlalchemy.setup import get_session
-from .models import Term, Topic, TermSource
+from helpers.fastapi.utils.sync import async_to_sync
+from helpers.fastapi.sqlalchemy.setup import get_session, get_async_session
+from .models import (
+    Term,
+    Topic,
+    TermSource,
+    TermToTopicAssociation,
+    generate_term_uid,
+    generate_topic_uid,
+)
+from . import crud, rollups
 
 
 def get_or_create_topic_by_name(
@@ -73,6 +86,26 @@ def get_or_create_term_source_by_name(
     return term_source
 
 
+def get_source_url(term_url: typing.Optional[str]) -> typing.Optional[str]:
+    """
+    Derive the URL of a term's source (scheme and host) from the term's URL
+
+    :param term_url: The URL of the term
+    :return: The URL of the source, if it can be derived
+    """
+    if not term_url:
+        return None
+    try:
+        parsed_url = parse_url(term_url)
+    except Exception:
+        return None
+    if not (parsed_url.scheme or parsed_url.netloc):
+        return None
+    return (f"{parsed_url.scheme}://" if parsed_url.scheme else "") + (
+        parsed_url.netloc or ""
+    )
+
+
 def row_to_term(
     db_session: Session,
     row: typing.Dict,
@@ -80,20 +113,7 @@ def row_to_term(
     verified: bool = False,
 ) -> Term:
     """Return a Term instance from a CSV row"""
-    term_url = row.get("URL", None)
-    if term_url:
-        try:
-            parsed_url = parse_url(term_url)
-            if parsed_url.scheme or parsed_url.netloc:
-                source_url = (
-                    f"{parsed_url.scheme}://" if parsed_url.scheme else ""
-                ) + (parsed_url.netloc or "")
-            else:
-                source_url = None
-        except Exception:
-            source_url = None
-    else:
-        source_url = None
+    source_url = get_source_url(row.get("URL", None))
 
     if source_name:
         term_source = get_or_create_term_source_by_name(
@@ -171,9 +191,406 @@ def load_terms_from_csv_and_save_to_db(
     return term_count
 
 
+class TermRow(typing.NamedTuple):
+    """A term, as read from a CSV row, for bulk loading"""
+
+    name: str
+    definition: str
+    grammatical_label: typing.Optional[str]
+    source_url: typing.Optional[str]
+    topics: typing.Tuple[str, ...]
+
+
+def read_term_rows(csv_file: Path) -> typing.Iterator[TermRow]:
+    """
+    Stream the terms in a CSV file
+
+    :param csv_file: The CSV file to read
+    :return: An iterator of the terms in the file
+    """
+    with open(csv_file, "r", encoding="utf-8") as file:
+        reader = csv.DictReader(file, skipinitialspace=True)
+        if not {"Term", "Definition", "Topic"}.issubset(reader.fieldnames or []):
+            raise click.BadParameter(
+                f"CSV file '{csv_file}' must contain 'Term', 'Definition', and 'Topic' columns"
+            )
+
+        for row in reader:
+            name = (row["Term"] or "").strip()
+            if not name:
+                continue
+            yield TermRow(
+                name=name,
+                definition=row["Definition"],
+                grammatical_label=row.get("Grammatical Label", None) or None,
+                source_url=get_source_url(row.get("URL", None)),
+                topics=tuple(
+                    topic_name.strip()
+                    for topic_name in (row["Topic"] or "").split(",")
+                    if topic_name.strip()
+                ),
+            )
+
+
+def dedupe_term_rows(rows: typing.Iterable[TermRow]) -> typing.Dict[str, TermRow]:
+    """
+    Dedupe terms by their (case-insensitive) names.
+
+    The first occurrence of a term wins, but the topics of
+    all occurrences of the term are merged.
+
+    :param rows: The terms to dedupe
+    :return: A mapping of lower-cased term names to the deduped terms
+    """
+    terms: typing.Dict[str, TermRow] = {}
+    for row in rows:
+        key = row.name.lower()
+        existing = terms.get(key)
+        if existing is None:
+            terms[key] = row
+        elif row.topics:
+            topics = dict.fromkeys(existing.topics + row.topics)
+            terms[key] = existing._replace(topics=tuple(topics))
+    return terms
+
+
+def copy_rows(
+    cursor: typing.Any,
+    table: str,
+    columns: typing.Sequence[str],
+    rows: typing.Iterable[typing.Sequence[typing.Any]],
+) -> None:
+    """
+    Stage rows into a table using PostgreSQL's `COPY`
+
+    :param cursor: A (psycopg2) DBAPI cursor
+    :param table: The name of the table to copy the rows into
+    :param columns: The columns of the table the row values map to
+    :param rows: The rows to copy. `None` values are copied as NULL
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+
+def merge_topics(
+    db_session: Session, topic_names: typing.Iterable[str]
+) -> typing.Dict[str, int]:
+    """
+    Save topics that do not exist yet, in bulk.
+
+    Topics are matched to existing ones by their case-insensitive names.
+
+    :param db_session: The database session to use
+    :param topic_names: The names of the topics
+    :return: A mapping of the lower-cased topic names to the topic IDs
+    """
+    names: typing.Dict[str, str] = {}
+    for name in topic_names:
+        names.setdefault(name.lower(), name)
+    if not names:
+        return {}
+
+    cursor = db_session.connection().connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE TEMPORARY TABLE _load_topics (uid text, name text) ON COMMIT DROP"
+        )
+        copy_rows(
+            cursor,
+            "_load_topics",
+            ("uid", "name"),
+            ((generate_topic_uid(), name) for name in names.values()),
+        )
+    finally:
+        cursor.close()
+
+    db_session.execute(
+        sa.text(
+            f"""
+            INSERT INTO {Topic.__tablename__} (uid, name, created_at, updated_at)
+            SELECT s.uid, s.name, now(), now()
+            FROM _load_topics s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {Topic.__tablename__} t WHERE lower(t.name) = lower(s.name)
+            )
+            ON CONFLICT DO NOTHING
+            """
+        )
+    )
+    result = db_session.execute(
+        sa.text(
+            f"""
+            SELECT DISTINCT ON (lower(t.name)) lower(t.name), t.id
+            FROM {Topic.__tablename__} t
+            WHERE lower(t.name) IN (SELECT lower(name) FROM _load_topics)
+            ORDER BY lower(t.name), t.id
+            """
+        )
+    )
+    db_session.execute(sa.text("DROP TABLE _load_topics"))
+    return {key: topic_id for key, topic_id in result.all()}
+
+
+def merge_terms(
+    db_session: Session,
+    terms: typing.Iterable[TermRow],
+    topic_ids: typing.Mapping[str, int],
+    source_id: typing.Optional[int] = None,
+    verified: bool = True,
+) -> int:
+    """
+    Save terms that do not exist yet, and associate terms with their topics, in bulk.
+
+    Terms are matched to existing ones by their case-insensitive names.
+    Existing terms are only associated with any new topics.
+
+    :param db_session: The database session to use
+    :param terms: The (deduped) terms to save
+    :param topic_ids: A mapping of lower-cased topic names to topic IDs,
+        as returned by `merge_topics`
+    :param source_id: The ID of the source of the terms
+    :param verified: Whether new terms should be marked as verified
+    :return: The number of new terms saved
+    """
+    terms = list(terms)
+    if not terms:
+        return 0
+
+    cursor = db_session.connection().connection.cursor()
+    try:
+        cursor.execute(
+            """
+            CREATE TEMPORARY TABLE _load_terms (
+                uid text, name text, definition text, grammatical_label text
+            ) ON COMMIT DROP;
+            CREATE TEMPORARY TABLE _load_term_topics (
+                term_name text, topic_id integer
+            ) ON COMMIT DROP;
+            """
+        )
+        copy_rows(
+            cursor,
+            "_load_terms",
+            ("uid", "name", "definition", "grammatical_label"),
+            (
+                (generate_term_uid(), term.name, term.definition, term.grammatical_label)
+                for term in terms
+            ),
+        )
+        copy_rows(
+            cursor,
+            "_load_term_topics",
+            ("term_name", "topic_id"),
+            (
+                (term.name, topic_ids[topic_name.lower()])
+                for term in terms
+                for topic_name in term.topics
+                if topic_name.lower() in topic_ids
+            ),
+        )
+    finally:
+        cursor.close()
+
+    result = db_session.execute(
+        sa.text(
+            f"""
+            INSERT INTO {Term.__tablename__} (
+                uid, name, definition, grammatical_label,
+                verified, source_id, created_at, updated_at
+            )
+            SELECT
+                s.uid, s.name, s.definition, s.grammatical_label,
+                :verified, CAST(:source_id AS integer), now(), now()
+            FROM _load_terms s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {Term.__tablename__} t WHERE lower(t.name) = lower(s.name)
+            )
+            ON CONFLICT DO NOTHING
+            """
+        ),
+        {"verified": verified, "source_id": source_id},
+    )
+    term_count = result.rowcount  # type: ignore
+    db_session.execute(
+        sa.text(
+            f"""
+            WITH term_ids AS (
+                SELECT DISTINCT ON (lower(t.name)) lower(t.name) AS key, t.id
+                FROM {Term.__tablename__} t
+                WHERE lower(t.name) IN (SELECT lower(name) FROM _load_terms)
+                ORDER BY lower(t.name), t.id
+            )
+            INSERT INTO {TermToTopicAssociation.__tablename__} (term_id, topic_id)
+            SELECT DISTINCT term_ids.id, s.topic_id
+            FROM _load_term_topics s
+            JOIN term_ids ON term_ids.key = lower(s.term_name)
+            ON CONFLICT (term_id, topic_id) DO NOTHING
+            """
+        )
+    )
+    db_session.execute(sa.text("DROP TABLE _load_terms, _load_term_topics"))
+    return term_count
+
+
+def get_bulk_term_source_id(
+    db_session: Session,
+    terms: typing.Iterable[TermRow],
+    data_source: typing.Optional[str] = None,
+) -> typing.Optional[int]:
+    """
+    Get or create the source of bulk loaded terms
+
+    :param db_session: The database session to use
+    :param terms: The terms being loaded. The source URL is derived from the first term URL
+    :param data_source: Name of the source of the terms
+    :return: The ID of the source, if any
+    """
+    if not data_source:
+        return None
+    source_url = next((term.source_url for term in terms if term.source_url), None)
+    return get_or_create_term_source_by_name(
+        db_session, name=data_source, url=source_url
+    ).id
+
+
+def bulk_load_terms_and_save_to_db(
+    db_session: Session,
+    csv_files: typing.Iterable[Path],
+    data_source: typing.Optional[str] = None,
+    verified: bool = True,
+) -> int:
+    """
+    Load petroleum terms from CSV files and save them to the database, in bulk.
+
+    All rows are read and deduped in memory, staged into temporary tables
+    using `COPY`, and then merged into the terms, topics and term-topic
+    association tables using a single `INSERT ... ON CONFLICT` statement each.
+
+    :param db_session: The database session to use
+    :param csv_files: The CSV files to load terms from
+    :param data_source: Name of the source of the terms
+    :param verified: Whether new terms should be marked as verified
+    :return: The number of new terms saved
+    """
+    terms = dedupe_term_rows(
+        itertools.chain.from_iterable(
+            read_term_rows(csv_file) for csv_file in csv_files
+        )
+    )
+    if not terms:
+        return 0
+
+    source_id = get_bulk_term_source_id(db_session, terms.values(), data_source)
+    topic_ids = merge_topics(
+        db_session,
+        (topic_name for term in terms.values() for topic_name in term.topics),
+    )
+    term_count = merge_terms(
+        db_session,
+        terms.values(),
+        topic_ids=topic_ids,
+        source_id=source_id,
+        verified=verified,
+    )
+    db_session.commit()
+    return term_count
+
+
+def read_term_rows_list(csv_file: Path) -> typing.List[TermRow]:
+    """Read all the terms in a CSV file. Used to parse files in worker processes."""
+    return list(read_term_rows(csv_file))
+
+
+def load_terms_from_dir_and_save_to_db(
+    directory: Path,
+    data_source: typing.Optional[str] = None,
+    verified: bool = True,
+    workers: typing.Optional[int] = None,
+    writers: int = 4,
+    batch_size: int = 5000,
+) -> int:
+    """
+    Load petroleum terms from all CSV files in a directory and save them to the database.
+
+    CSV files are parsed in a process pool. The parsed terms are deduped, their
+    topics and source are saved once up front, and terms are then written
+    in batches over a bounded number of concurrent writer connections.
+
+    :param directory: The directory containing the CSV files
+    :param data_source: Name of the source of the terms
+    :param verified: Whether new terms should be marked as verified
+    :param workers: Number of processes to parse CSV files with. Defaults to the number of CPUs
+    :param writers: Maximum number of database connections to write terms with
+    :param batch_size: Number of terms to write per batch
+    :return: The number of new terms saved
+    """
+    csv_files = sorted(directory.glob("*.csv"))
+    if not csv_files:
+        raise click.BadParameter(f"No CSV files found in '{directory}'")
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # `map` preserves file order, so the first occurrence of a term
+        # wins during deduplication, as it does in bulk mode.
+        with click.progressbar(
+            executor.map(read_term_rows_list, csv_files),
+            length=len(csv_files),
+            label=f"Parsing terms from {len(csv_files)} files",
+        ) as parsed_files:
+            terms = dedupe_term_rows(
+                itertools.chain.from_iterable(parsed_files)
+            )
+    if not terms:
+        return 0
+
+    # Topics and the source are shared across all files,
+    # so they are saved once, and their IDs reused by all writers.
+    with get_session() as db_session:  # type: ignore
+        source_id = get_bulk_term_source_id(db_session, terms.values(), data_source)
+        topic_ids = merge_topics(
+            db_session,
+            (topic_name for term in terms.values() for topic_name in term.topics),
+        )
+        db_session.commit()
+
+    def write_batch(batch: typing.List[TermRow]) -> int:
+        with get_session() as db_session:  # type: ignore
+            term_count = merge_terms(
+                db_session,
+                batch,
+                topic_ids=topic_ids,
+                source_id=source_id,
+                verified=verified,
+            )
+            db_session.commit()
+        return term_count
+
+    rows = list(terms.values())
+    batches = [
+        rows[index : index + batch_size] for index in range(0, len(rows), batch_size)
+    ]
+    term_count = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=writers) as executor:
+        futures = [executor.submit(write_batch, batch) for batch in batches]
+        with click.progressbar(
+            length=len(rows), label=f"Writing terms with {writers} connections"
+        ) as progress:
+            for future, batch in zip(futures, batches):
+                term_count += future.result()
+                progress.update(len(batch))
+    return term_count
+
+
 @commands.register("load_terms")
 @click.argument(
-    "csv_file", type=click.Path(exists=True, path_type=Path, dir_okay=False)
+    "csv_files",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, path_type=Path, dir_okay=False),
 )
 @click.option(
     "--source",
@@ -186,22 +603,39 @@ def load_terms_from_csv_and_save_to_db(
     "-b",
     type=int,
     default=1000,
-    help="Number of terms to commit at once",
+    help="Number of terms to commit at once. Ignored in bulk mode",
+)
+@click.option(
+    "--bulk",
+    is_flag=True,
+    default=False,
+    help="Load all the CSV files at once, using COPY and set-based merges",
 )
 def load_terms(
-    csv_file: Path,
+    csv_files: typing.Tuple[Path, ...],
     data_source: typing.Optional[str] = None,
     batch_size: int = 1000,
+    bulk: bool = False,
 ):
-    """Load petroleum terms from a CSV file into the database."""
+    """Load petroleum terms from CSV files into the database."""
     try:
         with get_session() as db_session: # type: ignore
-            term_count = load_terms_from_csv_and_save_to_db(
-                db_session=db_session,
-                csv_file=csv_file,
-                batch_size=batch_size,
-                data_source=data_source,
-            )
+            if bulk:
+                click.echo(f"Bulk loading terms from {len(csv_files)} file(s)...")
+                term_count = bulk_load_terms_and_save_to_db(
+                    db_session=db_session,
+                    csv_files=csv_files,
+                    data_source=data_source,
+                )
+            else:
+                term_count = 0
+                for csv_file in csv_files:
+                    term_count += load_terms_from_csv_and_save_to_db(
+                        db_session=db_session,
+                        csv_file=csv_file,
+                        batch_size=batch_size,
+                        data_source=data_source,
+                    )
         click.echo(
             click.style(f"\nSuccessfully loaded {term_count} new terms", fg="green")
         )
@@ -212,4 +646,166 @@ def load_terms(
         raise click.Abort()
 
 
-__all__ = ["load_terms"]
+@commands.register("load_terms_dir")
+@click.argument(
+    "directory", type=click.Path(exists=True, path_type=Path, file_okay=False)
+)
+@click.option(
+    "--source",
+    "-s",
+    "data_source",
+    help="Name of the data source",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=None,
+    help="Number of processes to parse CSV files with. Defaults to the number of CPUs",
+)
+@click.option(
+    "--writers",
+    type=int,
+    default=4,
+    help="Maximum number of database connections to write terms with",
+)
+@click.option(
+    "--batch-size",
+    "-b",
+    type=int,
+    default=5000,
+    help="Number of terms to write per batch",
+)
+def load_terms_dir(
+    directory: Path,
+    data_source: typing.Optional[str] = None,
+    workers: typing.Optional[int] = None,
+    writers: int = 4,
+    batch_size: int = 5000,
+):
+    """Load petroleum terms from all CSV files in a directory into the database."""
+    try:
+        term_count = load_terms_from_dir_and_save_to_db(
+            directory=directory,
+            data_source=data_source,
+            workers=workers,
+            writers=max(writers, 1),
+            batch_size=max(batch_size, 1),
+        )
+        click.echo(
+            click.style(f"\nSuccessfully loaded {term_count} new terms", fg="green")
+        )
+    except Exception as exc:
+        click.echo(
+            click.style(f"\nError loading terms: {str(exc)}", fg="red"), err=True
+        )
+        raise click.Abort()
+
+
+@commands.register("build_related_terms")
+@click.option(
+    "--limit",
+    "-l",
+    type=int,
+    default=10,
+    help="Maximum number of mentioning terms to relate to each term",
+)
+@click.option(
+    "--batch-size",
+    "-b",
+    type=int,
+    default=500,
+    help="Number of terms to build related terms for in a single statement",
+)
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    default=False,
+    help="Discard all existing related terms before building",
+)
+@async_to_sync
+async def build_related_terms(
+    limit: int = 10,
+    batch_size: int = 500,
+    rebuild: bool = False,
+):
+    """
+    Precompute related terms for all terms in the glossary.
+
+    Run this after loading terms, so that related terms
+    never have to be computed when terms are retrieved.
+    """
+    association_count = 0
+    async with get_async_session() as session:
+        if rebuild:
+            await crud.clear_related_terms(session)
+
+        result = await session.execute(
+            sa.select(Term.id).where(~Term.is_deleted).order_by(Term.id)
+        )
+        term_ids = list(result.scalars().all())
+        with click.progressbar(
+            length=len(term_ids),
+            label="Building related terms",
+        ) as progress:
+            for index in range(0, len(term_ids), batch_size):
+                batch = term_ids[index : index + batch_size]
+                association_count += await crud.build_related_terms(
+                    session, term_ids=batch, limit=limit
+                )
+                await session.commit()
+                progress.update(len(batch))
+
+    click.echo(
+        click.style(
+            f"\nSuccessfully saved {association_count} new related term associations",
+            fg="green",
+        )
+    )
+
+
+@commands.register("rollup_search_metrics")
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    default=False,
+    help="Discard all existing search metrics rollups before building",
+)
+@async_to_sync
+async def rollup_search_metrics(rebuild: bool = False):
+    """
+    Build the hourly and daily search metrics rollups, up to the last whole hour.
+
+    The application keeps the rollups up to date in the background. Run this to
+    build them for existing search records, or with `--rebuild` after search records
+    have been changed or removed.
+    """
+    hours = 0
+    if rebuild:
+        async with get_async_session() as session:
+            await crud.clear_search_rollups(session)
+            await session.commit()
+
+    while True:
+        async with get_async_session() as session:
+            rolled_up = await rollups.rollup_search_metrics(session)
+            await session.commit()
+        if not rolled_up:
+            break
+        hours += rolled_up
+        click.echo(f"Rolled up {hours} hours of searches")
+
+    click.echo(
+        click.style(
+            f"\nSuccessfully rolled up {hours} hours of searches",
+            fg="green",
+        )
+    )
+
+
+__all__ = [
+    "load_terms",
+    "load_terms_dir",
+    "build_related_terms",
+    "rollup_search_metrics",
+]
@@ -1,15 +1,19 @@
-from contextlib import asynccontextmanager
+import asyncio
+import functools
 import typing
 import re
 import datetime
 import uuid
 import sqlalchemy as sa
+from sqlalchemy import orm
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert as pg_insert
 
 from apps.accounts.models import Account
 from apps.clients.models import APIClient
 from helpers.fastapi.utils import timezone
+from helpers.fastapi.sqlalchemy.setup import get_async_session
 from helpers.fastapi.sqlalchemy.utils import (
     text_to_tsvector,
     text_to_tsquery,
@@ -20,9 +24,20 @@ from .models import (
     SearchRecord,
     TermSource,
     Topic,
-    TermView,
+    TermToTopicAssociation,
+    TermViewCount,
     SearchRecordToTopicAssociation,
+    RelatedTermAssociation,
+    SearchRollupMixin,
+    SearchCountRollup,
+    SearchQueryRollup,
+    SearchWordRollup,
+    SearchTopicRollup,
+    generate_search_record_uid,
 )
+from .ddls import SEARCH_CONFIG
+from .engine import glossary_search_index
+from .query import TermCursor
 from .schemas import AccountSearchMetricsSchema, GlobalSearchMetricsSchema
 
 
@@ -39,23 +54,141 @@ async def create_term(session: AsyncSession, **create_kwargs) -> Term:
     return term
 
 
+def _json_object(*columns: sa.ColumnElement[typing.Any]) -> sa.ColumnElement:
+    """Build a JSON object from columns, keyed by the column names."""
+    return sa.func.json_build_object(
+        *(part for column in columns for part in (column.key, column))
+    )
+
+
+def term_projection() -> typing.List[sa.ColumnElement[typing.Any]]:
+    """
+    Return the columns of a lean term projection.
+
+    The projection has the term's own columns, plus its source, topics and
+    relatives aggregated as JSON by correlated sub-selects. So terms are fetched
+    with everything `TermSchema` needs in a single query, instead of a query
+    per eager loaded relationship.
+    """
+    related_term = orm.aliased(Term, name="related_term")
+    source = (
+        sa.select(
+            _json_object(
+                TermSource.uid,
+                TermSource.name,
+                TermSource.url,
+                TermSource.description,
+                TermSource.created_at,
+                TermSource.updated_at,
+            )
+        )
+        .where(TermSource.id == Term.source_id, ~TermSource.is_deleted)
+        .scalar_subquery()
+    )
+    topics = (
+        sa.select(
+            sa.func.coalesce(
+                sa.func.json_agg(
+                    _json_object(
+                        Topic.uid,
+                        Topic.name,
+                        Topic.description,
+                        Topic.created_at,
+                        Topic.updated_at,
+                    )
+                ),
+                sa.text("'[]'::json"),
+            )
+        )
+        .select_from(TermToTopicAssociation)
+        .join(Topic, Topic.id == TermToTopicAssociation.topic_id)
+        .where(TermToTopicAssociation.term_id == Term.id, ~Topic.is_deleted)
+        .scalar_subquery()
+    )
+    relatives = (
+        sa.select(
+            sa.func.coalesce(
+                sa.func.json_agg(
+                    _json_object(
+                        related_term.uid,
+                        related_term.name,
+                        related_term.definition,
+                        related_term.grammatical_label,
+                        related_term.verified,
+                        related_term.created_at,
+                        related_term.updated_at,
+                    )
+                ),
+                sa.text("'[]'::json"),
+            )
+        )
+        .select_from(RelatedTermAssociation)
+        .join(related_term, related_term.id == RelatedTermAssociation.related_term_id)
+        .where(RelatedTermAssociation.term_id == Term.id, ~related_term.is_deleted)
+        .scalar_subquery()
+    )
+    return [
+        Term.id,
+        Term.uid,
+        Term.name,
+        Term.definition,
+        Term.grammatical_label,
+        Term.verified,
+        Term.created_at,
+        Term.updated_at,
+        sa.type_coerce(source, sa.JSON).label("source"),
+        sa.type_coerce(topics, sa.JSON).label("topics"),
+        sa.type_coerce(relatives, sa.JSON).label("relatives"),
+    ]
+
+
+def select_terms(
+    *columns: sa.ColumnElement[typing.Any], lean: bool = False
+) -> sa.Select:
+    """
+    Select terms, as `Term` instances with their topics, relatives and source
+    eager loaded, or as lean projection rows (see `term_projection`).
+
+    :param columns: Additional columns to select
+    :param lean: Whether to select lean projection rows
+    """
+    if lean:
+        return sa.select(*term_projection(), *columns)
+    return sa.select(Term, *columns).options(
+        selectinload(Term.topics.and_(~Topic.is_deleted)),
+        selectinload(Term.relatives.and_(~Term.is_deleted)),
+        joinedload(Term.source.and_(~TermSource.is_deleted)),
+    )
+
+
+def fetched_terms(
+    result: sa.Result[typing.Any], lean: bool = False
+) -> typing.List[typing.Any]:
+    """
+    Return the terms fetched by a `select_terms` query.
+
+    :return: `Term` instances, or mappings of lean projection rows
+        that validate directly into `TermSchema`
+    """
+    if lean:
+        return [dict(row) for row in result.mappings().all()]
+    return list(result.scalars().all())
+
+
 async def retrieve_term_by_uid(
     session: AsyncSession,
     uid: str,
     for_update: bool = False,
-) -> typing.Optional[Term]:
-    """Retrieve a term by its UID."""
-    query = (
-        sa.select(Term)
-        .where(
-            Term.uid == uid,
-            ~Term.is_deleted,
-        )
-        .options(
-            selectinload(Term.topics.and_(~Topic.is_deleted)),
-            selectinload(Term.relatives.and_(~Term.is_deleted)),
-            joinedload(Term.source.and_(~TermSource.is_deleted)),
-        )
+    lean: bool = False,
+) -> typing.Optional[typing.Any]:
+    """
+    Retrieve a term by its UID.
+
+    :param lean: Whether to return a lean projection mapping instead of a `Term`
+    """
+    query = select_terms(lean=lean).where(
+        Term.uid == uid,
+        ~Term.is_deleted,
     )
     if for_update:
         query = query.with_for_update(
@@ -64,7 +197,8 @@ async def retrieve_term_by_uid(
             read=True,
         )
     result = await session.execute(query)
-    return result.scalar()
+    terms = fetched_terms(result, lean=lean)
+    return terms[0] if terms else None
 
 
 async def delete_term_by_uid(
@@ -97,6 +231,19 @@ async def delete_term_by_uid(
     return term
 
 
+def _name_or_uid_matches(
+    model: typing.Union[typing.Type[Term], typing.Type[Topic]],
+    names_or_uids: typing.Iterable[str],
+) -> sa.ColumnElement[bool]:
+    names_or_uids = list(names_or_uids)
+    return sa.or_(
+        text_to_tsvector(model.name).op("@@")(
+            text_to_tsquery(" | ".join(names_or_uids))
+        ),
+        model.uid.in_(names_or_uids),
+    )
+
+
 async def retrieve_terms_by_name_or_uid(
     session: AsyncSession,
     names_or_uids: typing.Iterable[str],
@@ -111,13 +258,7 @@ async def retrieve_terms_by_name_or_uid(
     """
     result = await session.execute(
         sa.select(Term).where(
-            ~Term.is_deleted,
-            sa.or_(
-                text_to_tsvector(Term.name).op("@@")(
-                    text_to_tsquery(" | ".join(names_or_uids))
-                ),
-                Term.uid.in_(names_or_uids),
-            ),
+            ~Term.is_deleted, _name_or_uid_matches(Term, names_or_uids)
         )
     )
     return list(result.scalars().all())
@@ -136,18 +277,67 @@ async def retrieve_topics_by_name_or_uid(
     """
     result = await session.execute(
         sa.select(Topic).where(
-            ~Topic.is_deleted,
-            sa.or_(
-                text_to_tsvector(Topic.name).op("@@")(
-                    text_to_tsquery(" | ".join(names_or_uids))
-                ),
-                Topic.uid.in_(names_or_uids),
-            ),
+            ~Topic.is_deleted, _name_or_uid_matches(Topic, names_or_uids)
         )
     )
     return list(result.scalars().all())
 
 
+async def retrieve_ids_by_name_or_uid(
+    session: AsyncSession,
+    model: typing.Union[typing.Type[Term], typing.Type[Topic]],
+    names_or_uids: typing.Iterable[str],
+) -> typing.List[int]:
+    """
+    Retrieve the IDs of (undeleted) terms or topics by their names or UIDs.
+
+    Matches like `retrieve_terms_by_name_or_uid` and `retrieve_topics_by_name_or_uid`,
+    without loading the terms or topics.
+
+    :param session: The database session
+    :param model: `Term` or `Topic`
+    :param names_or_uids: The names or UIDs of the terms or topics
+    :return: The IDs of the matching terms or topics, in ascending order
+    """
+    result = await session.execute(
+        sa.select(model.id)
+        .where(~model.is_deleted, _name_or_uid_matches(model, names_or_uids))
+        .order_by(model.id)
+    )
+    return list(result.scalars().all())
+
+
+async def retrieve_term_related_uids(
+    session: AsyncSession,
+    term_uids: typing.Iterable[str],
+) -> typing.Set[str]:
+    """
+    Retrieve the UIDs of the topics, sources and relatives of terms.
+
+    :param session: The database session
+    :param term_uids: The UIDs of the terms
+    :return: The UIDs of the topics, sources and relatives of the terms
+    """
+    term_uids = list(term_uids)
+    term_ids = sa.select(Term.id).where(Term.uid.in_(term_uids))
+    related = sa.union(
+        sa.select(Topic.uid)
+        .join(TermToTopicAssociation, TermToTopicAssociation.topic_id == Topic.id)
+        .where(TermToTopicAssociation.term_id.in_(term_ids)),
+        sa.select(TermSource.uid)
+        .join(Term, Term.source_id == TermSource.id)
+        .where(Term.uid.in_(term_uids)),
+        sa.select(Term.uid)
+        .join(
+            RelatedTermAssociation,
+            RelatedTermAssociation.related_term_id == Term.id,
+        )
+        .where(RelatedTermAssociation.term_id.in_(term_ids)),
+    )
+    result = await session.execute(related)
+    return set(result.scalars().all())
+
+
 async def create_topic(
     session: AsyncSession,
     name: str,
@@ -388,25 +578,42 @@ async def retrieve_source_terms(
     )
 
 
-async def create_term_view(
+async def increment_term_view_counts(
     session: AsyncSession,
-    term_id: int,
-    viewed_by_id: typing.Optional[uuid.UUID],
-) -> TermView:
+    counts: typing.Mapping[typing.Tuple[str, datetime.date], int],
+) -> int:
     """
-    Create a term view record in the database.
+    Add to the daily view counts of terms, in bulk.
 
-    :param term_id: The ID of the term that was viewed
-    :param viewed_by_id: The user/account ID that viewed the term
     :param session: The database session
-    :return: The created term view record
+    :param counts: Mapping of (term UID, day) pairs to the number of views to add
+    :return: The number of daily view counts updated
     """
-    term_view = TermView(
-        term_id=term_id,  # type: ignore
-        viewed_by_id=viewed_by_id,  # type: ignore
+    if not counts:
+        return 0
+
+    views = sa.values(
+        sa.column("uid", sa.String),
+        sa.column("date", sa.Date),
+        sa.column("view_count", sa.BigInteger),
+        name="views",
+    ).data([(uid, date, count) for (uid, date), count in counts.items()])
+    insert_stmt = pg_insert(TermViewCount).from_select(
+        ["term_id", "date", "view_count"],
+        sa.select(Term.id, views.c.date, views.c.view_count)
+        .select_from(views)
+        .join(Term, Term.uid == views.c.uid),
+    )
+    result = await session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=["term_id", "date"],
+            set_={
+                "view_count": TermViewCount.view_count
+                + insert_stmt.excluded.view_count
+            },
+        )
     )
-    session.add(term_view)
-    return term_view
+    return result.rowcount  # type: ignore
 
 
 async def check_term_exists_for_source(
@@ -473,110 +680,218 @@ def split_text_into_words(text: str) -> typing.List[str]:
     return re.findall(r"\w+", text)
 
 
-async def get_related_terms(
+async def build_related_terms(
     session: AsyncSession,
-    term: Term,
+    term_ids: typing.Iterable[int],
     limit: int = 10,
-    exclude: typing.Optional[typing.List[typing.Union[int, str]]] = None,
-) -> typing.List[Term]:
+    include_mentioned: bool = False,
+) -> int:
     """
-    Get related terms for a given term.
+    Compute and save related terms for the terms with the given IDs, in bulk.
+
+    For each term, the (verified) terms whose names or definitions mention the term's name
+    are found using the search vector GIN index, ranked by relevance and capped at `limit`.
+    Relations are saved both ways, so a term is also related to the terms
+    its definition mentions.
 
-    Related terms are terms that share topics with the given term or
-    have words in common with the definition of the term.
+    :param session: The database session
+    :param term_ids: The IDs of the terms to build related terms for
+    :param limit: The maximum number of mentioning terms to relate to each term
+    :param include_mentioned: Whether to also look up the terms whose names are mentioned
+        in each term's name or definition. This requires scanning all term names,
+        so it should only be used for a handful of terms, say, on term creation or update.
+    :return: The number of new related term associations saved
     """
-    excluded_ids = set(exclude or [])
-    excluded_ids.add(term.id)
-    related_terms_query = (
-        sa.select(Term)
+    term_ids = list(term_ids)
+    if not term_ids:
+        return 0
+
+    target = orm.aliased(Term, name="target")
+    other = orm.aliased(Term, name="other")
+    target_tsquery = sa.func.plainto_tsquery(
+        sa.cast(SEARCH_CONFIG["language"], REGCONFIG), target.name
+    )
+    mentioning_terms = (
+        sa.select(other.id.label("related_term_id"))
         .where(
-            ~Term.is_deleted,
-            Term.verified.is_(True),
-            ~Term.id.in_(excluded_ids),
-            ~Term.uid.in_(excluded_ids),
-            sa.or_(
-                text_to_tsvector(term.definition).op("@@")(text_to_tsquery(Term.name))
-                if term.search_tsvector
-                else text_to_tsvector(term.definition).op("@@")(
-                    text_to_tsquery(Term.name)
-                ),
-                sa.case(
-                    (
-                        Term.search_tsvector.isnot(None)
-                        & Term.search_tsvector.op("@@")(text_to_tsquery(term.name)),
-                        True,
-                    ),
-                    else_=text_to_tsvector(Term.definition).op("@@")(
-                        text_to_tsquery(term.name)
-                    ),
-                ),
-            ),
+            other.id != target.id,
+            ~other.is_deleted,
+            other.verified.is_(True),
+            other.search_tsvector.op("@@")(target_tsquery),
+        )
+        .order_by(
+            sa.desc(sa.func.ts_rank_cd(other.search_tsvector, target_tsquery)),
+            other.id,
         )
         .limit(limit)
-        # .options(
-        #     selectinload(Term.topics.and_(~Topic.is_deleted)),
-        #     selectinload(Term.relatives.and_(~Term.is_deleted)),
-        #     joinedload(Term.source.and_(~TermSource.is_deleted)),
-        # )
-        .order_by(sa.func.random())
+        .lateral("mentioning_terms")
+    )
+    pair_queries = [
+        sa.select(
+            target.id.label("term_id"),
+            mentioning_terms.c.related_term_id,
+        )
+        .join(mentioning_terms, sa.true())
+        .where(
+            target.id.in_(term_ids),
+            ~target.is_deleted,
+        )
+    ]
+    if include_mentioned:
+        other_tsquery = sa.func.plainto_tsquery(
+            sa.cast(SEARCH_CONFIG["language"], REGCONFIG), other.name
+        )
+        mentioned_terms = (
+            sa.select(other.id.label("related_term_id"))
+            .where(
+                other.id != target.id,
+                ~other.is_deleted,
+                other.verified.is_(True),
+                target.search_tsvector.op("@@")(other_tsquery),
+            )
+            .limit(limit)
+            .lateral("mentioned_terms")
+        )
+        pair_queries.append(
+            sa.select(
+                target.id.label("term_id"),
+                mentioned_terms.c.related_term_id,
+            )
+            .join(mentioned_terms, sa.true())
+            .where(
+                target.id.in_(term_ids),
+                ~target.is_deleted,
+            )
+        )
+
+    pairs = sa.union_all(*pair_queries).cte("pairs")
+    related_pairs = sa.union(
+        sa.select(pairs.c.term_id, pairs.c.related_term_id),
+        sa.select(pairs.c.related_term_id, pairs.c.term_id),
+    )
+    result = await session.execute(
+        pg_insert(RelatedTermAssociation)
+        .from_select(["term_id", "related_term_id"], related_pairs)
+        .on_conflict_do_nothing(index_elements=["term_id", "related_term_id"])
     )
-    related_terms = await session.execute(related_terms_query)
-    return list(related_terms.scalars().all())
+    return result.rowcount  # type: ignore
+
+
+async def clear_related_terms(
+    session: AsyncSession,
+    term_ids: typing.Optional[typing.Iterable[int]] = None,
+) -> int:
+    """
+    Delete related term associations.
+
+    :param session: The database session
+    :param term_ids: Only delete associations (both ways) of the terms with these IDs.
+        If not provided, all related term associations are deleted.
+    :return: The number of associations deleted
+    """
+    query = sa.delete(RelatedTermAssociation)
+    if term_ids is not None:
+        term_ids = list(term_ids)
+        query = query.where(
+            RelatedTermAssociation.term_id.in_(term_ids)
+            | RelatedTermAssociation.related_term_id.in_(term_ids)
+        )
+    result = await session.execute(query)
+    return result.rowcount  # type: ignore
 
 
 async def update_related_terms(
     session: AsyncSession,
     term: Term,
     limit: int = 10,
+    rebuild: bool = False,
 ) -> Term:
-    await session.refresh(term, attribute_names=["topics", "relatives", "source"])
-    related_terms = await get_related_terms(
+    """
+    Update the related terms of a single term, say, after it is created or updated.
+
+    Uses only index lookups and a single scan of term names, so it is safe to call
+    on write paths. Term retrieval should never need to call this.
+
+    :param session: The database session
+    :param term: The term to update related terms for. Must have been flushed.
+    :param limit: The maximum number of related terms to find per lookup
+    :param rebuild: Whether to discard the term's existing related terms first
+    :return: The updated term
+    """
+    if rebuild:
+        await clear_related_terms(session, term_ids=[term.id])
+    await build_related_terms(
         session,
-        term,
+        term_ids=[term.id],
         limit=limit,
-        exclude=list({related_term.id for related_term in term.relatives}),
+        include_mentioned=True,
     )
-    term.relatives |= set(related_terms)
-    session.add(term)
     return term
 
 
 ###### SEARCH TERMS ######
 
 
-async def search_terms(
+def term_name_lower() -> sa.ColumnElement[str]:
+    """
+    Return the lower-cased term name expression, collated as "C".
+
+    Byte-wise ("C") collation lets prefix matches (LIKE 'prefix%') and
+    ordering both use the `ix_search__terms_name_lower` index.
+    """
+    return sa.collate(sa.func.lower(Term.name), "C")
+
+
+async def autocomplete_terms(
     session: AsyncSession,
+    prefix: str,
+    *,
+    limit: int = 10,
+) -> typing.List[sa.Row[typing.Tuple[str, str]]]:
+    """
+    Return the UIDs and names of (verified) terms whose names start with the given prefix,
+    ordered by name.
+
+    :param session: The database session
+    :param prefix: The prefix to match term names against, case insensitively
+    :param limit: The maximum number of terms to return
+    :return: A list of (uid, name) rows
+    """
+    name_lower = term_name_lower()
+    result = await session.execute(
+        sa.select(Term.uid, Term.name)
+        .where(
+            name_lower.startswith(prefix.lower(), autoescape=True),
+            ~Term.is_deleted,
+            Term.verified.is_(True),
+        )
+        .order_by(name_lower)
+        .limit(limit)
+    )
+    return list(result.all())
+
+
+def build_term_search_conditions(
     query: typing.Optional[str] = None,
     *,
     topic_ids: typing.Optional[typing.Iterable[int]] = None,
     startswith: typing.Optional[typing.Iterable[str]] = None,
     source_id: typing.Optional[int] = None,
     verified: typing.Optional[bool] = None,
-    limit: int = 100,
-    offset: int = 0,
     exclude: typing.Optional[typing.List[typing.Union[str, int]]] = None,
-    ordering: typing.Sequence[sa.UnaryExpression] = Term.DEFAULT_ORDERING,
     **filters,
-) -> typing.List[Term]:
+) -> typing.Tuple[
+    typing.List[sa.ColumnExpressionArgument[bool]],
+    typing.Optional[sa.ColumnElement[float]],
+]:
     """
-    Search for terms in the glossary.
+    Build the filter conditions for a term search.
 
-    :param session: The database session
-    :param query: The search query
-    :param topic_ids: Terms under the topics with the given IDs will be returned
-    :param startswith: Terms that start with the given letters will be returned
-    :param source_id: Terms from the source with the given ID will be returned
-    :param verified: Only return verified terms if True, unverified terms if False
-    :param limit: The maximum number of terms to return
-    :param offset: The number of terms to skip
-    :param exclude: A list of term UIDs to exclude from the search results
-    :param ordering: A list of SQLAlchemy ordering expressions to apply to the query
-    :param filters: Additional filters to apply to the query
+    :return: A tuple of the query conditions and the relevance rank expression,
+        if a search query was given
     """
-    if not (query or topic_ids or filters):
-        return []
-
-    query_filters = [~Term.is_deleted]
+    query_filters: typing.List[sa.ColumnExpressionArgument[bool]] = [~Term.is_deleted]
+    rank = None
     if topic_ids:
         query_filters.append(Term.topics.any(Topic.id.in_(list(topic_ids))))
 
@@ -585,11 +900,7 @@ async def search_terms(
         query_filters.append(
             Term.search_tsvector.op("@@")(tsquery),
         )
-        # Update ordering to rank by relevance
-        ordering = (
-            sa.desc(sa.func.ts_rank_cd(Term.search_tsvector, tsquery)),
-            *ordering,
-        )
+        rank = sa.func.ts_rank_cd(Term.search_tsvector, tsquery)
 
     if source_id:
         query_filters.append(Term.source_id == source_id)
@@ -598,105 +909,394 @@ async def search_terms(
         query_filters.append(Term.verified == verified)
 
     if startswith:
-        startletter_filters = []
-        for letter in startswith:
-            startletter_filters.append(
-                sa.or_(
-                    Term.name.startswith(letter.lower()),
-                    Term.name.startswith(letter.upper()),
-                )
-            )
-        query_filters.append(sa.or_(*startletter_filters))
+        # Matches the (C collated) lower(name) index, so prefix
+        # matching is case insensitive and can use the index
+        name_lower = term_name_lower()
+        startletter_filters = [
+            name_lower.startswith(letter.lower(), autoescape=True)
+            for letter in startswith
+            if letter
+        ]
+        if startletter_filters:
+            query_filters.append(sa.or_(*startletter_filters))
 
     if exclude:
         query_filters.append(~Term.uid.in_(exclude) & ~Term.id.in_(exclude))
 
-    result = await session.execute(
-        sa.select(Term)
-        .where(
-            *query_filters,
-            *build_conditions(filters, Term),
-        )
-        .limit(limit)
-        .offset(offset)
-        .options(
-            selectinload(Term.topics.and_(~Topic.is_deleted)),
-            selectinload(Term.relatives.and_(~Term.is_deleted)),
-            joinedload(Term.source.and_(~TermSource.is_deleted)),
-        )
-        .order_by(*ordering)
-    )
-    return list(result.scalars().all())
-
+    query_filters.extend(build_conditions(filters, Term))
+    return query_filters, rank
 
-###### SEARCH RECORDS ######
 
+def select_matching_terms(
+    query: typing.Optional[str] = None, **params
+) -> sa.Select[typing.Tuple[int]]:
+    """
+    Select the IDs of the terms matching a search, e.g. to count the matches.
 
-async def create_search_record(
+    Takes the same parameters as `search_terms`. Pagination,
+    ordering and projection parameters are ignored.
+    """
+    for param in ("limit", "offset", "ordering", "lean"):
+        params.pop(param, None)
+    filters = params.keys() - {
+        "topic_ids",
+        "startswith",
+        "source_id",
+        "verified",
+        "exclude",
+    }
+    if not (query or params.get("topic_ids") or filters):
+        # `search_terms` returns no terms without these
+        return sa.select(Term.id).where(sa.false())
+
+    query_filters, _ = build_term_search_conditions(query, **params)
+    return sa.select(Term.id).where(*query_filters)
+
+
+async def retrieve_terms_by_ids(
     session: AsyncSession,
-    query: typing.Optional[str] = None,
-    *,
-    account_id: typing.Optional[uuid.UUID] = None,
-    client_id: typing.Optional[uuid.UUID] = None,
-    topics: typing.Optional[typing.Iterable[Topic]] = None,
-    metadata: typing.Optional[typing.Dict[str, typing.Any]] = None,
-) -> SearchRecord:
+    term_ids: typing.Sequence[int],
+    lean: bool = False,
+) -> typing.List[typing.Any]:
     """
-    Create a search record in the database.
+    Retrieve (undeleted) terms by their IDs, in the order of the IDs.
 
     :param session: The database session
-    :param query: The search query to record
-    :param account_id: The ID of the account that made the search
-    :param client_id: The ID of the API client that was used to make the search
-    :param topics: The topics the search was constrained to
-    :param metadata: Additional metadata to associate with the search
-    :return: The created search record
+    :param term_ids: The IDs of the terms to retrieve
+    :param lean: Whether to return lean projection mappings instead of `Term`s
     """
-    search_record = SearchRecord(
-        account_id=account_id,  # type: ignore
-        client_id=client_id,  # type: ignore
-        query=query,  # type: ignore
-        extradata=metadata or {},  # type: ignore
+    if not term_ids:
+        return []
+    result = await session.execute(
+        select_terms(lean=lean).where(Term.id.in_(term_ids), ~Term.is_deleted)
     )
-    if topics:
-        search_record.topics |= set(topics)
-    session.add(search_record)
-    return search_record
+    terms = {
+        (term["id"] if lean else term.id): term
+        for term in fetched_terms(result, lean=lean)
+    }
+    return [terms[term_id] for term_id in term_ids if term_id in terms]
 
 
-@asynccontextmanager
-async def record_search(
+async def search_terms(
     session: AsyncSession,
     query: typing.Optional[str] = None,
     *,
-    account_id: typing.Optional[uuid.UUID] = None,
-    client_id: typing.Optional[uuid.UUID] = None,
-    topics: typing.Optional[typing.Iterable[Topic]] = None,
-    metadata: typing.Optional[typing.Dict[str, typing.Any]] = None,
-):
+    topic_ids: typing.Optional[typing.Iterable[int]] = None,
+    startswith: typing.Optional[typing.Iterable[str]] = None,
+    source_id: typing.Optional[int] = None,
+    verified: typing.Optional[bool] = None,
+    limit: int = 100,
+    offset: int = 0,
+    exclude: typing.Optional[typing.List[typing.Union[str, int]]] = None,
+    ordering: typing.Sequence[sa.UnaryExpression] = Term.DEFAULT_ORDERING,
+    lean: bool = False,
+    **filters,
+) -> typing.List[typing.Any]:
     """
-    Async context manager to record a search in the database.
+    Search for terms in the glossary.
 
     :param session: The database session
-    :param query: The search query to record
-    :param account_id: The ID of the account that made the search
-    :param client_id: The ID of the API client that was used to make the search
-    :param topics: The topics the search was constrained to
-    :param metadata: Additional metadata to associate with the search
+    :param query: The search query
+    :param topic_ids: Terms under the topics with the given IDs will be returned
+    :param startswith: Terms that start with the given letters will be returned
+    :param source_id: Terms from the source with the given ID will be returned
+    :param verified: Only return verified terms if True, unverified terms if False
+    :param limit: The maximum number of terms to return
+    :param offset: The number of terms to skip
+    :param exclude: A list of term UIDs to exclude from the search results
+    :param ordering: A list of SQLAlchemy ordering expressions to apply to the query
+    :param lean: Whether to return lean projection mappings instead of `Term`s
+    :param filters: Additional filters to apply to the query
     """
-    try:
-        yield
-        await create_search_record(
-            session,
-            query=query,
-            account_id=account_id,
-            client_id=client_id,
-            topics=topics,
-            metadata=metadata,
+    if not (query or topic_ids or filters):
+        return []
+
+    if (
+        glossary_search_index.is_ready
+        and not (filters or exclude)
+        and ordering is Term.DEFAULT_ORDERING
+    ):
+        lexemes = (
+            await glossary_search_index.parse_query(session, query) if query else None
         )
-        await session.flush()
-    finally:
-        pass
+        # Queries the index cannot answer are searched in the database
+        if not query or lexemes is not None:
+            # Rank and filter in memory, and only load the matching terms
+            term_ids = glossary_search_index.search(
+                lexemes,
+                topic_ids=topic_ids,
+                startswith=startswith,
+                source_id=source_id,
+                verified=verified,
+                limit=limit,
+                offset=offset,
+            )
+            return await retrieve_terms_by_ids(session, term_ids, lean=lean)
+
+    query_filters, rank = build_term_search_conditions(
+        query,
+        topic_ids=topic_ids,
+        startswith=startswith,
+        source_id=source_id,
+        verified=verified,
+        exclude=exclude,
+        **filters,
+    )
+    if rank is not None:
+        # Update ordering to rank by relevance
+        ordering = (sa.desc(rank), *ordering)
+
+    result = await session.execute(
+        select_terms(lean=lean)
+        .where(*query_filters)
+        .limit(limit)
+        .offset(offset)
+        .order_by(*ordering)
+    )
+    return fetched_terms(result, lean=lean)
+
+
+async def fuzzy_search_terms(
+    session: AsyncSession,
+    query: str,
+    *,
+    topic_ids: typing.Optional[typing.Iterable[int]] = None,
+    startswith: typing.Optional[typing.Iterable[str]] = None,
+    source_id: typing.Optional[int] = None,
+    verified: typing.Optional[bool] = None,
+    limit: int = 100,
+    exclude_ids: typing.Optional[typing.Iterable[int]] = None,
+    similarity_threshold: typing.Optional[float] = None,
+    lean: bool = False,
+    **filters,
+) -> typing.List[typing.Any]:
+    """
+    Search for terms whose names are similar to the query, using trigram similarity.
+
+    Unlike `search_terms`, this tolerates misspelled queries, so it is used as a
+    fallback when full-text search returns too few terms.
+
+    :param session: The database session
+    :param query: The search query
+    :param topic_ids: Terms under the topics with the given IDs will be returned
+    :param startswith: Terms that start with the given letters will be returned
+    :param source_id: Terms from the source with the given ID will be returned
+    :param verified: Only return verified terms if True, unverified terms if False
+    :param limit: The maximum number of terms to return
+    :param exclude_ids: IDs of terms to exclude, e.g. terms already found by full-text search
+    :param similarity_threshold: Minimum similarity (0 to 1) of term names to the query.
+        Defaults to the database's `pg_trgm.similarity_threshold` (0.3)
+    :param lean: Whether to return lean projection mappings instead of `Term`s
+    :param filters: Additional filters to apply to the query
+    :return: The terms, most similar first
+    """
+    query_filters, _ = build_term_search_conditions(
+        topic_ids=topic_ids,
+        startswith=startswith,
+        source_id=source_id,
+        verified=verified,
+        **filters,
+    )
+    # Matches the `ix_search__terms_name_lower_trgm` GIN index
+    name_lower = sa.func.lower(Term.name)
+    query_lower = query.strip().lower()
+    query_filters.append(name_lower.op("%")(query_lower))
+    if exclude_ids:
+        query_filters.append(~Term.id.in_(list(exclude_ids)))
+
+    if similarity_threshold is not None:
+        # Only applies to the current transaction
+        await session.execute(
+            sa.select(
+                sa.func.set_config(
+                    "pg_trgm.similarity_threshold", str(similarity_threshold), True
+                )
+            )
+        )
+
+    result = await session.execute(
+        select_terms(lean=lean)
+        .where(*query_filters)
+        .limit(limit)
+        .order_by(
+            sa.desc(sa.func.similarity(name_lower, query_lower)),
+            sa.asc(Term.name),
+            sa.asc(Term.id),
+        )
+    )
+    return fetched_terms(result, lean=lean)
+
+
+async def search_terms_by_cursor(
+    session: AsyncSession,
+    query: typing.Optional[str] = None,
+    *,
+    after: typing.Optional[TermCursor] = None,
+    topic_ids: typing.Optional[typing.Iterable[int]] = None,
+    startswith: typing.Optional[typing.Iterable[str]] = None,
+    source_id: typing.Optional[int] = None,
+    verified: typing.Optional[bool] = None,
+    limit: int = 100,
+    exclude: typing.Optional[typing.List[typing.Union[str, int]]] = None,
+    lean: bool = False,
+    **filters,
+) -> typing.Tuple[typing.List[typing.Any], typing.Optional[TermCursor]]:
+    """
+    Search for terms in the glossary using keyset (seek) pagination.
+
+    Results are ordered by relevance (if a query is given), then by name and ID,
+    and each page starts right after the `after` cursor instead of skipping
+    rows with an offset. Hence, fetching a deep page costs the same as fetching the first.
+
+    :param session: The database session
+    :param query: The search query
+    :param after: Cursor of the last term in the previous page. None for the first page
+    :param topic_ids: Terms under the topics with the given IDs will be returned
+    :param startswith: Terms that start with the given letters will be returned
+    :param source_id: Terms from the source with the given ID will be returned
+    :param verified: Only return verified terms if True, unverified terms if False
+    :param limit: The maximum number of terms to return
+    :param exclude: A list of term UIDs to exclude from the search results
+    :param lean: Whether to return lean projection mappings instead of `Term`s
+    :param filters: Additional filters to apply to the query
+    :return: A tuple of the terms and the cursor of the last term,
+        if there may be more terms after it
+    """
+    if not (query or topic_ids or filters):
+        return [], None
+
+    query_filters, rank = build_term_search_conditions(
+        query,
+        topic_ids=topic_ids,
+        startswith=startswith,
+        source_id=source_id,
+        verified=verified,
+        exclude=exclude,
+        **filters,
+    )
+    if rank is None:
+        rank = sa.null()
+    rank = sa.cast(rank, sa.Float)
+
+    if after is not None:
+        after_name_and_id = sa.tuple_(Term.name, Term.id) > sa.tuple_(
+            sa.literal(after.name, Term.name.type), sa.literal(after.id, sa.Integer)
+        )
+        if query and after.rank is not None:
+            query_filters.append(
+                sa.or_(
+                    rank < after.rank,
+                    sa.and_(rank == after.rank, after_name_and_id),
+                )
+            )
+        else:
+            query_filters.append(after_name_and_id)
+
+    ordering = [sa.asc(Term.name), sa.asc(Term.id)]
+    if query:
+        ordering.insert(0, sa.desc(rank))
+
+    result = await session.execute(
+        select_terms(rank.label("rank"), lean=lean)
+        .where(*query_filters)
+        .limit(limit)
+        .order_by(*ordering)
+    )
+    if lean:
+        terms = [dict(row) for row in result.mappings().all()]
+        if len(terms) < limit:
+            return terms, None
+        last = terms[-1]
+        return terms, TermCursor(rank=last["rank"], name=last["name"], id=last["id"])
+
+    rows = result.unique().all()
+    terms = [row[0] for row in rows]
+    if len(rows) < limit:
+        return terms, None
+
+    last_term, last_rank = rows[-1]
+    return terms, TermCursor(rank=last_rank, name=last_term.name, id=last_term.id)
+
+
+###### SEARCH RECORDS ######
+
+
+async def create_search_record(
+    session: AsyncSession,
+    query: typing.Optional[str] = None,
+    *,
+    account_id: typing.Optional[uuid.UUID] = None,
+    client_id: typing.Optional[uuid.UUID] = None,
+    topics: typing.Optional[typing.Iterable[Topic]] = None,
+    metadata: typing.Optional[typing.Dict[str, typing.Any]] = None,
+) -> SearchRecord:
+    """
+    Create a search record in the database.
+
+    :param session: The database session
+    :param query: The search query to record
+    :param account_id: The ID of the account that made the search
+    :param client_id: The ID of the API client that was used to make the search
+    :param topics: The topics the search was constrained to
+    :param metadata: Additional metadata to associate with the search
+    :return: The created search record
+    """
+    search_record = SearchRecord(
+        account_id=account_id,  # type: ignore
+        client_id=client_id,  # type: ignore
+        query=query,  # type: ignore
+        extradata=metadata or {},  # type: ignore
+    )
+    if topics:
+        search_record.topics |= set(topics)
+    session.add(search_record)
+    return search_record
+
+
+async def create_search_records(
+    session: AsyncSession,
+    records: typing.Sequence[typing.Mapping[str, typing.Any]],
+) -> int:
+    """
+    Create search records in the database, in bulk.
+
+    :param session: The database session
+    :param records: Mappings of the `query`, `account_id`, `client_id`, `metadata`,
+        `timestamp` and `topic_ids` of each search to record
+    :return: The number of search records created
+    """
+    if not records:
+        return 0
+
+    rows = []
+    topic_ids_by_uid = {}
+    for record in records:
+        uid = generate_search_record_uid()
+        rows.append(
+            {
+                "uid": uid,
+                "query": record.get("query"),
+                "account_id": record.get("account_id"),
+                "client_id": record.get("client_id"),
+                "extradata": record.get("metadata") or {},
+                "timestamp": record.get("timestamp") or timezone.now(),
+            }
+        )
+        if record.get("topic_ids"):
+            topic_ids_by_uid[uid] = record["topic_ids"]
+
+    result = await session.execute(
+        sa.insert(SearchRecord).returning(SearchRecord.uid, SearchRecord.id), rows
+    )
+    search_record_ids = dict(result.tuples().all())
+    associations = [
+        {"search_record_id": search_record_ids[uid], "topic_id": topic_id}
+        for uid, topic_ids in topic_ids_by_uid.items()
+        for topic_id in topic_ids
+    ]
+    if associations:
+        await session.execute(sa.insert(SearchRecordToTopicAssociation), associations)
+    return len(rows)
 
 
 async def retrieve_account_search_history(
@@ -1029,6 +1629,540 @@ async def get_terms_sources(
     return dict(sources.all())  # type: ignore
 
 
+###### SEARCH METRICS ROLLUPS ######
+
+HOUR = datetime.timedelta(hours=1)
+DAY = datetime.timedelta(days=1)
+
+SEARCH_ROLLUP_KEYS: typing.Dict[typing.Type[SearchRollupMixin], typing.Tuple[str, ...]] = {
+    SearchCountRollup: (),
+    SearchQueryRollup: ("query",),
+    SearchWordRollup: ("word",),
+    SearchTopicRollup: ("topic_id",),
+}
+"""Maps search metrics rollup models to the columns, besides the bucket, that identify a rollup"""
+
+
+def floor_timestamp(
+    timestamp: datetime.datetime, bucket_size: str
+) -> datetime.datetime:
+    """
+    Return the (UTC) start of the hour or day the timestamp falls in.
+
+    :param timestamp: A timezone-aware timestamp
+    :param bucket_size: Either "hour" or "day"
+    """
+    timestamp = timestamp.astimezone(datetime.timezone.utc)
+    timestamp = timestamp.replace(minute=0, second=0, microsecond=0)
+    if bucket_size == "day":
+        timestamp = timestamp.replace(hour=0)
+    return timestamp
+
+
+def ceil_timestamp(timestamp: datetime.datetime, bucket_size: str) -> datetime.datetime:
+    """
+    Return the (UTC) start of the first hour or day starting at or after the timestamp.
+
+    :param timestamp: A timezone-aware timestamp
+    :param bucket_size: Either "hour" or "day"
+    """
+    floored = floor_timestamp(timestamp, bucket_size)
+    if floored == timestamp:
+        return floored
+    return floored + (DAY if bucket_size == "day" else HOUR)
+
+
+def _bucket_start(
+    timestamp: sa.ColumnExpressionArgument[datetime.datetime], bucket_size: str
+):
+    return sa.func.date_trunc(bucket_size, timestamp, "UTC")
+
+
+async def get_search_rollup_watermarks(
+    session: AsyncSession,
+) -> typing.Dict[str, typing.Optional[datetime.datetime]]:
+    """
+    Return the end of the period covered by the search metrics rollups, for each bucket size.
+
+    Rollups are built in order, without gaps (hours without searches have a zero count rollup),
+    so all searches made before the returned timestamp are accounted for in the rollups.
+
+    :param session: The database session
+    :return: A mapping of bucket sizes ("hour", "day") to the end of the period
+        they cover, or None if no rollups of that size exist
+    """
+    result = await session.execute(
+        sa.select(
+            SearchCountRollup.bucket_size,
+            sa.func.max(SearchCountRollup.bucket_start),
+        ).group_by(SearchCountRollup.bucket_size)
+    )
+    latest = dict(result.all())
+    return {
+        "hour": latest["hour"] + HOUR if latest.get("hour") else None,
+        "day": latest["day"] + DAY if latest.get("day") else None,
+    }
+
+
+async def get_first_search_rollup_start(
+    session: AsyncSession, bucket_size: str = "hour"
+) -> typing.Optional[datetime.datetime]:
+    """
+    Return the start of the earliest search metrics rollup of the given bucket size.
+
+    :param session: The database session
+    :param bucket_size: Either "hour" or "day"
+    """
+    result = await session.execute(
+        sa.select(sa.func.min(SearchCountRollup.bucket_start)).where(
+            SearchCountRollup.bucket_size == bucket_size
+        )
+    )
+    return result.scalar()
+
+
+async def rollup_search_hours(
+    session: AsyncSession,
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> None:
+    """
+    Build (or rebuild) the hourly search metrics rollups for a period.
+
+    Every hour in the period gets a count rollup, even when no searches were made,
+    so that the rollups stay gapless.
+
+    :param session: The database session
+    :param start: The (UTC, hour aligned) start of the period
+    :param end: The (UTC, hour aligned) end of the period, exclusive
+    """
+    await clear_search_rollups(session, "hour", start=start, end=end)
+
+    bucket = _bucket_start(SearchRecord.timestamp, "hour").label("bucket")
+    window = (SearchRecord.timestamp >= start, SearchRecord.timestamp < end)
+    hour_literal = sa.literal("hour", sa.String(10))
+
+    hours = sa.select(
+        sa.func.generate_series(
+            sa.literal(start, sa.DateTime(timezone=True)),
+            sa.literal(end - HOUR, sa.DateTime(timezone=True)),
+            sa.literal(HOUR, sa.Interval()),
+        ).label("bucket")
+    ).subquery("hours")
+    counts = (
+        sa.select(bucket, sa.func.count(SearchRecord.id).label("search_count"))
+        .where(*window)
+        .group_by(sa.text("bucket"))
+        .subquery("counts")
+    )
+    await session.execute(
+        pg_insert(SearchCountRollup).from_select(
+            ["bucket_size", "bucket_start", "search_count"],
+            sa.select(
+                hour_literal,
+                hours.c.bucket,
+                sa.func.coalesce(counts.c.search_count, 0),
+            ).select_from(
+                hours.outerjoin(counts, counts.c.bucket == hours.c.bucket)
+            ),
+        )
+    )
+
+    query_lower = sa.func.lower(sa.func.trim(SearchRecord.query))
+    await session.execute(
+        pg_insert(SearchQueryRollup).from_select(
+            ["bucket_size", "bucket_start", "query", "search_count"],
+            sa.select(
+                hour_literal,
+                bucket,
+                query_lower.label("query_lower"),
+                sa.func.count(SearchRecord.id),
+            )
+            .where(*window, ~SearchRecord.query.is_(sa.null()), query_lower != "")
+            .group_by(sa.text("bucket"), sa.text("query_lower")),
+        )
+    )
+
+    words = (
+        sa.select(
+            bucket,
+            sa.func.lower(
+                sa.func.trim(
+                    sa.func.unnest(
+                        sa.func.regexp_split_to_array(SearchRecord.query, r"\s+")
+                    )
+                )
+            ).label("word"),
+        )
+        .where(*window, ~SearchRecord.query.is_(sa.null()), SearchRecord.query != "")
+        .subquery("words")
+    )
+    await session.execute(
+        pg_insert(SearchWordRollup).from_select(
+            ["bucket_size", "bucket_start", "word", "search_count"],
+            sa.select(hour_literal, words.c.bucket, words.c.word, sa.func.count())
+            .where(words.c.word != "")
+            .group_by(words.c.bucket, words.c.word),
+        )
+    )
+
+    await session.execute(
+        pg_insert(SearchTopicRollup).from_select(
+            ["bucket_size", "bucket_start", "topic_id", "search_count"],
+            sa.select(
+                hour_literal,
+                bucket,
+                SearchRecordToTopicAssociation.topic_id,
+                sa.func.count(SearchRecord.id),
+            )
+            .join(
+                SearchRecordToTopicAssociation,
+                SearchRecordToTopicAssociation.search_record_id == SearchRecord.id,
+            )
+            .where(*window)
+            .group_by(sa.text("bucket"), SearchRecordToTopicAssociation.topic_id),
+        )
+    )
+
+
+async def rollup_search_days(
+    session: AsyncSession,
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> None:
+    """
+    Build (or rebuild) the daily search metrics rollups for a period, from the hourly rollups.
+
+    The hourly rollups must already cover the period.
+
+    :param session: The database session
+    :param start: The (UTC, day aligned) start of the period
+    :param end: The (UTC, day aligned) end of the period, exclusive
+    """
+    await clear_search_rollups(session, "day", start=start, end=end)
+
+    for model, keys in SEARCH_ROLLUP_KEYS.items():
+        key_columns = [getattr(model, key) for key in keys]
+        bucket = _bucket_start(model.bucket_start, "day").label("bucket")
+        await session.execute(
+            pg_insert(model).from_select(
+                ["bucket_size", "bucket_start", *keys, "search_count"],
+                sa.select(
+                    sa.literal("day", sa.String(10)),
+                    bucket,
+                    *key_columns,
+                    sa.func.sum(model.search_count),
+                )
+                .where(
+                    model.bucket_size == "hour",
+                    model.bucket_start >= start,
+                    model.bucket_start < end,
+                )
+                .group_by(sa.text("bucket"), *key_columns),
+            )
+        )
+
+
+async def clear_search_rollups(
+    session: AsyncSession,
+    bucket_size: typing.Optional[str] = None,
+    start: typing.Optional[datetime.datetime] = None,
+    end: typing.Optional[datetime.datetime] = None,
+) -> None:
+    """
+    Delete search metrics rollups.
+
+    :param session: The database session
+    :param bucket_size: Only delete rollups of this bucket size
+    :param start: Only delete rollups of buckets starting at or after this timestamp
+    :param end: Only delete rollups of buckets starting before this timestamp
+    """
+    filters = []
+    if bucket_size:
+        filters.append(lambda model: model.bucket_size == bucket_size)
+    if start:
+        filters.append(lambda model: model.bucket_start >= start)
+    if end:
+        filters.append(lambda model: model.bucket_start < end)
+
+    for model in SEARCH_ROLLUP_KEYS:
+        await session.execute(
+            sa.delete(model).where(*(condition(model) for condition in filters))
+        )
+
+
+class SearchMetricsPeriod(typing.NamedTuple):
+    """
+    A period split into the parts that are answered from the search metrics
+    rollups, and the (small) parts that are answered from the search records.
+    """
+
+    live_filter: sa.ColumnElement[bool]
+    """Filter selecting the search records not accounted for in the rollups used"""
+    rollup_ranges: typing.List[
+        typing.Tuple[str, typing.Optional[datetime.datetime], datetime.datetime]
+    ]
+    """(bucket size, start, end) ranges of the rollups covering the rest of the period"""
+
+    def rollup_filter(
+        self, model: typing.Type[SearchRollupMixin]
+    ) -> typing.Optional[sa.ColumnElement[bool]]:
+        """Return a filter selecting the rollups of the given model covering the period."""
+        if not self.rollup_ranges:
+            return None
+        conditions = []
+        for bucket_size, start, end in self.rollup_ranges:
+            condition = sa.and_(
+                model.bucket_size == bucket_size, model.bucket_start < end
+            )
+            if start is not None:
+                condition = sa.and_(condition, model.bucket_start >= start)
+            conditions.append(condition)
+        return sa.or_(*conditions)
+
+
+def split_search_metrics_period(
+    watermarks: typing.Dict[str, typing.Optional[datetime.datetime]],
+    timestamp_lte: datetime.datetime,
+    timestamp_gte: typing.Optional[datetime.datetime] = None,
+) -> SearchMetricsPeriod:
+    """
+    Split a period into rollup and live parts.
+
+    Whole days are answered from the daily rollups, and the remaining whole hours
+    from the hourly rollups. Partial hours at the edges of the period, and the time
+    after the rollups' watermark, are answered from the search records.
+
+    :param watermarks: The rollup watermarks, as returned by `get_search_rollup_watermarks`
+    :param timestamp_lte: The end of the period, inclusive
+    :param timestamp_gte: The start of the period, if any
+    """
+    live = [SearchRecord.timestamp <= timestamp_lte]
+    if timestamp_gte:
+        live.append(SearchRecord.timestamp >= timestamp_gte)
+
+    hourly_end = watermarks.get("hour")
+    if hourly_end is None:
+        return SearchMetricsPeriod(sa.and_(*live), [])
+
+    rollup_start = ceil_timestamp(timestamp_gte, "hour") if timestamp_gte else None
+    rollup_end = min(floor_timestamp(timestamp_lte, "hour"), hourly_end)
+    if rollup_start is not None and rollup_start >= rollup_end:
+        return SearchMetricsPeriod(sa.and_(*live), [])
+
+    live_parts = [
+        sa.and_(
+            SearchRecord.timestamp >= rollup_end,
+            SearchRecord.timestamp <= timestamp_lte,
+        )
+    ]
+    if timestamp_gte and timestamp_gte < rollup_start:  # type: ignore[operator]
+        live_parts.append(
+            sa.and_(
+                SearchRecord.timestamp >= timestamp_gte,
+                SearchRecord.timestamp < rollup_start,  # type: ignore[operator]
+            )
+        )
+
+    rollup_ranges = [("hour", rollup_start, rollup_end)]
+    daily_end = watermarks.get("day")
+    if daily_end is not None:
+        day_start = ceil_timestamp(rollup_start, "day") if rollup_start else None
+        day_end = min(floor_timestamp(rollup_end, "day"), daily_end)
+        if day_start is None or day_start < day_end:
+            rollup_ranges = [("day", day_start, day_end)]
+            if rollup_start is not None and rollup_start < day_start:  # type: ignore[operator]
+                rollup_ranges.append(("hour", rollup_start, day_start))  # type: ignore[arg-type]
+            if day_end < rollup_end:
+                rollup_ranges.append(("hour", day_end, rollup_end))
+    return SearchMetricsPeriod(sa.or_(*live_parts), rollup_ranges)
+
+
+def _union_counts(
+    live_query: sa.Select, rollup_query: typing.Optional[sa.Select]
+) -> sa.Subquery:
+    """Combine live and rollup (key, count) queries into a single subquery."""
+    if rollup_query is None:
+        return live_query.subquery("combined")
+    return sa.union_all(live_query, rollup_query).subquery("combined")
+
+
+def _rollup_counts(
+    period: SearchMetricsPeriod,
+    model: typing.Type[SearchRollupMixin],
+    key: sa.ColumnElement[typing.Any],
+) -> typing.Optional[sa.Select]:
+    """Return a (key, count) query over the rollups of the given model covering the period."""
+    condition = period.rollup_filter(model)
+    if condition is None:
+        return None
+    return (
+        sa.select(
+            key.label("key"), sa.func.sum(model.search_count).label("search_count")
+        )
+        .where(condition)
+        .group_by(key)
+    )
+
+
+async def get_rolled_up_search_count(
+    session: AsyncSession, period: SearchMetricsPeriod
+) -> int:
+    """
+    Return the number of searches made over a period, combining the search metrics rollups
+    with the search records not accounted for in the rollups.
+
+    :param session: The database session
+    :param period: The period, as returned by `split_search_metrics_period`
+    """
+    search_count = await get_search_count(session, [period.live_filter])
+    count_filter = period.rollup_filter(SearchCountRollup)
+    if count_filter is not None:
+        result = await session.execute(
+            sa.select(sa.func.sum(SearchCountRollup.search_count)).where(count_filter)
+        )
+        search_count += result.scalar() or 0
+    return search_count
+
+
+async def get_rolled_up_most_searched_queries(
+    session: AsyncSession, period: SearchMetricsPeriod, limit: int = 10
+) -> typing.Dict[str, int]:
+    """
+    Rolled up counterpart of `get_most_searched_queries`.
+
+    :param session: The database session
+    :param period: The period, as returned by `split_search_metrics_period`
+    :param limit: The maximum number of queries to return
+    """
+    query_lower = sa.func.lower(sa.func.trim(SearchRecord.query))
+    combined = _union_counts(
+        sa.select(query_lower.label("key"), sa.func.count().label("search_count"))
+        .where(
+            period.live_filter,
+            ~SearchRecord.query.is_(sa.null()),
+            query_lower != "",
+        )
+        .group_by(query_lower),
+        _rollup_counts(period, SearchQueryRollup, SearchQueryRollup.query),
+    )
+    result = await session.execute(
+        sa.select(combined.c.key, sa.func.sum(combined.c.search_count).label("total"))
+        .group_by(combined.c.key)
+        .order_by(sa.desc(sa.text("total")))
+        .limit(limit)
+    )
+    return {key: int(total) for key, total in result.all()}
+
+
+async def get_rolled_up_most_searched_topics(
+    session: AsyncSession, period: SearchMetricsPeriod, limit: int = 5
+) -> typing.Dict[str, int]:
+    """
+    Rolled up counterpart of `get_most_searched_topics`.
+
+    :param session: The database session
+    :param period: The period, as returned by `split_search_metrics_period`
+    :param limit: The maximum number of topics to return
+    """
+    combined = _union_counts(
+        sa.select(
+            SearchRecordToTopicAssociation.topic_id.label("key"),
+            sa.func.count().label("search_count"),
+        )
+        .join(
+            SearchRecord,
+            SearchRecordToTopicAssociation.search_record_id == SearchRecord.id,
+        )
+        .where(period.live_filter)
+        .group_by(SearchRecordToTopicAssociation.topic_id),
+        _rollup_counts(period, SearchTopicRollup, SearchTopicRollup.topic_id),
+    )
+    result = await session.execute(
+        sa.select(Topic.name, sa.func.sum(combined.c.search_count).label("total"))
+        .join(Topic, Topic.id == combined.c.key)
+        .where(~Topic.is_deleted)
+        .group_by(Topic.id)
+        .order_by(sa.desc(sa.text("total")))
+        .limit(limit)
+    )
+    return {name: int(total) for name, total in result.all()}
+
+
+async def get_rolled_up_most_searched_words(
+    session: AsyncSession, period: SearchMetricsPeriod, limit: int = 5
+) -> typing.Dict[str, int]:
+    """
+    Rolled up counterpart of `get_most_searched_words`.
+
+    :param session: The database session
+    :param period: The period, as returned by `split_search_metrics_period`
+    :param limit: The maximum number of words to return
+    """
+    words = (
+        sa.select(
+            sa.func.lower(
+                sa.func.trim(
+                    sa.func.unnest(
+                        sa.func.regexp_split_to_array(SearchRecord.query, r"\s+")
+                    )
+                )
+            ).label("key")
+        )
+        .where(
+            period.live_filter,
+            ~SearchRecord.query.is_(sa.null()),
+            SearchRecord.query != "",
+        )
+        .subquery("words")
+    )
+    combined = _union_counts(
+        sa.select(words.c.key, sa.func.count().label("search_count"))
+        .where(words.c.key != "")
+        .group_by(words.c.key),
+        _rollup_counts(period, SearchWordRollup, SearchWordRollup.word),
+    )
+    result = await session.execute(
+        sa.select(combined.c.key, sa.func.sum(combined.c.search_count).label("total"))
+        .group_by(combined.c.key)
+        .order_by(sa.desc(sa.text("total")))
+        .limit(limit)
+    )
+    return {key: int(total) for key, total in result.all()}
+
+
+async def run_queries(
+    session: AsyncSession,
+    queries: typing.Sequence[
+        typing.Callable[[AsyncSession], typing.Awaitable[typing.Any]]
+    ],
+    concurrently: bool = True,
+) -> typing.List[typing.Any]:
+    """
+    Run independent read queries, returning their results in order.
+
+    When run concurrently, each query gets its own session (and pooled connection),
+    so the total latency is that of the slowest query rather than the sum of all.
+    Otherwise, the queries are run one after another on the given session.
+
+    :param session: The database session to use when not running concurrently
+    :param queries: Callables taking a session and returning an awaitable query result.
+        Use `functools.partial` to bind other arguments.
+    :param concurrently: Whether to run the queries concurrently
+    :return: The query results, in the order of the queries
+    """
+    if not concurrently or len(queries) < 2:
+        return [await query(session) for query in queries]
+
+    async def run_in_session(
+        query: typing.Callable[[AsyncSession], typing.Awaitable[typing.Any]],
+    ) -> typing.Any:
+        async with get_async_session() as query_session:
+            return await query(query_session)
+
+    return list(await asyncio.gather(*(run_in_session(query) for query in queries)))
+
+
 async def generate_account_search_metrics(
     session: AsyncSession,
     account_uid: str,
@@ -1036,6 +2170,7 @@ async def generate_account_search_metrics(
     client_id: typing.Optional[int] = None,
     timestamp_gte: typing.Optional[datetime.datetime] = None,
     timestamp_lte: typing.Optional[datetime.datetime] = None,
+    concurrently: bool = True,
 ) -> AccountSearchMetricsSchema:
     """
     Generate search metrics for an account over a period of time.
@@ -1046,6 +2181,7 @@ async def generate_account_search_metrics(
     :param client_id: Only consider search records made by the given API client
     :param timestamp_gte: Only include search records that were created after this timestamp
     :param timestamp_lte: Only include search records that were created before this timestamp
+    :param concurrently: Whether to run the metrics queries concurrently, in separate sessions
     :return: An instance of AccountSearchMetricsSchema with the generated metrics
     """
     timestamp_lte = timestamp_lte or timezone.now()
@@ -1064,21 +2200,26 @@ async def generate_account_search_metrics(
 
     # NOTE: Currently, deleted search records still contribute to the account search metrics.
     # To exclude deleted search records, add `~SearchRecord.is_deleted` to the query_filters
-    account_search_metrics.search_count = await get_search_count(session, query_filters)  # type: ignore
-    account_search_metrics.most_searched_queries = await get_most_searched_queries(
-        session,
-        query_filters=query_filters,
-        limit=10,  # type: ignore
-    )
-    account_search_metrics.most_searched_topics = await get_most_searched_topics(
-        session,
-        query_filters=query_filters,
-        limit=5,  # type: ignore
-    )
-    account_search_metrics.most_searched_words = await get_most_searched_words(
+    (
+        account_search_metrics.search_count,
+        account_search_metrics.most_searched_queries,
+        account_search_metrics.most_searched_topics,
+        account_search_metrics.most_searched_words,
+    ) = await run_queries(
         session,
-        query_filters=query_filters,
-        limit=5,  # type: ignore
+        [
+            functools.partial(get_search_count, query_filters=query_filters),
+            functools.partial(
+                get_most_searched_queries, query_filters=query_filters, limit=10
+            ),
+            functools.partial(
+                get_most_searched_topics, query_filters=query_filters, limit=5
+            ),
+            functools.partial(
+                get_most_searched_words, query_filters=query_filters, limit=5
+            ),
+        ],
+        concurrently=concurrently,
     )
     return account_search_metrics
 
@@ -1087,6 +2228,7 @@ async def generate_global_search_metrics(
     session: AsyncSession,
     timestamp_gte: typing.Optional[datetime.datetime] = None,
     timestamp_lte: typing.Optional[datetime.datetime] = None,
+    concurrently: bool = True,
 ) -> GlobalSearchMetricsSchema:
     """
     Generate global search metrics for the glossary over a period of time.
@@ -1094,6 +2236,7 @@ async def generate_global_search_metrics(
     :param session: The database session to use
     :param timestamp_gte: Only include search records that were created after this timestamp
     :param timestamp_lte: Only include search records that were created before this timestamp
+    :param concurrently: Whether to run the metrics queries concurrently, in separate sessions
     :return: An instance of GlobalSearchMetricsSchema with the generated metrics
     """
     timestamp_lte = timestamp_lte or timezone.now()
@@ -1101,33 +2244,40 @@ async def generate_global_search_metrics(
         period_start=timestamp_gte,
         period_end=timestamp_lte,
     )
-    date_filters = [SearchRecord.timestamp <= timestamp_lte]
-    if timestamp_gte:
-        date_filters.append(SearchRecord.timestamp >= timestamp_gte)
-
-    query_filters = [*date_filters]
+    # Whole hours and days are answered from the search metrics rollups,
+    # and only the rest of the period from the search records.
     # NOTE: Deleted search records always contribute to the global search metrics.
-    global_search_metrics.search_count = await get_search_count(session, query_filters)  # type: ignore
-    global_search_metrics.most_searched_queries = await get_most_searched_queries(
-        session,
-        query_filters=query_filters,
-        limit=10,  # type: ignore
+    period = split_search_metrics_period(
+        await get_search_rollup_watermarks(session),
+        timestamp_lte=timestamp_lte,
+        timestamp_gte=timestamp_gte,
     )
-    global_search_metrics.most_searched_topics = await get_most_searched_topics(
-        session,
-        query_filters=query_filters,
-        limit=5,  # type: ignore
-    )
-    global_search_metrics.most_searched_words = await get_most_searched_words(
+    (
+        global_search_metrics.search_count,
+        global_search_metrics.most_searched_queries,
+        global_search_metrics.most_searched_topics,
+        global_search_metrics.most_searched_words,
+        global_search_metrics.sources,
+        (
+            global_search_metrics.verified_term_count,
+            global_search_metrics.unverified_term_count,
+        ),
+    ) = await run_queries(
         session,
-        query_filters=query_filters,
-        limit=5,  # type: ignore
+        [
+            functools.partial(get_rolled_up_search_count, period=period),
+            functools.partial(
+                get_rolled_up_most_searched_queries, period=period, limit=10
+            ),
+            functools.partial(
+                get_rolled_up_most_searched_topics, period=period, limit=5
+            ),
+            functools.partial(
+                get_rolled_up_most_searched_words, period=period, limit=5
+            ),
+            get_terms_sources,
+            get_verified_and_unverified_term_count,
+        ],
+        concurrently=concurrently,
     )
-    global_search_metrics.sources = await get_terms_sources(session)  # type: ignore
-    (
-        verified_term_count,
-        unverified_term_count,
-    ) = await get_verified_and_unverified_term_count(session)
-    global_search_metrics.verified_term_count = verified_term_count
-    global_search_metrics.unverified_term_count = unverified_term_count
     return global_search_metrics
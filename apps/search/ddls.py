@@ -3,11 +3,22 @@ import logging
 import sqlalchemy as sa
 
 from helpers.fastapi.sqlalchemy import setup
-from apps.search.models import Term, Topic, SearchRecord
+from api.changefeed import GLOSSARY_CHANGES_CHANNEL
+from apps.search.models import (
+    Term,
+    Topic,
+    TermSource,
+    SearchRecord,
+    TermToTopicAssociation,
+    RelatedTermAssociation,
+)
 
 
 logger = logging.getLogger(__name__)
 
+CHANGE_NOTIFICATION_UIDS = 100
+"""Maximum number of changed row UIDs per change notification"""
+
 # Constants for search configuration
 SEARCH_CONFIG = {
     "language": "pg_catalog.english",
@@ -103,6 +114,121 @@ SEARCH_DDLS = (
             query_tsvector, '{SEARCH_CONFIG["language"]}', query
         );
     """),
+    # Notify listeners of changes to glossary rows, so workers can
+    # drop what they cache about the rows (see `api.changefeed`).
+    # Notifications are sent per statement, with the UIDs of the changed
+    # rows in chunks that fit the notification payload size limit, so bulk
+    # changes (e.g. loading terms) do not send a notification per row.
+    sa.DDL(f"""
+    CREATE OR REPLACE FUNCTION notify_glossary_changes() RETURNS trigger AS
+    $$
+    DECLARE
+        changed_uids text[];
+    BEGIN
+        FOR changed_uids IN
+            SELECT array_agg(uid)
+            FROM (
+                SELECT uid, (row_number() OVER () - 1) / {CHANGE_NOTIFICATION_UIDS} AS chunk
+                FROM changed_rows
+            ) AS numbered
+            GROUP BY chunk
+        LOOP
+            PERFORM pg_notify(
+                '{GLOSSARY_CHANGES_CHANNEL}',
+                json_build_object(
+                    'table', TG_TABLE_NAME,
+                    'operation', TG_OP,
+                    'uids', changed_uids,
+                    'txid', txid_current()
+                )::text
+            );
+        END LOOP;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """),
+    *(
+        sa.DDL(f"""
+        DROP TRIGGER IF EXISTS {table}_{operation.lower()}_notify ON {table};
+        CREATE TRIGGER {table}_{operation.lower()}_notify
+            AFTER {operation} ON {table}
+            REFERENCING {transition} TABLE AS changed_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION notify_glossary_changes();
+        """)
+        for table in (
+            Term.__tablename__,
+            Topic.__tablename__,
+            TermSource.__tablename__,
+        )
+        # Transition tables can only be used by triggers on one event
+        for operation, transition in (
+            ("INSERT", "NEW"),
+            ("UPDATE", "NEW"),
+            ("DELETE", "OLD"),
+        )
+    ),
+    # Changes to the topics or relatives of terms are notified as
+    # updates of the terms, as responses including the terms change too.
+    sa.DDL(f"""
+    CREATE OR REPLACE FUNCTION notify_term_association_changes() RETURNS trigger AS
+    $$
+    DECLARE
+        changed_uids text[];
+    BEGIN
+        FOR changed_uids IN
+            SELECT array_agg(uid)
+            FROM (
+                SELECT term.uid, (row_number() OVER () - 1) / {CHANGE_NOTIFICATION_UIDS} AS chunk
+                FROM (SELECT DISTINCT term_id FROM changed_rows) AS changed
+                JOIN {Term.__tablename__} AS term ON term.id = changed.term_id
+            ) AS numbered
+            GROUP BY chunk
+        LOOP
+            PERFORM pg_notify(
+                '{GLOSSARY_CHANGES_CHANNEL}',
+                json_build_object(
+                    'table', '{Term.__tablename__}',
+                    'operation', 'UPDATE',
+                    'uids', changed_uids,
+                    'txid', txid_current()
+                )::text
+            );
+        END LOOP;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """),
+    *(
+        sa.DDL(f"""
+        DROP TRIGGER IF EXISTS {table}_{operation.lower()}_notify ON {table};
+        CREATE TRIGGER {table}_{operation.lower()}_notify
+            AFTER {operation} ON {table}
+            REFERENCING {transition} TABLE AS changed_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION notify_term_association_changes();
+        """)
+        for table in (
+            TermToTopicAssociation.__tablename__,
+            RelatedTermAssociation.__tablename__,
+        )
+        for operation, transition in (
+            ("INSERT", "NEW"),
+            ("DELETE", "OLD"),
+        )
+    ),
+    # Index for case insensitive prefix matching (and ordering) of term names.
+    # Byte-wise collation allows LIKE 'prefix%' to use a plain btree index.
+    sa.DDL(f"""
+    CREATE INDEX IF NOT EXISTS ix_search__terms_name_lower
+        ON {Term.__tablename__} ((lower(name) COLLATE "C"));
+    """),
+    # Trigram index for typo tolerant (fuzzy) matching of term names
+    sa.DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm;"),
+    sa.DDL(f"""
+    CREATE INDEX IF NOT EXISTS ix_search__terms_name_lower_trgm
+        ON {Term.__tablename__} USING gin (lower(name) gin_trgm_ops);
+    """),
     # Execute backfill
     sa.DDL("SELECT backfill_tsvectors();"),
 )
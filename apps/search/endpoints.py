@@ -8,7 +8,7 @@ from helpers.fastapi.dependencies.connections import AsyncDBSession, User
 from helpers.fastapi.response import shortcuts as response
 from helpers.fastapi.response.pagination import paginated_data, PaginatedResponse
 from helpers.fastapi.dependencies.access_control import staff_user_only, ActiveUser
-from helpers.fastapi.requests.query import Limit, Offset, clean_params
+from helpers.fastapi.requests.query import Limit, Offset, ParamNotSet, clean_params
 from helpers.fastapi.exceptions import capture
 from api.dependencies.authentication import (
     authentication_required,
@@ -19,6 +19,16 @@ from api.dependencies.authorization import (
     permissions_required,
 )
 from helpers.fastapi.auditing.dependencies import event
+from helpers.fastapi.config import settings
+from api.pagination import (
+    encode_cursor,
+    cursor_paginated_data,
+    ResultCountMode,
+    ResultCount,
+    count_results,
+    add_result_count,
+)
+from api.caching import invalidate_cache
 from .query import (
     Startswith,
     Verified,
@@ -28,9 +38,14 @@ from .query import (
     TimestampLte,
     Source,
     TermsOrdering,
+    TermsCursor,
 )
 from . import schemas, crud
 from .models import Account
+from .recording import record_search, record_term_view
+from .autocomplete import term_name_index
+from .engine import glossary_search_index
+from .lookups import term_ids_lookup, topic_ids_lookup
 
 
 router = fastapi.APIRouter(
@@ -66,12 +81,22 @@ TermSourceUID: typing.TypeAlias = typing.Annotated[
         ),
         authenticate_connection,
     ],
-    description="Search terms in the glossary.",
+    description=(
+        "Search terms in the glossary. Pass the `cursor` query parameter "
+        "to use keyset pagination instead of limit/offset pagination. "
+        "When full-text search finds too few terms, the first page is filled with "
+        "terms whose names are similar to the query. `search_stage` reports which "
+        "stage produced the results: `fulltext`, `fuzzy` or `fulltext+fuzzy`. "
+        "Pass `count=estimate` or `count=exact` to get the total number of "
+        "results in `total_count`. Results are usually ranked by an in-memory "
+        "index (BM25), and by the database (`ts_rank_cd`) while the index is "
+        "being built, so the order of results can differ between the two."
+    ),
     response_model=PaginatedResponse[schemas.TermSchema],  # type: ignore
     status_code=200,
     operation_id="search_terms",
 )
-@cache(namespace="search")
+@cache(namespace="search", expire=settings.GLOSSARY_CACHE_TTL)
 async def search_terms(
     request: fastapi.Request,
     session: AsyncDBSession,
@@ -86,11 +111,17 @@ async def search_terms(
     source: Source,
     verified: Verified,
     ordering: TermsOrdering,
+    cursor: TermsCursor,
+    count: ResultCountMode = "none",
     limit: typing.Annotated[Limit, Le(100)] = 20,
     offset: Offset = 0,
 ):
-    account = user if user and user.is_authenticated else None
-    client = getattr(request.state, "client", None)
+    use_cursor = cursor is not ParamNotSet
+    if use_cursor and ordering:
+        return response.bad_request(
+            "Custom ordering is not supported with cursor pagination"
+        )
+
     params = clean_params(
         startswith=startswith,
         verified=verified,
@@ -98,16 +129,12 @@ async def search_terms(
         offset=offset,
         ordering=ordering,
     )
-    metadata = params.copy()
-    metadata.pop("ordering", None)
-
     if topics:
         topics_list = await crud.retrieve_topics_by_name_or_uid(session, topics)  # type: ignore
     else:
         topics_list = None
 
     if source:
-        metadata["source"] = source
         known_source = await crud.retrieve_term_source_by_name_or_uid(
             session,
             source,  # type: ignore
@@ -122,37 +149,144 @@ async def search_terms(
     else:
         query_string = None
 
-    account_id = account.id if account else None
-    client_id = client.id if client else None
     source_id = known_source.id if known_source else None
     topic_ids = [topic.id for topic in topics_list] if topics_list else None
-    async with crud.record_search(
-        session,
-        query=query_string,
-        account_id=account_id,
-        client_id=client_id,
-        topics=topics_list,
-        metadata=metadata,
-    ):
-        if "verified" not in params:
-            params["verified"] = True
+    if "verified" not in params:
+        params["verified"] = True
 
+    if use_cursor:
+        params.pop("offset", None)
+        result, next_cursor = await crud.search_terms_by_cursor(
+            session,
+            query=query_string,
+            after=cursor,  # type: ignore
+            topic_ids=topic_ids,
+            source_id=source_id,
+            lean=True,
+            **params,
+        )
+    else:
         result = await crud.search_terms(
             session,
             query=query_string,
             topic_ids=topic_ids,
             source_id=source_id,
+            lean=True,
+            **params,
         )
-        response_data = [schemas.TermSchema.model_validate(term) for term in result]
 
-    await session.commit()
-    return response.success(
-        data=paginated_data(
+    # Misspelled queries rarely match full-text search. When it finds too few
+    # terms, fill the (first) page with terms whose names are similar to the query.
+    search_stage = "fulltext" if query_string else None
+    is_first_page = cursor is None if use_cursor else offset == 0
+    if (
+        query_string
+        and is_first_page
+        and len(result) < min(settings.SEARCH_FUZZY_FALLBACK_THRESHOLD, limit)
+    ):
+        fuzzy_result = await crud.fuzzy_search_terms(
+            session,
+            query=query_string,
+            topic_ids=topic_ids,
+            source_id=source_id,
+            startswith=params.get("startswith"),
+            verified=params.get("verified"),
+            limit=limit - len(result),
+            exclude_ids=[term["id"] for term in result],
+            similarity_threshold=settings.SEARCH_FUZZY_SIMILARITY_THRESHOLD,
+            lean=True,
+        )
+        if fuzzy_result:
+            search_stage = "fulltext+fuzzy" if result else "fuzzy"
+            result = [*result, *fuzzy_result]
+    response_data = schemas.term_serializer.many(result)
+    if search_stage in ("fuzzy", "fulltext+fuzzy"):
+        # Fuzzy matches only fill a first page that full-text search left short,
+        # so the page holds every result there is to page through.
+        total_count = None if count == "none" else ResultCount(len(result), "exact")
+    else:
+        total_count = await count_results(
+            session,
+            crud.select_matching_terms(
+                query_string,
+                topic_ids=topic_ids,
+                source_id=source_id,
+                **params,
+            ),
+            count,
+            page_size=len(result),
+            limit=limit,
+            # Cursor paginated pages after the first have no known offset
+            offset=(0 if cursor is None else None) if use_cursor else offset,
+        )
+
+    if use_cursor:
+        data = cursor_paginated_data(
+            request,
+            data=response_data,
+            limit=limit,
+            next_cursor=encode_cursor(next_cursor) if next_cursor else None,
+        )
+    else:
+        data = paginated_data(
             request,
             data=response_data,
             limit=limit,
             offset=offset,
         )
+    if search_stage:
+        data["search_stage"] = search_stage
+
+    record_search(
+        request,
+        user,
+        query=query_string,
+        topic_ids=topic_ids,
+        source_uid=known_source.uid if known_source else None,
+        startswith=startswith,
+        verified=verified,
+        limit=limit,
+        offset=offset,
+    )
+    return response.success(data=add_result_count(data, total_count))
+
+
+@router.get(
+    "/terms/autocomplete",
+    dependencies=[
+        event(
+            "term_autocomplete",
+            target="terms",
+            description="Autocomplete term names in the glossary",
+        ),
+        permissions_required("terms::*::list"),
+        authenticate_connection,
+    ],
+    description="Suggest (verified) glossary terms whose names start with the given prefix",
+    response_model=response.DataSchema[typing.List[schemas.TermSuggestionSchema]],
+    status_code=200,
+    operation_id="autocomplete_terms",
+)
+@cache(namespace="term_autocomplete", expire=settings.GLOSSARY_CACHE_TTL)
+async def autocomplete_terms(
+    session: AsyncDBSession,
+    prefix: typing.Annotated[
+        str,
+        fastapi.Query(
+            min_length=1,
+            max_length=100,
+            description="The prefix term names should start with (case insensitive)",
+        ),
+    ],
+    limit: typing.Annotated[Limit, Le(50)] = 10,
+):
+    if settings.TERM_AUTOCOMPLETE_IN_MEMORY:
+        index = await term_name_index.ready()
+        return response.success(data=index.lookup(prefix, limit=limit))
+
+    suggestions = await crud.autocomplete_terms(session, prefix, limit=limit)
+    return response.success(
+        data=[{"uid": uid, "name": name} for uid, name in suggestions]
     )
 
 
@@ -188,11 +322,14 @@ async def create_term(
         if not topics:
             return response.bad_request("Invalid topics provided")
 
+    invalidated_namespaces = ["search", "term_autocomplete"]
     if source_data:
         with capture.capture(ValueError, code=400):
             source, created = await crud.get_or_create_term_source(
                 session, **source_data
             )
+            if created:
+                invalidated_namespaces.append("term_sources_list")
             term_name = dumped_data["name"]
             if not created and await crud.check_term_exists_for_source(
                 session,
@@ -210,6 +347,8 @@ async def create_term(
         verified=getattr(user, "is_staff", False),
         topics=set(topics or []),  # type: ignore
     )
+    await session.flush()
+    await crud.update_related_terms(session, term=term)
 
     await session.commit()
     await session.refresh(
@@ -220,6 +359,16 @@ async def create_term(
             "relatives",
         ],
     )
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(
+            *(topic.uid for topic in term.topics),
+            *(relative.uid for relative in term.relatives),
+            term.source.uid if term.source else "",
+            namespaces=invalidated_namespaces,
+        )
+        term_name_index.invalidate()
+        glossary_search_index.invalidate()
+        term_ids_lookup.clear()
     return response.created(
         f"{term.name} has been added to the glossary!",
         data=schemas.TermSchema.model_validate(term),
@@ -243,31 +392,22 @@ async def create_term(
             "terms::*::view",
         ),
         authenticate_connection,
+        fastapi.Depends(record_term_view),
     ],
     description="Retrieve a glossary term by its UID",
     response_model=response.DataSchema[schemas.TermSchema],
     status_code=200,
     operation_id="retrieve_term",
 )
-@cache(namespace="terms_retrieve")
+@cache(namespace="terms_retrieve", expire=settings.GLOSSARY_CACHE_TTL)
 async def retrieve_term(
     session: AsyncDBSession,
-    user: User[Account],
     term_uid: TermUID,
 ):
-    term = await crud.retrieve_term_by_uid(session, uid=term_uid)
+    term = await crud.retrieve_term_by_uid(session, uid=term_uid, lean=True)
     if not term:
         return response.notfound("Term matching the given query does not exist")
 
-    if not term.relatives:
-        await crud.update_related_terms(session, term=term)
-
-    await crud.create_term_view(
-        session,
-        term_id=term.id,
-        viewed_by_id=user.id if user else None,
-    )
-    await session.commit()
     response_data = schemas.TermSchema.model_validate(term)
     return response.success(data=response_data)
 
@@ -319,6 +459,14 @@ async def update_term(
         if not topics:
             return response.bad_request("Invalid topics provided")
 
+    # Terms can match different searches after these change
+    invalidated_namespaces = (
+        ["search"]
+        if {"name", "definition", "verified"} & update_data.keys()
+        else []
+    )
+    if {"name", "verified"} & update_data.keys():
+        invalidated_namespaces.append("term_autocomplete")
     if source_data:
         name = source_data.get("name")
         uid = source_data.get("uid")
@@ -329,6 +477,8 @@ async def update_term(
                 source, created = await crud.get_or_create_term_source(
                     session, **source_data
                 )
+                if created:
+                    invalidated_namespaces.append("term_sources_list")
                 term_name = update_data.get("name", term.name)
                 if not created and await crud.check_term_exists_for_source(
                     session,
@@ -349,7 +499,26 @@ async def update_term(
         term.topics |= set(topics)  # type: ignore
 
     session.add(term)
+    if "name" in update_data or "definition" in update_data:
+        await session.flush()
+        await crud.update_related_terms(session, term=term, rebuild=True)
+
     await session.commit()
+    await session.refresh(term, attribute_names=["relatives"])
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        # Responses that included the term before the update are tagged with its UID.
+        # Topics, source and relatives are invalidated for responses it now belongs to.
+        await invalidate_cache(
+            term.uid,
+            *(topic.uid for topic in term.topics),
+            *(relative.uid for relative in term.relatives),
+            term.source.uid if term.source else "",
+            namespaces=invalidated_namespaces,
+        )
+        if "term_autocomplete" in invalidated_namespaces:
+            term_name_index.invalidate()
+        glossary_search_index.invalidate()
+        term_ids_lookup.clear()
     return response.success(data=schemas.TermSchema.model_validate(term))
 
 
@@ -392,6 +561,11 @@ async def delete_term(
         return response.notfound("Term matching the given query does not exist")
 
     await session.commit()
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(deleted_term.uid)
+        term_name_index.invalidate()
+        glossary_search_index.invalidate()
+        term_ids_lookup.clear()
     return response.success(f"{deleted_term.name} has been deleted")
 
 
@@ -412,7 +586,7 @@ async def delete_term(
     status_code=200,
     operation_id="retrieve_topics",
 )
-@cache(namespace="topics_list")
+@cache(namespace="topics_list", expire=settings.GLOSSARY_CACHE_TTL)
 async def retrieve_topics(
     request: fastapi.Request,
     session: AsyncDBSession,
@@ -464,6 +638,9 @@ async def create_topic(
 
     topic = await crud.create_topic(session, **data.model_dump())
     await session.commit()
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(namespaces=["topics_list"])
+        topic_ids_lookup.clear()
     return response.success(data=schemas.TopicSchema.model_validate(topic))
 
 
@@ -489,7 +666,7 @@ async def create_topic(
     status_code=200,
     operation_id="retrieve_topic",
 )
-@cache(namespace="topics_retrieve")
+@cache(namespace="topics_retrieve", expire=settings.GLOSSARY_CACHE_TTL)
 async def retrieve_topic(session: AsyncDBSession, topic_uid: TopicUID):
     topic = await crud.retrieve_topic_by_uid(session, uid=topic_uid)
     if not topic:
@@ -541,6 +718,9 @@ async def update_topic(
 
     session.add(topic)
     await session.commit()
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(topic.uid)
+        topic_ids_lookup.clear()
     return response.success(data=schemas.TopicSchema.model_validate(topic))
 
 
@@ -583,6 +763,10 @@ async def delete_topic(
         return response.notfound("Topic matching the given query does not exist")
 
     await session.commit()
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(deleted_topic.uid)
+        glossary_search_index.invalidate()
+        topic_ids_lookup.clear()
     return response.success(f"{deleted_topic.name} has been deleted")
 
 
@@ -609,7 +793,7 @@ async def delete_topic(
     status_code=200,
     operation_id="retrieve_topic_terms",
 )
-@cache(namespace="topic_terms_list")
+@cache(namespace="topic_terms_list", expire=settings.GLOSSARY_CACHE_TTL)
 async def retrieve_topic_terms(
     request: fastapi.Request,
     session: AsyncDBSession,
@@ -618,6 +802,7 @@ async def retrieve_topic_terms(
     ordering: TermsOrdering,
     verified: typing.Optional[Verified] = True,
     source: typing.Optional[Source] = None,
+    count: ResultCountMode = "none",
     limit: typing.Annotated[Limit, Le(100)] = 20,
     offset: Offset = 0,
 ):
@@ -644,15 +829,27 @@ async def retrieve_topic_terms(
     terms = await crud.retrieve_topic_terms(
         session,
         topic_id=topic.id,
+        lean=True,
         **params,
     )
-    response_data = [schemas.TermSchema.model_validate(term) for term in terms]
+    response_data = schemas.term_serializer.many(terms)
+    total_count = await count_results(
+        session,
+        crud.select_matching_terms(topic_ids=[topic.id], **params),
+        count,
+        page_size=len(terms),
+        limit=limit,
+        offset=offset,
+    )
     return response.success(
-        data=paginated_data(
-            request,
-            data=response_data,
-            limit=limit,
-            offset=offset,
+        data=add_result_count(
+            paginated_data(
+                request,
+                data=response_data,
+                limit=limit,
+                offset=offset,
+            ),
+            total_count,
         )
     )
 
@@ -672,7 +869,7 @@ async def retrieve_topic_terms(
     status_code=200,
     operation_id="retrieve_term_sources",
 )
-@cache(namespace="term_sources_list")
+@cache(namespace="term_sources_list", expire=settings.GLOSSARY_CACHE_TTL)
 async def retrieve_term_sources(
     request: fastapi.Request,
     session: AsyncDBSession,
@@ -718,6 +915,8 @@ async def create_term_source(
 ):
     term_source = await crud.create_term_source(session, **data.model_dump())
     await session.commit()
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(namespaces=["term_sources_list"])
     return response.created(data=schemas.TermSourceSchema.model_validate(term_source))
 
 
@@ -743,7 +942,7 @@ async def create_term_source(
     status_code=200,
     operation_id="retrieve_term_source",
 )
-@cache(namespace="term_source_retrieve")
+@cache(namespace="term_source_retrieve", expire=settings.GLOSSARY_CACHE_TTL)
 async def retrieve_term_source(
     session: AsyncDBSession,
     term_source_uid: TermSourceUID,
@@ -777,7 +976,7 @@ async def retrieve_term_source(
     status_code=200,
     operation_id="retrieve_source_terms",
 )
-@cache(namespace="term_source_terms_list")
+@cache(namespace="term_source_terms_list", expire=settings.GLOSSARY_CACHE_TTL)
 async def retrieve_source_terms(
     request: fastapi.Request,
     session: AsyncDBSession,
@@ -790,6 +989,7 @@ async def retrieve_source_terms(
         MaxLen(10),
         Doc("What topics should the terms fetched be related to?"),
     ] = None,
+    count: ResultCountMode = "none",
     limit: typing.Annotated[Limit, Le(100)] = 20,
     offset: Offset = 0,
 ):
@@ -811,15 +1011,27 @@ async def retrieve_source_terms(
     terms = await crud.retrieve_source_terms(
         session,
         source_id=term_source.id,
+        lean=True,
         **params,
     )
-    response_data = [schemas.TermSchema.model_validate(term) for term in terms]
+    response_data = schemas.term_serializer.many(terms)
+    total_count = await count_results(
+        session,
+        crud.select_matching_terms(source_id=term_source.id, **params),
+        count,
+        page_size=len(terms),
+        limit=limit,
+        offset=offset,
+    )
     return response.success(
-        data=paginated_data(
-            request,
-            data=response_data,
-            limit=limit,
-            offset=offset,
+        data=add_result_count(
+            paginated_data(
+                request,
+                data=response_data,
+                limit=limit,
+                offset=offset,
+            ),
+            total_count,
         )
     )
 
@@ -865,6 +1077,8 @@ async def update_term_source(
 
     session.add(term_source)
     await session.commit()
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(term_source.uid)
     return response.success(data=schemas.TermSourceSchema.model_validate(term_source))
 
 
@@ -905,6 +1119,8 @@ async def delete_term_source(
         return response.notfound("Term source matching the given query does not exist")
 
     await session.commit()
+    if not settings.CHANGE_FEED_ENABLED:  # Otherwise done by `apps.search.changes`
+        await invalidate_cache(deleted_term_source.uid)
     return response.success(f"{deleted_term_source.name} has been deleted")
 
 
@@ -0,0 +1,368 @@
+import asyncio
+import collections
+import itertools
+import logging
+import math
+import re
+import time
+import typing
+import cachetools
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from helpers.fastapi.config import settings
+from helpers.fastapi.sqlalchemy.setup import get_async_session
+from helpers.fastapi.sqlalchemy.utils import text_to_tsquery
+from .models import Term, Topic, TermToTopicAssociation
+from .ddls import SEARCH_CONFIG
+
+
+logger = logging.getLogger(__name__)
+
+# Postgres' default `ts_rank` weights for the D, C, B and A labels
+TSVECTOR_LABEL_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+FIELD_WEIGHTS = {
+    field: TSVECTOR_LABEL_WEIGHTS[label]
+    for field, label in SEARCH_CONFIG["weights"].items()
+}
+"""Weight of each indexed term field, mirroring the tsvector weights in `SEARCH_CONFIG`"""
+
+FIELD_LABELS = SEARCH_CONFIG["weights"]
+"""Label of the lexemes of each indexed term field, in the terms' search tsvectors"""
+
+TSQUERY_LEXEME = r"'((?:[^']|'')*)'"
+CONJUNCTIVE_TSQUERY = re.compile(rf"{TSQUERY_LEXEME}(?: & {TSQUERY_LEXEME})*")
+"""Text of a tsquery that only ANDs plain lexemes, e.g. `'cell' & 'membran'`"""
+
+
+class IndexedTerm(typing.NamedTuple):
+    id: int
+    name: str
+    name_lower: str
+    verified: bool
+    source_id: typing.Optional[int]
+    topic_ids: typing.FrozenSet[int]
+
+
+class GlossarySearchIndex:
+    """
+    Per-worker, in-memory inverted index of (undeleted) glossary terms,
+    ranking matches with BM25 over the term name and definition fields,
+    weighted like the terms' search tsvectors.
+
+    Terms are indexed by the lexemes of their search tsvectors, and queries
+    are parsed into tsqueries by Postgres, like the database search does. Only
+    queries that AND plain lexemes are answered from the index, so it matches
+    the same terms the database does. Matches are ranked by BM25, not
+    `ts_rank_cd`, so they can be ordered (and paged) differently.
+
+    The index is built on `start()`, and rebuilt in the background every
+    `ttl` seconds, or when invalidated after terms change. Searches are
+    answered from the current index while a new one is being built.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        """
+        Create a new glossary search index.
+
+        :param ttl: Number of seconds after which the index is rebuilt
+        """
+        self.ttl = ttl
+        self._terms: typing.Dict[int, IndexedTerm] = {}
+        self._postings: typing.Dict[
+            str, typing.Dict[int, typing.Tuple[int, int]]
+        ] = {}
+        self._field_lengths: typing.Dict[int, typing.Tuple[int, int]] = {}
+        self._ids_by_name: typing.List[int] = []
+        self._query_lexemes: cachetools.LRUCache[
+            str, typing.Optional[typing.Tuple[str, ...]]
+        ] = cachetools.LRUCache(maxsize=4096)
+        self._average_lengths: typing.Tuple[float, float] = (1.0, 1.0)
+        self._built_at: typing.Optional[float] = None
+        self._build_lock: typing.Optional[asyncio.Lock] = None
+        self._task: typing.Optional[asyncio.Task] = None
+        self._invalidated: typing.Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._built_at is not None
+
+    async def build(self) -> None:
+        """Build the index from the terms in the database, replacing the current index."""
+        if self._build_lock is None:
+            self._build_lock = asyncio.Lock()
+        async with self._build_lock:
+            async with get_async_session() as session:
+                topic_ids = (
+                    sa.select(sa.func.array_agg(TermToTopicAssociation.topic_id))
+                    .join(Topic, Topic.id == TermToTopicAssociation.topic_id)
+                    .where(
+                        TermToTopicAssociation.term_id == Term.id,
+                        ~Topic.is_deleted,
+                    )
+                    .scalar_subquery()
+                )
+                lexemes = (
+                    sa.func.unnest(Term.search_tsvector)
+                    .table_valued("lexeme", "positions", "weights")
+                    .render_derived()
+                )
+                # Mapping of each lexeme to the labels of its positions,
+                # that is, to the fields it occurs in, once per occurrence
+                lexeme_labels = (
+                    sa.select(
+                        sa.func.json_object_agg(lexemes.c.lexeme, lexemes.c.weights)
+                    )
+                    .select_from(lexemes)
+                    .scalar_subquery()
+                )
+                result = await session.execute(
+                    sa.select(
+                        Term.id,
+                        Term.name,
+                        Term.verified,
+                        Term.source_id,
+                        topic_ids,
+                        sa.type_coerce(lexeme_labels, sa.JSON),
+                    ).where(~Term.is_deleted)
+                )
+                rows = result.all()
+            # Building is CPU bound, so keep the event loop responsive meanwhile
+            index = await asyncio.to_thread(self._build, rows)
+            (
+                self._terms,
+                self._postings,
+                self._field_lengths,
+                self._average_lengths,
+                self._ids_by_name,
+            ) = index
+            self._built_at = time.monotonic()
+            logger.info(f"Built in-memory glossary search index of {len(rows)} terms")
+
+    @staticmethod
+    def _build(rows: typing.Sequence[typing.Any]):
+        terms = {}
+        postings: typing.DefaultDict[
+            str, typing.Dict[int, typing.Tuple[int, int]]
+        ] = collections.defaultdict(dict)
+        field_lengths = {}
+        name_label, definition_label = FIELD_LABELS["name"], FIELD_LABELS["definition"]
+        for term_id, name, verified, source_id, topic_ids, lexeme_labels in rows:
+            terms[term_id] = IndexedTerm(
+                id=term_id,
+                name=name,
+                name_lower=name.lower(),
+                verified=bool(verified),
+                source_id=source_id,
+                topic_ids=frozenset(topic_ids or ()),
+            )
+            name_length = definition_length = 0
+            for lexeme, labels in (lexeme_labels or {}).items():
+                labels = labels or ()
+                name_tf = labels.count(name_label)
+                definition_tf = labels.count(definition_label)
+                name_length += name_tf
+                definition_length += definition_tf
+                postings[lexeme][term_id] = (name_tf, definition_tf)
+            field_lengths[term_id] = (name_length, definition_length)
+
+        count = len(field_lengths) or 1
+        average_lengths = (
+            max(sum(lengths[0] for lengths in field_lengths.values()) / count, 1.0),
+            max(sum(lengths[1] for lengths in field_lengths.values()) / count, 1.0),
+        )
+        ids_by_name = [
+            term.id
+            for term in sorted(
+                terms.values(), key=lambda term: (term.name, term.verified, term.id)
+            )
+        ]
+        return terms, dict(postings), field_lengths, average_lengths, ids_by_name
+
+    async def parse_query(
+        self, session: AsyncSession, query: str
+    ) -> typing.Optional[typing.Tuple[str, ...]]:
+        """
+        Return the lexemes of a search query, as parsed into a tsquery
+        by Postgres, the same way the database search parses it.
+
+        :param session: The database session, used for queries not parsed before
+        :param query: The search query
+        :return: The lexemes the query ANDs. None if the tsquery is not a plain
+            conjunction of lexemes (e.g. uses OR, NOT, phrase or prefix operators),
+            so the query cannot be answered from the index.
+        """
+        if query in self._query_lexemes:
+            return self._query_lexemes[query]
+
+        result = await session.execute(
+            sa.select(sa.cast(text_to_tsquery(query), sa.Text))
+        )
+        tsquery = (result.scalar_one() or "").strip()
+        lexemes: typing.Optional[typing.Tuple[str, ...]] = None
+        if not tsquery:
+            # Only stop words, which match no terms
+            lexemes = ()
+        elif CONJUNCTIVE_TSQUERY.fullmatch(tsquery):
+            lexemes = tuple(
+                lexeme.replace("''", "'").replace("\\\\", "\\")
+                for lexeme in re.findall(TSQUERY_LEXEME, tsquery)
+            )
+        self._query_lexemes[query] = lexemes
+        return lexemes
+
+    def _score(
+        self,
+        term_id: int,
+        token_postings: typing.List[typing.Tuple[float, typing.Dict]],
+    ) -> float:
+        name_length, definition_length = self._field_lengths[term_id]
+        average_name_length, average_definition_length = self._average_lengths
+        score = 0.0
+        for idf, postings in token_postings:
+            name_tf, definition_tf = postings[term_id]
+            # BM25F: combine the length normalized, weighted field frequencies
+            tf = FIELD_WEIGHTS["name"] * name_tf / (
+                1 - self.b + self.b * name_length / average_name_length
+            ) + FIELD_WEIGHTS["definition"] * definition_tf / (
+                1 - self.b + self.b * definition_length / average_definition_length
+            )
+            score += idf * tf * (self.k1 + 1) / (tf + self.k1)
+        return score
+
+    def search(
+        self,
+        lexemes: typing.Optional[typing.Iterable[str]] = None,
+        *,
+        topic_ids: typing.Optional[typing.Iterable[int]] = None,
+        startswith: typing.Optional[typing.Iterable[str]] = None,
+        source_id: typing.Optional[int] = None,
+        verified: typing.Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> typing.List[int]:
+        """
+        Search the index, with the filters of `crud.search_terms`.
+
+        All query lexemes must match a term. Matching terms are ordered by
+        relevance (BM25, unlike the database's `ts_rank_cd`), then by name.
+        Without a query, terms are ordered by name.
+
+        :param lexemes: The lexemes of the search query (see `parse_query`).
+            None, if there is no query.
+        :return: The IDs of the matching terms, in order
+        """
+        topic_ids = set(topic_ids) if topic_ids else None
+        prefixes = (
+            tuple(letter.lower() for letter in startswith if letter)
+            if startswith
+            else None
+        )
+
+        def is_match(term: IndexedTerm) -> bool:
+            if verified is not None and term.verified != verified:
+                return False
+            if source_id and term.source_id != source_id:
+                return False
+            if topic_ids and topic_ids.isdisjoint(term.topic_ids):
+                return False
+            if prefixes and not term.name_lower.startswith(prefixes):
+                return False
+            return True
+
+        if lexemes is None:
+            # Walk the terms in name order, only until the page is filled
+            matching_ids = (
+                term_id
+                for term_id in self._ids_by_name
+                if is_match(self._terms[term_id])
+            )
+            return list(itertools.islice(matching_ids, offset, offset + limit))
+
+        lexemes = set(lexemes)
+        if not lexemes:
+            return []
+        token_postings = []
+        for lexeme in lexemes:
+            postings = self._postings.get(lexeme)
+            if not postings:
+                return []
+            document_count = len(postings)
+            idf = math.log(
+                1 + (len(self._terms) - document_count + 0.5) / (document_count + 0.5)
+            )
+            token_postings.append((idf, postings))
+        # Intersect, starting from the rarest lexeme
+        token_postings.sort(key=lambda item: len(item[1]))
+        candidate_ids = set(token_postings[0][1])
+        for _, postings in token_postings[1:]:
+            candidate_ids.intersection_update(postings)
+
+        matches = []
+        for term_id in candidate_ids:
+            term = self._terms[term_id]
+            if not is_match(term):
+                continue
+            score = self._score(term_id, token_postings)
+            matches.append((-score, term.name, term.verified, term_id))
+
+        matches.sort()
+        return [match[-1] for match in matches[offset : offset + limit]]
+
+    def invalidate(self) -> None:
+        """Rebuild the index in the background, soon."""
+        if self._invalidated is not None:
+            self._invalidated.set()
+
+    async def _run(self) -> None:
+        assert self._invalidated is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._invalidated.wait(), self.ttl)
+            except asyncio.TimeoutError:
+                pass
+            self._invalidated.clear()
+            try:
+                await self.build()
+            except Exception as exc:
+                logger.error(
+                    f"Failed to rebuild in-memory glossary search index: {exc}"
+                )
+
+    async def start(self) -> None:
+        """Build the index, and keep rebuilding it periodically."""
+        if self._task is not None and not self._task.done():
+            return
+        self._invalidated = asyncio.Event()
+        try:
+            await self.build()
+        except Exception as exc:
+            # Searches use the database until the index is built
+            logger.error(f"Failed to build in-memory glossary search index: {exc}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop rebuilding the index periodically."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+glossary_search_index = GlossarySearchIndex(ttl=settings.SEARCH_IN_MEMORY_INDEX_TTL)
+
+
+__all__ = [
+    "GlossarySearchIndex",
+    "glossary_search_index",
+]
@@ -0,0 +1,68 @@
+import typing
+import cachetools
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from helpers.fastapi.config import settings
+from .models import Term, Topic
+from . import crud
+
+
+class IDLookup:
+    """
+    Per-worker cache of the IDs of the terms or topics matching
+    sets of names or UIDs, e.g. to filter rows by related term IDs.
+
+    Entries expire after `ttl` seconds, and are cleared when terms
+    or topics are changed through the API, or the change feed reports
+    changes (see `apps.search.changes`).
+    """
+
+    def __init__(
+        self,
+        model: typing.Union[typing.Type[Term], typing.Type[Topic]],
+        *,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+    ) -> None:
+        """
+        Create a new ID lookup.
+
+        :param model: `Term` or `Topic`
+        :param maxsize: The maximum number of name/UID sets to cache the IDs of
+        :param ttl: Number of seconds after which cached IDs expire
+        """
+        self.model = model
+        self._cache: cachetools.TTLCache[
+            typing.FrozenSet[str], typing.Tuple[int, ...]
+        ] = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def __call__(
+        self, session: AsyncSession, names_or_uids: typing.Iterable[str]
+    ) -> typing.List[int]:
+        """
+        Return the IDs of the (undeleted) terms or topics matching the given names or UIDs.
+
+        :param session: The database session, used on cache misses
+        :param names_or_uids: The names or UIDs to match
+        """
+        key = frozenset(names_or_uids)
+        if not key:
+            return []
+        ids = self._cache.get(key)
+        if ids is None:
+            ids = tuple(
+                await crud.retrieve_ids_by_name_or_uid(session, self.model, key)
+            )
+            self._cache[key] = ids
+        return list(ids)
+
+    def clear(self) -> None:
+        """Clear the cached IDs."""
+        self._cache.clear()
+
+
+term_ids_lookup = IDLookup(Term, ttl=settings.ID_LOOKUP_CACHE_TTL)
+topic_ids_lookup = IDLookup(Topic, ttl=settings.ID_LOOKUP_CACHE_TTL)
+
+
+__all__ = ["IDLookup", "term_ids_lookup", "topic_ids_lookup"]
@@ -304,6 +304,33 @@ class TermView(models.Model):
     )
 
 
+class TermViewCount(models.Model):
+    """Model representing the number of views of a term on a given day"""
+
+    __auto_tablename__ = True
+
+    term_id: orm.Mapped[int] = orm.mapped_column(
+        sa.ForeignKey("search__terms.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    date: orm.Mapped[datetime.date] = orm.mapped_column(
+        sa.Date,
+        index=True,
+        nullable=False,
+        doc="The day the term was viewed",
+    )
+    view_count: orm.Mapped[int] = orm.mapped_column(
+        sa.BigInteger,
+        nullable=False,
+        default=0,
+        server_default=sa.text("0"),
+        doc="The number of times the term was viewed on the day",
+    )
+
+    __table_args__ = (sa.UniqueConstraint("term_id", "date"),)
+
+
 class SearchRecordToTopicAssociation(models.Model):
     __auto_tablename__ = True
 
@@ -406,3 +433,80 @@ class SearchRecord(mixins.UUID7PrimaryKeyMixin, models.Model):  # type: ignore
         ),
     )
 
+
+class SearchRollupMixin:
+    """
+    Columns shared by search metrics rollups.
+
+    Rollups hold the number of searches made within a time bucket (an hour or a day),
+    so that search metrics over long periods do not have to scan search records.
+    """
+
+    bucket_size: orm.Mapped[typing.Annotated[str, MaxLen(10)]] = orm.mapped_column(
+        sa.String(10),
+        nullable=False,
+        doc="The size of the time bucket, either 'hour' or 'day'",
+    )
+    bucket_start: orm.Mapped[datetime.datetime] = orm.mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        doc="The (UTC) start of the time bucket",
+    )
+    search_count: orm.Mapped[int] = orm.mapped_column(
+        sa.BigInteger,
+        nullable=False,
+        default=0,
+        server_default=sa.text("0"),
+        doc="The number of searches made within the time bucket",
+    )
+
+
+class SearchCountRollup(SearchRollupMixin, models.Model):
+    """Model representing the number of searches made within a time bucket"""
+
+    __auto_tablename__ = True
+    __table_args__ = (sa.UniqueConstraint("bucket_size", "bucket_start"),)
+
+
+class SearchQueryRollup(SearchRollupMixin, models.Model):
+    """Model representing the number of searches for a query within a time bucket"""
+
+    __auto_tablename__ = True
+
+    query: orm.Mapped[typing.Annotated[str, MaxLen(255)]] = orm.mapped_column(
+        sa.String(255),
+        nullable=False,
+        doc="The (lower-cased and trimmed) search query",
+    )
+
+    __table_args__ = (sa.UniqueConstraint("bucket_size", "bucket_start", "query"),)
+
+
+class SearchWordRollup(SearchRollupMixin, models.Model):
+    """Model representing the number of searches for a word within a time bucket"""
+
+    __auto_tablename__ = True
+
+    word: orm.Mapped[typing.Annotated[str, MaxLen(255)]] = orm.mapped_column(
+        sa.String(255),
+        nullable=False,
+        doc="The (lower-cased) word in search queries",
+    )
+
+    __table_args__ = (sa.UniqueConstraint("bucket_size", "bucket_start", "word"),)
+
+
+class SearchTopicRollup(SearchRollupMixin, models.Model):
+    """Model representing the number of searches on a topic within a time bucket"""
+
+    __auto_tablename__ = True
+
+    topic_id: orm.Mapped[int] = orm.mapped_column(
+        sa.ForeignKey("search__topics.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    __table_args__ = (
+        sa.UniqueConstraint("bucket_size", "bucket_start", "topic_id"),
+    )
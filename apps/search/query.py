@@ -11,6 +11,7 @@ from helpers.fastapi.requests.query import (
 )
 from helpers.generics.pydantic import BoolLike
 
+from api.pagination import decode_cursor
 from .models import Term
 
 
@@ -150,6 +151,78 @@ TimestampLte: typing.TypeAlias = typing.Annotated[
 ]
 """Annotated dependency to parse `timestamp_lte` query parameter into a timezone-aware datetime"""
 
+
+class TermCursor(typing.NamedTuple):
+    """Position of the last term in a page of keyset paginated search results."""
+
+    rank: typing.Optional[float]
+    name: str
+    id: int
+
+
+INT4_RANGE = range(-(2**31), 2**31)
+"""Range of the (Postgres `integer`) IDs of terms"""
+
+
+def is_valid_terms_cursor(values: typing.Any) -> bool:
+    """
+    Check that decoded cursor values are a term's rank, name and ID, as
+    encoded by the terms search endpoint, so they can be compared with terms.
+    """
+    if not isinstance(values, list) or len(values) != len(TermCursor._fields):
+        return False
+    rank, name, id_ = values
+    if isinstance(rank, bool) or isinstance(id_, bool):
+        return False
+    return (
+        (rank is None or isinstance(rank, (int, float)))
+        and isinstance(name, str)
+        and "\x00" not in name  # Postgres text cannot contain NUL
+        and isinstance(id_, int)
+        and id_ in INT4_RANGE
+    )
+
+
+def parse_terms_cursor_query(
+    cursor: typing.Annotated[
+        typing.Optional[str],
+        fastapi.Query(
+            description=(
+                "Cursor for keyset pagination. Pass an empty cursor to fetch the first page, "
+                "then the `next_cursor` returned with each page to fetch the next"
+            ),
+            max_length=1024,
+        ),
+    ] = None,
+) -> typing.Union[typing.Optional[TermCursor], QueryParamNotSet]:
+    """Parse the terms keyset pagination cursor query parameter"""
+    if cursor is None:
+        return ParamNotSet
+
+    cursor = cursor.strip()
+    if not cursor:
+        return None
+    try:
+        values = decode_cursor(cursor)
+    except ValueError:
+        values = None
+    if not is_valid_terms_cursor(values):
+        raise fastapi.HTTPException(
+            status_code=fastapi.status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid cursor",
+        )
+    return TermCursor(*values)
+
+
+TermsCursor: typing.TypeAlias = typing.Annotated[
+    typing.Union[typing.Optional[TermCursor], QueryParamNotSet],
+    fastapi.Depends(parse_terms_cursor_query),
+]
+"""
+Annotated dependency to parse the `cursor` query parameter into a `TermCursor`.
+`None` means the first page, `ParamNotSet` means offset pagination should be used.
+"""
+
 terms_ordering_query_parser = ordering_query_parser_factory(
     Term,
     allowed_columns={
@@ -171,4 +244,6 @@ __all__ = [
     "TimestampGte",
     "TimestampLte",
     "TermsOrdering",
+    "TermCursor",
+    "TermsCursor",
 ]
@@ -0,0 +1,285 @@
+import abc
+import asyncio
+import collections
+import datetime
+import logging
+import typing
+import uuid
+import fastapi
+
+from helpers.fastapi.config import settings
+from helpers.fastapi.requests.query import (
+    ParamNotSet,
+    QueryParamNotSet,
+    clean_params,
+)
+from helpers.fastapi.sqlalchemy.setup import get_async_session
+from helpers.fastapi.utils import timezone
+from .models import Account
+from . import crud
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedRecorder(abc.ABC):
+    """
+    Base class for recorders that buffer records in memory and save them in batches.
+
+    The buffer is flushed when it reaches `batch_size` records, or every
+    `interval` seconds, whichever comes first. Records are therefore saved
+    without requests waiting on database writes.
+    """
+
+    def __init__(self, batch_size: int = 500, interval: float = 5.0) -> None:
+        """
+        Create a new recorder.
+
+        :param batch_size: Number of buffered records that triggers a flush
+        :param interval: Interval in seconds between periodic flushes
+        """
+        self.batch_size = batch_size
+        self.interval = interval
+        self._flush_event: typing.Optional[asyncio.Event] = None
+        self._flush_lock: typing.Optional[asyncio.Lock] = None
+        self._task: typing.Optional[asyncio.Task] = None
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Return the number of buffered records."""
+
+    def _buffered(self) -> None:
+        """Call after buffering a record, to flush early when the buffer is full."""
+        if self._flush_event is not None and len(self) >= self.batch_size:
+            self._flush_event.set()
+
+    @abc.abstractmethod
+    async def _flush(self) -> int:
+        """Save all buffered records to the database, and return the number saved."""
+
+    async def flush(self) -> int:
+        """
+        Save all buffered records to the database.
+
+        :return: The number of records saved
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            return await self._flush()
+
+    async def _run(self) -> None:
+        assert self._flush_event is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start flushing buffered records periodically."""
+        if self._task is not None and not self._task.done():
+            return
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop flushing buffered records periodically, and flush any remaining records."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+class SearchRecorder(BatchedRecorder):
+    """Buffers searches in memory and saves them to the database in batches."""
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        interval: float = 5.0,
+        max_buffer_size: typing.Optional[int] = None,
+    ) -> None:
+        """
+        Create a new search recorder.
+
+        :param batch_size: Number of buffered searches that triggers a flush
+        :param interval: Interval in seconds between periodic flushes
+        :param max_buffer_size: Maximum number of searches to keep buffered while
+            flushes are failing. Defaults to ten times the batch size.
+        """
+        super().__init__(batch_size=batch_size, interval=interval)
+        self.max_buffer_size = max_buffer_size or batch_size * 10
+        self._buffer: typing.List[typing.Dict[str, typing.Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(
+        self,
+        query: typing.Optional[str] = None,
+        *,
+        account_id: typing.Optional[uuid.UUID] = None,
+        client_id: typing.Optional[uuid.UUID] = None,
+        topic_ids: typing.Optional[typing.Iterable[int]] = None,
+        metadata: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    ) -> None:
+        """
+        Buffer a search to be recorded.
+
+        :param query: The search query
+        :param account_id: The ID of the account that made the search
+        :param client_id: The ID of the API client that was used to make the search
+        :param topic_ids: The IDs of the topics the search was constrained to
+        :param metadata: Additional metadata to associate with the search
+        """
+        self._buffer.append(
+            {
+                "query": query,
+                "account_id": account_id,
+                "client_id": client_id,
+                "topic_ids": sorted(set(topic_ids)) if topic_ids else None,
+                "metadata": metadata,
+                "timestamp": timezone.now(),
+            }
+        )
+        self._buffered()
+
+    async def _flush(self) -> int:
+        buffered, self._buffer = self._buffer, []
+        if not buffered:
+            return 0
+
+        try:
+            async with get_async_session() as session:
+                count = await crud.create_search_records(session, buffered)
+                await session.commit()
+            return count
+        except Exception as exc:
+            logger.error(f"Failed to record {len(buffered)} searches: {exc}")
+            # Keep the searches for the next flush, up to the maximum buffer size
+            self._buffer[:0] = buffered
+            del self._buffer[: max(len(self._buffer) - self.max_buffer_size, 0)]
+            return 0
+
+
+class TermViewCounter(BatchedRecorder):
+    """
+    Counts term views in memory, and adds them to the daily
+    view counts of the terms in the database, in batches.
+    """
+
+    def __init__(self, batch_size: int = 500, interval: float = 30.0) -> None:
+        """
+        Create a new term view counter.
+
+        :param batch_size: Number of distinct (term, day) counts that triggers a flush
+        :param interval: Interval in seconds between periodic flushes
+        """
+        super().__init__(batch_size=batch_size, interval=interval)
+        self._counts: typing.Counter[typing.Tuple[str, datetime.date]] = (
+            collections.Counter()
+        )
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def record(self, term_uid: str) -> None:
+        """
+        Count a view of a term.
+
+        :param term_uid: The UID of the term viewed
+        """
+        self._counts[(term_uid, timezone.now().date())] += 1
+        self._buffered()
+
+    async def _flush(self) -> int:
+        counts, self._counts = self._counts, collections.Counter()
+        if not counts:
+            return 0
+
+        try:
+            async with get_async_session() as session:
+                count = await crud.increment_term_view_counts(session, counts)
+                await session.commit()
+            return count
+        except Exception as exc:
+            logger.error(f"Failed to record views of {len(counts)} terms: {exc}")
+            # Counts are aggregated, so keeping them for the next flush is cheap
+            self._counts.update(counts)
+            return 0
+
+
+search_recorder = SearchRecorder(
+    batch_size=settings.SEARCH_RECORDING_BATCH_SIZE,
+    interval=settings.SEARCH_RECORDING_INTERVAL,
+)
+term_view_counter = TermViewCounter(interval=settings.TERM_VIEWS_RECORDING_INTERVAL)
+
+
+def record_search(
+    request: fastapi.Request,
+    user: typing.Optional[Account],
+    *,
+    query: typing.Optional[str],
+    topic_ids: typing.Optional[typing.Iterable[int]] = None,
+    source_uid: typing.Optional[str] = None,
+    startswith: typing.Union[str, QueryParamNotSet] = ParamNotSet,
+    verified: typing.Union[bool, QueryParamNotSet] = ParamNotSet,
+    limit: int = 20,
+    offset: int = 0,
+) -> None:
+    """
+    Record a search made by a request.
+
+    Called by the search endpoint once the search has succeeded, with the
+    topics and source it resolved. Requests that are rejected or fail are
+    not recorded, and neither are responses served from the cache.
+    """
+    account = user if user and user.is_authenticated else None
+    client = getattr(request.state, "client", None)
+    metadata = clean_params(
+        startswith=startswith,
+        verified=verified,
+        limit=limit,
+        offset=offset,
+    )
+    if source_uid:
+        metadata["source"] = source_uid
+
+    search_recorder.record(
+        query=query,
+        account_id=account.id if account else None,
+        client_id=client.id if client else None,
+        topic_ids=topic_ids,
+        metadata=metadata,
+    )
+
+
+async def record_term_view(
+    term_uid: typing.Annotated[str, fastapi.Path(description="Term UID")],
+) -> None:
+    """
+    Dependency that counts the term view made by a request.
+
+    Runs before the (cached) term retrieval endpoint, so that
+    term views served from the cache are counted too.
+    """
+    term_view_counter.record(term_uid)
+
+
+__all__ = [
+    "SearchRecorder",
+    "TermViewCounter",
+    "search_recorder",
+    "term_view_counter",
+    "record_search",
+    "record_term_view",
+]
@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+import logging
+import typing
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from helpers.fastapi.config import settings
+from helpers.fastapi.sqlalchemy.setup import get_async_session
+from helpers.fastapi.utils import timezone
+from .models import SearchRecord
+from . import crud
+
+
+logger = logging.getLogger(__name__)
+
+SEARCH_ROLLUPS_LOCK_ID = 72_011_001
+"""Postgres advisory lock ID held while search metrics rollups are being built"""
+
+
+async def rollup_search_metrics(
+    session: AsyncSession,
+    until: typing.Optional[datetime.datetime] = None,
+    max_hours: int = 24 * 7,
+) -> int:
+    """
+    Incrementally build the search metrics rollups, from where they last stopped.
+
+    Hourly rollups are built for every whole hour that ended before `until`,
+    and daily rollups for every whole day covered by the hourly rollups.
+
+    If another process is already building the rollups, nothing is done.
+
+    :param session: The database session
+    :param until: Only roll up searches made before this timestamp. Defaults to now
+    :param max_hours: Maximum number of hours to roll up in one call
+    :return: The number of hours rolled up. Call repeatedly while this equals `max_hours`
+        to catch up on a large backlog.
+    """
+    locked = await session.execute(
+        sa.select(sa.func.pg_try_advisory_xact_lock(SEARCH_ROLLUPS_LOCK_ID))
+    )
+    if not locked.scalar():
+        return 0
+
+    watermarks = await crud.get_search_rollup_watermarks(session)
+    start = watermarks["hour"]
+    if start is None:
+        result = await session.execute(sa.select(sa.func.min(SearchRecord.timestamp)))
+        first_timestamp = result.scalar()
+        if first_timestamp is None:
+            return 0
+        start = crud.floor_timestamp(first_timestamp, "hour")
+
+    until = crud.floor_timestamp(until or timezone.now(), "hour")
+    end = min(until, start + crud.HOUR * max_hours)
+    hours = 0
+    if start < end:
+        await crud.rollup_search_hours(session, start, end)
+        hours = (end - start) // crud.HOUR
+    else:
+        end = start
+
+    day_start = watermarks["day"]
+    if day_start is None:
+        first_hour = await crud.get_first_search_rollup_start(session, "hour")
+        if first_hour is None:
+            return hours
+        day_start = crud.floor_timestamp(first_hour, "day")
+    day_end = crud.floor_timestamp(end, "day")
+    if day_start < day_end:
+        await crud.rollup_search_days(session, day_start, day_end)
+    return hours
+
+
+class SearchMetricsRollupTask:
+    """Periodically builds the search metrics rollups in the background."""
+
+    def __init__(self, interval: float = 300.0, lag: float = 600.0) -> None:
+        """
+        Create a new rollup task.
+
+        :param interval: Interval in seconds between rollup runs
+        :param lag: Number of seconds to wait after an hour ends before rolling it up,
+            so that searches still buffered by search recorders are saved first.
+        """
+        self.interval = interval
+        self.lag = lag
+        self._task: typing.Optional[asyncio.Task] = None
+
+    async def run(self) -> int:
+        """
+        Roll up all whole hours that ended at least `lag` seconds ago.
+
+        :return: The number of hours rolled up
+        """
+        until = timezone.now() - datetime.timedelta(seconds=self.lag)
+        hours = 0
+        while True:
+            async with get_async_session() as session:
+                rolled_up = await rollup_search_metrics(session, until=until)
+                await session.commit()
+            hours += rolled_up
+            if not rolled_up:
+                return hours
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as exc:
+                logger.error(f"Failed to roll up search metrics: {exc}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start building the rollups periodically."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop building the rollups periodically."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+search_metrics_rollup_task = SearchMetricsRollupTask(
+    interval=settings.SEARCH_METRICS_ROLLUP_INTERVAL,
+    lag=settings.SEARCH_METRICS_ROLLUP_LAG,
+)
+
+
+__all__ = [
+    "rollup_search_metrics",
+    "SearchMetricsRollupTask",
+    "search_metrics_rollup_task",
+]
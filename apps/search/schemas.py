@@ -3,6 +3,7 @@ from annotated_types import MaxLen, MinLen
 import pydantic
 
 from helpers.generics.pydantic import partial
+from api.serialization import RowSerializer, isoformat, nullable
 from apps.clients.schemas import APIClientSimpleSchema
 
 
@@ -242,6 +243,22 @@ class TermSchema(BaseTermSchema):
     )
 
 
+class TermSuggestionSchema(pydantic.BaseModel):
+    """Term autocomplete suggestion schema. For serialization purposes only."""
+
+    uid: typing.Annotated[pydantic.StrictStr, MaxLen(50)] = pydantic.Field(
+        ...,
+        description="The UID of the term",
+    )
+    name: pydantic.StrictStr = pydantic.Field(
+        ...,
+        description="The name of the term",
+    )
+
+    class Config:
+        from_attributes = True
+
+
 class SearchRecordSchema(pydantic.BaseModel):
     """SearchRecord schema. For serialization purposes only."""
 
@@ -364,11 +381,68 @@ class GlobalSearchMetricsSchema(pydantic.BaseModel):
     )
 
 
+topic_serializer = RowSerializer(
+    {
+        "name": None,
+        "description": None,
+        "uid": None,
+        "created_at": isoformat,
+        "updated_at": isoformat,
+    }
+)
+"""Serializes topics aggregated as JSON in lean term rows, in the shape of `TopicSchema`"""
+
+term_source_serializer = RowSerializer(
+    {
+        "name": None,
+        "url": nullable(lambda url: str(pydantic.AnyUrl(url))),
+        "description": None,
+        "uid": None,
+        "created_at": isoformat,
+        "updated_at": isoformat,
+    }
+)
+"""Serializes sources aggregated as JSON in lean term rows, in the shape of `TermSourceSchema`"""
+
+related_term_serializer = RowSerializer(
+    {
+        "name": None,
+        "definition": None,
+        "grammatical_label": None,
+        "uid": None,
+        "verified": None,
+        "created_at": isoformat,
+        "updated_at": isoformat,
+    }
+)
+"""Serializes relatives aggregated as JSON in lean term rows, in the shape of `BaseTermSchema`"""
+
+term_serializer = RowSerializer(
+    {
+        "name": None,
+        "definition": None,
+        "grammatical_label": None,
+        "uid": None,
+        "verified": None,
+        "created_at": isoformat,
+        "updated_at": isoformat,
+        # Source, topics and relatives are aggregated as JSON by the database,
+        # so their timestamps are reformatted like the term's own
+        "source": nullable(term_source_serializer),
+        "topics": topic_serializer.many,
+        "relatives": related_term_serializer.many,
+    }
+)
+"""Serializes lean term rows (see `crud.term_projection`) in the shape of `TermSchema`"""
+
+
 __all__ = [
     "TermCreateSchema",
     "TermUpdateSchema",
     "TermSchema",
+    "TermSuggestionSchema",
     "SearchRecordSchema",
     "AccountSearchMetricsSchema",
     "GlobalSearchMetricsSchema",
+    "term_serializer",
 ]
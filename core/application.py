@@ -8,11 +8,10 @@ import logging
 import anyio
 import multiprocessing
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, AsyncExitStack
 import anyio.to_thread
 import fastapi
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_mcp import FastApiMCP
 
 from helpers.fastapi.config import settings, SETTINGS_ENV_VARIABLE
@@ -101,7 +100,12 @@ async def lifespan(app: fastapi.FastAPI):
     from helpers.fastapi.requests import throttling
     from apps.search.ddls import execute_search_ddls
     from apps.quizzes.ddls import execute_quiz_ddls
-    from api.caching import ORJsonCoder, request_key_builder, redis
+    from apps.search.recording import search_recorder, term_view_counter
+    from apps.search.rollups import search_metrics_rollup_task
+    from apps.search.engine import glossary_search_index
+    from apps.search import changes  # noqa: F401 - registers change handlers
+    from api.changefeed import change_feed
+    from api.caching import ORJsonCoder, TwoTierBackend, request_key_builder, redis
 
     set_anyio_max_worker_threads(settings.ANYIO_MAX_WORKER_THREADS)
     # Prevents deadlocks from multiple worker processes accessing lock
@@ -121,21 +125,44 @@ async def lifespan(app: fastapi.FastAPI):
         redis=redis,
         prefix="petriz-throttle",
     ):
-        try:
+        cache_backend = TwoTierBackend(
+            redis,
+            maxsize=settings.CACHE_L1_MAXSIZE,
+            local_ttl=settings.CACHE_L1_TTL,
+            stale_ttl=settings.CACHE_STALE_TTL,
+        )
+        # Components are stopped (in reverse order) once started,
+        # even if starting a later one fails
+        async with AsyncExitStack() as stack:
+            cache_backend.start()
+            stack.push_async_callback(cache_backend.stop)
+            search_recorder.start()
+            stack.push_async_callback(search_recorder.stop)
+            term_view_counter.start()
+            stack.push_async_callback(term_view_counter.stop)
+            search_metrics_rollup_task.start()
+            stack.push_async_callback(search_metrics_rollup_task.stop)
+            if settings.SEARCH_IN_MEMORY_INDEX:
+                stack.push_async_callback(glossary_search_index.stop)
+                await glossary_search_index.start()
+            if settings.CHANGE_FEED_ENABLED:
+                change_feed.start()
+                stack.push_async_callback(change_feed.stop)
+
             FastAPICache.init(
-                RedisBackend(redis),
+                cache_backend,
                 prefix="petriz-cache",
                 coder=ORJsonCoder,
                 key_builder=request_key_builder,
                 cache_status_header="X-Cache-Status",
                 expire=60 * 60,  # 1 hour
             )
-            yield
-
-        finally:
-            if persist_redis_data is False and FastAPICache._backend:
-                with multiprocessing.Lock():
-                    await FastAPICache.clear()
+            try:
+                yield
+            finally:
+                if persist_redis_data is False and FastAPICache._backend:
+                    with multiprocessing.Lock():
+                        await FastAPICache.clear()
 
 
 def main(config: str = "APP") -> fastapi.FastAPI:
@@ -111,6 +111,7 @@ AUTH_USER_MODEL = "accounts.Account"
 MIDDLEWARE = [
     "helpers.fastapi.middleware.core.RequestProcessTimeMiddleware",
     "helpers.fastapi.sqlalchemy.middleware.AsyncSessionMiddleware",
+    "api.caching.CacheMissReleaseMiddleware",
     (
         "helpers.fastapi.auditing.middleware.ConnectionEventLogMiddleware",
         {
@@ -191,6 +192,10 @@ MAILING = {
 
 
 REDIS_URL = os.getenv("REDIS_URL")
+CACHE_L1_MAXSIZE = 64 * 1024 * 1024  # Maximum size (in bytes) of each worker's in-memory response cache
+CACHE_L1_TTL = 60  # Maximum time in seconds a response is kept in a worker's in-memory cache
+CACHE_STALE_TTL = 5 * 60  # Time in seconds an expired response may be served while it is refreshed
+GLOSSARY_CACHE_TTL = 7 * 24 * 60 * 60  # Glossary responses are invalidated on change, so they can be cached for long
 
 AUTH_TOKEN_VALIDITY_PERIOD = datetime.timedelta(days=30)
 
@@ -206,4 +211,21 @@ LOG_CONNECTION_EVENTS = (
 AUDIT_LOGGING_BATCH_SIZE = 1000  # Number of entries to log in a single batch
 AUDIT_LOGGING_INTERVAL = 60  # Interval in seconds to log entries
 
+SEARCH_RECORDING_BATCH_SIZE = 500  # Number of searches to record in a single batch
+SEARCH_RECORDING_INTERVAL = 5  # Interval in seconds to record searches
+TERM_VIEWS_RECORDING_INTERVAL = 30  # Interval in seconds to add buffered term views to daily view counts
+SEARCH_METRICS_ROLLUP_INTERVAL = 300  # Interval in seconds between search metrics rollup runs
+SEARCH_METRICS_ROLLUP_LAG = 600  # Seconds to wait after an hour ends before rolling up its searches
+TERM_AUTOCOMPLETE_IN_MEMORY = False  # Whether to serve term autocomplete from an in-memory index per worker
+TERM_AUTOCOMPLETE_INDEX_TTL = 300  # Seconds after which the in-memory term name index is reloaded
+SEARCH_FUZZY_FALLBACK_THRESHOLD = 3  # Fall back to fuzzy (trigram) search when full-text search finds fewer terms
+SEARCH_FUZZY_SIMILARITY_THRESHOLD = 0.3  # Minimum trigram similarity of term names to fuzzy search queries
+SEARCH_IN_MEMORY_INDEX = False  # Whether to search terms using an in-memory index per worker, instead of the database
+SEARCH_IN_MEMORY_INDEX_TTL = 300  # Seconds after which the in-memory search index is rebuilt
+CHANGE_FEED_ENABLED = True  # Whether workers listen for glossary changes notified by the database
+CHANGE_FEED_DEBOUNCE = 1.0  # Seconds to batch change notifications for before handling them
+PAGINATION_COUNT_CAP = 1000  # Maximum number of results counted exactly, when counts are requested
+ID_LOOKUP_CACHE_TTL = 300  # Seconds for which the IDs of terms/topics matching names or UIDs are cached
+QUIZ_ANSWER_KEY_CACHE_TTL = 60 * 60  # Seconds for which the answer keys of quiz versions are cached
+
 ANYIO_MAX_WORKER_THREADS: int = 100
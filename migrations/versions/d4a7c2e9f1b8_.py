@@ -0,0 +1,43 @@
+"""Recount the questions of quizzes, before counts are maintained by deltas
+
+Revision ID: d4a7c2e9f1b8
+Revises: b6e1f4a2c9d3
+Create Date: 2026-10-19 10:21:44.118530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a7c2e9f1b8"
+down_revision: Union[str, None] = "b6e1f4a2c9d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Correct counts that drifted before the statement level triggers
+    # (see `apps.quizzes.ddls.QUIZ_QUESTION_COUNT_DDLS`) adjusted them by deltas
+    op.execute(
+        """
+        UPDATE quizzes__quizzes AS quiz
+        SET questions_count = counts.questions_count
+        FROM (
+            SELECT quiz.id, COUNT(q.id) AS questions_count
+            FROM quizzes__quizzes AS quiz
+            LEFT JOIN quizzes__question_to_quiz_associations AS assoc
+                ON assoc.quiz_id = quiz.id
+            LEFT JOIN quizzes__questions AS q
+                ON q.id = assoc.question_id AND q.is_deleted = FALSE
+            GROUP BY quiz.id
+        ) AS counts
+        WHERE quiz.id = counts.id AND quiz.questions_count <> counts.questions_count
+        """
+    )
+
+
+def downgrade() -> None:
+    # Counts are correct either way
+    pass
@@ -12,8 +12,6 @@ if [ ! -d "$DIR" ]; then
     exit 1
 fi
 
-for file in "$DIR"/*.csv; do
-    if [ -f "$file" ]; then
-        python main.py load_terms "$file" --batch-size 1000
-    fi
-done
+python main.py load_terms_dir "$DIR"
+
+python main.py build_related_terms
@@ -0,0 +1,131 @@
+"""
+Micro-benchmark for the per-request cost of building response cache keys.
+
+Compares `api.caching.request_key_builder` against the previous
+md5/repr based implementation, on a few representative requests.
+
+Run from the project root:
+
+    uv run python -m tests.benchmark_cache_key_builder
+"""
+
+import asyncio
+import hashlib
+import time
+import typing
+from starlette.requests import Request
+
+from core.application import setup_environment_variables
+from helpers.fastapi.config import settings
+
+setup_environment_variables()
+settings.configure()
+
+from api.caching import RELEVANT_HEADERS, request_key_builder  # noqa: E402
+
+ITERATIONS = 100_000
+
+
+async def legacy_key_builder(
+    func: typing.Callable[..., typing.Any],
+    namespace: str = "",
+    *,
+    request: typing.Optional[Request] = None,
+    **_: typing.Any,
+) -> str:
+    """The previous key builder implementation, for comparison."""
+    key_parts = [func.__module__, func.__name__]
+    if request:
+        key_parts.append(request.url.path)
+        if request.query_params:
+            key_parts.append(repr(sorted(request.query_params.items())))
+        if request.headers:
+            relevant_headers = {
+                k: v
+                for k, v in request.headers.items()
+                if k.lower() in RELEVANT_HEADERS
+            }
+            if relevant_headers:
+                key_parts.append(repr(sorted(relevant_headers.items())))
+    cache_key = ":".join(str(part) for part in key_parts)
+    return f"{namespace}:{hashlib.md5(cache_key.encode()).hexdigest()}"
+
+
+async def search_terms():
+    pass
+
+
+def make_scope(
+    path: str,
+    query_string: bytes = b"",
+    headers: typing.Optional[typing.List[typing.Tuple[bytes, bytes]]] = None,
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "scheme": "http",
+        "server": ("localhost", 8000),
+        "query_string": query_string,
+        "headers": headers or [],
+        "path_params": {},
+    }
+
+
+BROWSER_HEADERS = [
+    (b"host", b"localhost:8000"),
+    (b"user-agent", b"Mozilla/5.0 (X11; Linux x86_64) Gecko/20100101 Firefox/128.0"),
+    (b"accept", b"application/json"),
+    (b"accept-encoding", b"gzip, deflate, br"),
+    (b"accept-language", b"en-US,en;q=0.5"),
+    (b"x-client-id", b"petriz_client_01J0000000000000000000000"),
+    (b"x-client-secret", b"petriz_apisecret_01J000000000000000000000"),
+    (b"authorization", b"AuthToken petriz_authtoken_01J00000000000000000"),
+    (b"connection", b"keep-alive"),
+]
+
+SCOPES = {
+    "no query, no headers": make_scope("/api/v1/search/terms"),
+    "query, no headers": make_scope(
+        "/api/v1/search/terms", b"query=porosity&topics=geology&limit=20&offset=0"
+    ),
+    "query, browser headers": make_scope(
+        "/api/v1/search/terms",
+        b"query=porosity&topics=geology&limit=20&offset=0",
+        BROWSER_HEADERS,
+    ),
+}
+
+
+async def time_key_builder(
+    key_builder: typing.Callable[..., typing.Awaitable[str]],
+    scope: typing.Dict[str, typing.Any],
+) -> float:
+    """Return the average time, in microseconds, to build a key for a request."""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        # A new request per iteration, so lazily parsed attributes are not reused
+        await key_builder(
+            search_terms,
+            "petriz-cache:search",
+            request=Request(scope),
+            response=None,
+            args=(),
+            kwargs={},
+        )
+    return (time.perf_counter() - start) / ITERATIONS * 1_000_000
+
+
+async def main():
+    print(f"Average key build time over {ITERATIONS} iterations (microseconds)\n")
+    print(f"{'request':<28}{'legacy':>10}{'current':>10}{'speedup':>10}")
+    for name, scope in SCOPES.items():
+        legacy = await time_key_builder(legacy_key_builder, scope)
+        current = await time_key_builder(request_key_builder, scope)
+        print(f"{name:<28}{legacy:>10.2f}{current:>10.2f}{legacy / current:>9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
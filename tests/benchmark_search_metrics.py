@@ -0,0 +1,98 @@
+"""
+Benchmark for the wall-clock latency of generating search metrics.
+
+Compares running the independent metrics queries one after another on a single
+session, against running them concurrently in separate sessions, for both the
+account and the global search metrics (as served by the metrics endpoints).
+
+Requires a database with search records. Run from the project root:
+
+    uv run python -m tests.benchmark_search_metrics [--account <account UID>]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import typing
+
+from core.application import setup_environment_variables
+from helpers.fastapi.config import settings
+
+setup_environment_variables()
+settings.configure()
+
+import sqlalchemy as sa  # noqa: E402
+
+from helpers.fastapi.apps import configure_apps  # noqa: E402
+from helpers.fastapi.sqlalchemy.models import ModelBase  # noqa: E402
+from helpers.fastapi.sqlalchemy.setup import (  # noqa: E402
+    bind_db_to_model_base,
+    engine,
+    get_async_session,
+)
+from apps.accounts.models import Account  # noqa: E402
+from apps.search import crud  # noqa: E402
+
+ITERATIONS = 50
+
+
+async def time_metrics(
+    generate: typing.Callable[..., typing.Awaitable[typing.Any]],
+    concurrently: bool,
+    **kwargs: typing.Any,
+) -> typing.List[float]:
+    """Return the time, in milliseconds, taken by each run of a metrics generator."""
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        async with get_async_session() as session:
+            await generate(session, concurrently=concurrently, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings: typing.List[float]) -> str:
+    quantiles = statistics.quantiles(timings, n=20)
+    return (
+        f"{statistics.mean(timings):>10.2f}"
+        f"{statistics.median(timings):>10.2f}"
+        f"{quantiles[-1]:>10.2f}"
+    )
+
+
+async def main(account_uid: typing.Optional[str] = None):
+    bind_db_to_model_base(db_engine=engine, model_base=ModelBase)
+    await configure_apps()
+
+    async with get_async_session() as session:
+        query = sa.select(Account.uid, Account.id)
+        if account_uid:
+            query = query.where(Account.uid == account_uid)
+        account = (await session.execute(query.limit(1))).one()
+
+    benchmarks = {
+        "account metrics": (
+            crud.generate_account_search_metrics,
+            {"account_uid": account.uid, "account_id": account.id},
+        ),
+        "global metrics": (crud.generate_global_search_metrics, {}),
+    }
+
+    print(f"Search metrics latency over {ITERATIONS} iterations (milliseconds)\n")
+    print(f"{'metrics':<18}{'mode':<14}{'mean':>10}{'median':>10}{'p95':>10}")
+    for name, (generate, kwargs) in benchmarks.items():
+        # Warm up connections and caches before timing
+        await time_metrics(generate, concurrently=True, **kwargs)
+        for mode, concurrently in (("sequential", False), ("concurrent", True)):
+            timings = await time_metrics(generate, concurrently, **kwargs)
+            print(f"{name:<18}{mode:<14}{summarize(timings)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--account", help="UID of the account to generate account metrics for"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.account))
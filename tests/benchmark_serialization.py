@@ -0,0 +1,114 @@
+"""
+Benchmark for the cost of serializing list endpoint pages.
+
+Compares validating lean rows into pydantic schemas and encoding the dumped
+schemas, against mapping the rows with the precompiled row serializers and
+encoding them directly with orjson. Database time is excluded, as rows are
+fetched once and serialized repeatedly.
+
+Requires a database with at least a page of terms and quizzes.
+Run from the project root:
+
+    uv run python -m tests.benchmark_serialization
+"""
+
+import asyncio
+import statistics
+import time
+import typing
+import orjson
+
+from core.application import setup_environment_variables
+from helpers.fastapi.config import settings
+
+setup_environment_variables()
+settings.configure()
+
+from helpers.fastapi.apps import configure_apps  # noqa: E402
+from helpers.fastapi.sqlalchemy.models import ModelBase  # noqa: E402
+from helpers.fastapi.sqlalchemy.setup import (  # noqa: E402
+    bind_db_to_model_base,
+    engine,
+    get_async_session,
+)
+from api.serialization import RowSerializer  # noqa: E402
+from apps.search import crud as search_crud, schemas as search_schemas  # noqa: E402
+from apps.search.models import Term  # noqa: E402
+from apps.quizzes import crud as quizzes_crud, schemas as quizzes_schemas  # noqa: E402
+
+ITERATIONS = 200
+PAGE_SIZE = 100
+
+
+def time_ms(func: typing.Callable[[], typing.Any]) -> typing.List[float]:
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def benchmark(
+    name: str,
+    rows: typing.List[typing.Dict[str, typing.Any]],
+    schema: typing.Any,
+    serializer: RowSerializer,
+) -> None:
+    def with_pydantic() -> bytes:
+        return orjson.dumps(
+            [
+                schema.model_validate(row).model_dump(mode="json", by_alias=True)
+                for row in rows
+            ]
+        )
+
+    def with_serializer() -> bytes:
+        return serializer.dumps(rows)
+
+    for mode, func in (("pydantic", with_pydantic), ("serializer", with_serializer)):
+        func()  # Warm up
+        timings = time_ms(func)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(
+            f"{name:<10}{mode:<12}{len(rows):>6}"
+            f"{statistics.mean(timings):>10.3f}{p95:>10.3f}"
+        )
+
+
+async def main():
+    bind_db_to_model_base(db_engine=engine, model_base=ModelBase)
+    await configure_apps()
+
+    async with get_async_session() as session:
+        result = await session.execute(
+            search_crud.select_terms(lean=True)
+            .where(~Term.is_deleted)
+            .order_by(*Term.DEFAULT_ORDERING)
+            .limit(PAGE_SIZE)
+        )
+        terms = search_crud.fetched_terms(result, lean=True)
+        quizzes = await quizzes_crud.search_quizzes(
+            session, limit=PAGE_SIZE, lean=True
+        )
+
+    assert len(terms) == PAGE_SIZE, f"Expected {PAGE_SIZE} terms, got {len(terms)}"
+    assert len(quizzes) == PAGE_SIZE, (
+        f"Expected {PAGE_SIZE} quizzes, got {len(quizzes)}"
+    )
+
+    print(f"Serialization of a page of up to {PAGE_SIZE} rows, {ITERATIONS} iterations\n")
+    print(f"{'rows':<10}{'mode':<12}{'count':>6}{'mean ms':>10}{'p95 ms':>10}")
+    benchmark(
+        "terms", terms, search_schemas.TermSchema, search_schemas.term_serializer
+    )
+    benchmark(
+        "quizzes",
+        quizzes,
+        quizzes_schemas.BaseQuizSchema,
+        quizzes_schemas.quiz_serializer,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
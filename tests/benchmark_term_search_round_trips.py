@@ -0,0 +1,83 @@
+"""
+Benchmark for the database round trips and latency of term searches.
+
+Compares fetching search results as `Term` instances with eager loaded
+topics, relatives and source, against fetching lean projection rows
+(topics, relatives and source aggregated as JSON in the same query).
+Both are validated into `TermSchema`, as the search endpoint does.
+
+Requires a database with terms. Run from the project root:
+
+    uv run python -m tests.benchmark_term_search_round_trips [query ...]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+import typing
+
+from core.application import setup_environment_variables
+from helpers.fastapi.config import settings
+
+setup_environment_variables()
+settings.configure()
+
+import sqlalchemy as sa  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+from helpers.fastapi.apps import configure_apps  # noqa: E402
+from helpers.fastapi.sqlalchemy.models import ModelBase  # noqa: E402
+from helpers.fastapi.sqlalchemy.setup import (  # noqa: E402
+    bind_db_to_model_base,
+    engine,
+    get_async_session,
+)
+from apps.search import crud, schemas  # noqa: E402
+
+ITERATIONS = 50
+DEFAULT_QUERIES = ["porosity", "drilling fluid", "reservoir pressure", "well"]
+
+statement_count = 0
+
+
+@sa.event.listens_for(Engine, "before_cursor_execute")
+def count_statement(*args: typing.Any) -> None:
+    global statement_count
+    statement_count += 1
+
+
+async def run_search(query: str, lean: bool) -> typing.Tuple[int, float]:
+    """Return the number of statements executed, and the time taken in milliseconds."""
+    global statement_count
+    statement_count = 0
+    start = time.perf_counter()
+    async with get_async_session() as session:
+        terms = await crud.search_terms(
+            session, query=query, verified=True, limit=20, lean=lean
+        )
+        [schemas.TermSchema.model_validate(term) for term in terms]
+    return statement_count, (time.perf_counter() - start) * 1000
+
+
+async def main(queries: typing.List[str]):
+    bind_db_to_model_base(db_engine=engine, model_base=ModelBase)
+    await configure_apps()
+
+    print(f"Term search over {ITERATIONS} iterations, 20 results per page\n")
+    print(f"{'query':<22}{'mode':<8}{'statements':>12}{'mean ms':>10}{'p95 ms':>10}")
+    for query in queries:
+        for mode, lean in (("eager", False), ("lean", True)):
+            await run_search(query, lean)  # Warm up
+            results = [await run_search(query, lean) for _ in range(ITERATIONS)]
+            statements = max(result[0] for result in results)
+            timings = [result[1] for result in results]
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(
+                f"{query:<22}{mode:<8}{statements:>12}"
+                f"{statistics.mean(timings):>10.2f}{p95:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:] or DEFAULT_QUERIES))
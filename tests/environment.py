@@ -0,0 +1,13 @@
+"""
+Sets up the project settings for tests, before the apps are imported.
+
+Import it first in test modules:
+
+    import tests.environment  # noqa: F401
+"""
+
+from core.application import setup_environment_variables
+from helpers.fastapi.config import settings
+
+setup_environment_variables()
+settings.configure()
@@ -0,0 +1,210 @@
+"""
+Tests for flushing and retrying the batched search and term view recorders.
+
+Run from the project root:
+
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import asyncio
+import contextlib
+import typing
+import unittest
+from unittest import mock
+
+import tests.environment  # noqa: F401
+from apps.search.recording import BatchedRecorder, SearchRecorder, TermViewCounter
+
+
+class ListRecorder(BatchedRecorder):
+    """Records items in memory, and "saves" them to a list when flushed."""
+
+    def __init__(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.buffer: typing.List[int] = []
+        self.saved: typing.List[typing.List[int]] = []
+        self.flushing = 0
+        self.max_concurrent_flushes = 0
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def record(self, item: int) -> None:
+        self.buffer.append(item)
+        self._buffered()
+
+    async def _flush(self) -> int:
+        self.flushing += 1
+        self.max_concurrent_flushes = max(self.max_concurrent_flushes, self.flushing)
+        try:
+            await asyncio.sleep(0)
+            buffered, self.buffer = self.buffer, []
+            if buffered:
+                self.saved.append(buffered)
+            return len(buffered)
+        finally:
+            self.flushing -= 1
+
+
+async def wait_for(condition: typing.Callable[[], bool], timeout: float = 1.0) -> None:
+    async def poll() -> None:
+        while not condition():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+class BatchedRecorderTests(unittest.IsolatedAsyncioTestCase):
+    async def test_flush_without_start(self):
+        recorder = ListRecorder()
+        recorder.record(1)
+        recorder.record(2)
+
+        self.assertEqual(await recorder.flush(), 2)
+        self.assertEqual(recorder.saved, [[1, 2]])
+        self.assertEqual(await recorder.flush(), 0)
+
+    async def test_flushes_when_batch_is_full(self):
+        recorder = ListRecorder(batch_size=3, interval=60)
+        recorder.start()
+        try:
+            recorder.record(1)
+            recorder.record(2)
+            await asyncio.sleep(0.01)
+            self.assertEqual(recorder.saved, [])
+
+            recorder.record(3)
+            await wait_for(lambda: bool(recorder.saved))
+            self.assertEqual(recorder.saved, [[1, 2, 3]])
+        finally:
+            await recorder.stop()
+
+    async def test_flushes_periodically(self):
+        recorder = ListRecorder(batch_size=100, interval=0.01)
+        recorder.start()
+        try:
+            recorder.record(1)
+            await wait_for(lambda: bool(recorder.saved))
+            self.assertEqual(recorder.saved, [[1]])
+        finally:
+            await recorder.stop()
+
+    async def test_stop_flushes_remaining_records(self):
+        recorder = ListRecorder(batch_size=100, interval=60)
+        recorder.start()
+        recorder.record(1)
+        await recorder.stop()
+
+        self.assertEqual(recorder.saved, [[1]])
+        self.assertIsNone(recorder._task)
+        # Stopping again, or without starting, is harmless
+        await recorder.stop()
+        await ListRecorder().stop()
+
+    async def test_start_is_idempotent(self):
+        recorder = ListRecorder(interval=60)
+        recorder.start()
+        task = recorder._task
+        recorder.start()
+        try:
+            self.assertIs(recorder._task, task)
+        finally:
+            await recorder.stop()
+
+    async def test_flushes_do_not_overlap(self):
+        recorder = ListRecorder()
+        recorder.record(1)
+        await asyncio.gather(*(recorder.flush() for _ in range(5)))
+
+        self.assertEqual(recorder.max_concurrent_flushes, 1)
+        self.assertEqual(recorder.saved, [[1]])
+
+
+class FakeSession:
+    async def commit(self) -> None:
+        pass
+
+
+@contextlib.asynccontextmanager
+async def fake_async_session():
+    yield FakeSession()
+
+
+class SaveFailure(Exception):
+    pass
+
+
+class RecorderRetryTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch(
+            "apps.search.recording.get_async_session", fake_async_session
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def patch_crud(self, name: str, *side_effect: typing.Any) -> mock.AsyncMock:
+        patcher = mock.patch(
+            f"apps.search.recording.crud.{name}",
+            new_callable=mock.AsyncMock,
+            side_effect=side_effect,
+        )
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    async def test_search_recorder_keeps_searches_when_saving_fails(self):
+        create_search_records = self.patch_crud(
+            "create_search_records", SaveFailure, 3
+        )
+        recorder = SearchRecorder()
+        recorder.record("cell", topic_ids=[2, 1, 2])
+        recorder.record("atom")
+
+        with self.assertLogs("apps.search.recording", "ERROR"):
+            self.assertEqual(await recorder.flush(), 0)
+        self.assertEqual(len(recorder), 2)
+
+        recorder.record("nucleus")
+        self.assertEqual(await recorder.flush(), 3)
+        self.assertEqual(len(recorder), 0)
+
+        saved = create_search_records.await_args_list[-1].args[1]
+        self.assertEqual(
+            [search["query"] for search in saved], ["cell", "atom", "nucleus"]
+        )
+        self.assertEqual(saved[0]["topic_ids"], [1, 2])
+        self.assertIsNone(saved[1]["topic_ids"])
+
+    async def test_search_recorder_drops_oldest_searches_beyond_max_buffer_size(self):
+        self.patch_crud("create_search_records", SaveFailure)
+        recorder = SearchRecorder(batch_size=2, max_buffer_size=3)
+        for query in ("a", "b", "c", "d", "e"):
+            recorder.record(query)
+
+        with self.assertLogs("apps.search.recording", "ERROR"):
+            await recorder.flush()
+        self.assertEqual(
+            [search["query"] for search in recorder._buffer], ["c", "d", "e"]
+        )
+
+    async def test_term_view_counter_merges_counts_when_saving_fails(self):
+        increment_term_view_counts = self.patch_crud(
+            "increment_term_view_counts", SaveFailure, 2
+        )
+        counter = TermViewCounter()
+        counter.record("term_1")
+        counter.record("term_1")
+        counter.record("term_2")
+
+        with self.assertLogs("apps.search.recording", "ERROR"):
+            self.assertEqual(await counter.flush(), 0)
+        self.assertEqual(len(counter), 2)
+
+        counter.record("term_1")
+        self.assertEqual(await counter.flush(), 2)
+        self.assertEqual(len(counter), 0)
+
+        counts = increment_term_view_counts.await_args_list[-1].args[1]
+        self.assertEqual(
+            {term_uid: count for (term_uid, _), count in counts.items()},
+            {"term_1": 3, "term_2": 1},
+        )
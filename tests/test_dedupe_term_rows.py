@@ -0,0 +1,110 @@
+"""
+Tests for reading and deduping terms for bulk loading.
+
+Run from the project root:
+
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import tests.environment  # noqa: F401
+from apps.search.commands import TermRow, dedupe_term_rows, read_term_rows
+
+
+def term_row(name: str, definition: str = "", *topics: str) -> TermRow:
+    return TermRow(
+        name=name,
+        definition=definition,
+        grammatical_label=None,
+        source_url=None,
+        topics=topics,
+    )
+
+
+class DedupeTermRowsTests(unittest.TestCase):
+    def test_distinct_terms_are_kept_in_order(self):
+        rows = [term_row("Cell"), term_row("Nucleus"), term_row("Atom")]
+        terms = dedupe_term_rows(rows)
+
+        self.assertEqual(list(terms), ["cell", "nucleus", "atom"])
+        self.assertEqual(list(terms.values()), rows)
+
+    def test_names_are_compared_case_insensitively(self):
+        terms = dedupe_term_rows(
+            [term_row("Cell", "First"), term_row("CELL", "Second")]
+        )
+
+        self.assertEqual(list(terms), ["cell"])
+        self.assertEqual(terms["cell"].name, "Cell")
+
+    def test_first_occurrence_wins(self):
+        first = TermRow(
+            name="Cell",
+            definition="First",
+            grammatical_label="noun",
+            source_url="https://example.com/first",
+            topics=("Biology",),
+        )
+        terms = dedupe_term_rows(
+            [
+                first,
+                TermRow(
+                    name="cell",
+                    definition="Second",
+                    grammatical_label="verb",
+                    source_url="https://example.com/second",
+                    topics=("Biology",),
+                ),
+            ]
+        )
+
+        self.assertEqual(terms["cell"], first)
+
+    def test_topics_of_all_occurrences_are_merged_in_order(self):
+        terms = dedupe_term_rows(
+            [
+                term_row("Cell", "First", "Biology", "Chemistry"),
+                term_row("cell", "Second"),
+                term_row("CELL", "Third", "Physics", "Biology"),
+                term_row("Cell", "Fourth", "Anatomy"),
+            ]
+        )
+
+        self.assertEqual(terms["cell"].definition, "First")
+        self.assertEqual(
+            terms["cell"].topics, ("Biology", "Chemistry", "Physics", "Anatomy")
+        )
+
+    def test_topics_are_merged_into_term_without_topics(self):
+        terms = dedupe_term_rows([term_row("Cell"), term_row("cell", "", "Biology")])
+
+        self.assertEqual(terms["cell"].topics, ("Biology",))
+
+    def test_no_rows(self):
+        self.assertEqual(dedupe_term_rows([]), {})
+
+
+class ReadTermRowsTests(unittest.TestCase):
+    def test_reads_and_dedupes_csv_terms(self):
+        with tempfile.TemporaryDirectory() as directory:
+            csv_file = Path(directory) / "terms.csv"
+            csv_file.write_text(
+                "Term,Definition,Topic,Grammatical Label\n"
+                'Cell,The basic unit of life,"Biology, Anatomy",noun\n'
+                ",Nameless,Biology,\n"
+                "  cell  ,Duplicate,Chemistry,\n"
+                "Atom,The smallest unit of matter,,\n",
+                encoding="utf-8",
+            )
+            terms = dedupe_term_rows(read_term_rows(csv_file))
+
+        self.assertEqual(list(terms), ["cell", "atom"])
+        self.assertEqual(terms["cell"].name, "Cell")
+        self.assertEqual(terms["cell"].definition, "The basic unit of life")
+        self.assertEqual(terms["cell"].grammatical_label, "noun")
+        self.assertEqual(terms["cell"].topics, ("Biology", "Anatomy", "Chemistry"))
+        self.assertEqual(terms["atom"].topics, ())
+        self.assertIsNone(terms["atom"].grammatical_label)
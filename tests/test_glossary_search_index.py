@@ -0,0 +1,168 @@
+"""
+Tests for the in-memory glossary search index.
+
+Run from the project root:
+
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import typing
+import unittest
+
+import tests.environment  # noqa: F401
+from apps.search.engine import GlossarySearchIndex
+
+
+# (id, name, verified, source_id, topic_ids, lexeme_labels), as selected by `build()`.
+# Name lexemes are labelled "A", and definition lexemes "B".
+ROWS = [
+    (1, "Cell", True, 1, [10], {"cell": ["A", "B", "B"], "membran": ["B"]}),
+    (2, "Cell membrane", True, 2, [10, 20], {"cell": ["A"], "membran": ["A", "B"]}),
+    (3, "Membrane protein", False, 1, [20], {"membran": ["A"], "protein": ["A", "B"]}),
+    (4, "Nucleus", True, None, None, {"nucleus": ["A"], "cell": ["B"]}),
+    (5, "Cytoplasm", True, 1, [10], {"cytoplasm": ["A"], "cell": ["B"]}),
+]
+
+
+def build_index(rows: typing.Sequence[typing.Any] = ROWS) -> GlossarySearchIndex:
+    index = GlossarySearchIndex()
+    (
+        index._terms,
+        index._postings,
+        index._field_lengths,
+        index._average_lengths,
+        index._ids_by_name,
+    ) = GlossarySearchIndex._build(rows)
+    return index
+
+
+class GlossarySearchIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.index = build_index()
+
+    def test_without_query_orders_by_name(self):
+        self.assertEqual(self.index.search(), [1, 2, 5, 3, 4])
+        self.assertEqual(self.index.search(limit=2, offset=1), [2, 5])
+        self.assertEqual(self.index.search(offset=5), [])
+
+    def test_ranks_by_relevance_then_name(self):
+        # "Cell" mentions "cell" the most, and in its (short) name. "Nucleus"
+        # and "Cytoplasm" score the same, so they are ordered by name.
+        self.assertEqual(self.index.search(["cell"]), [1, 2, 5, 4])
+        self.assertEqual(self.index.search(["cell"], limit=2, offset=1), [2, 5])
+
+    def test_all_lexemes_must_match(self):
+        self.assertCountEqual(self.index.search(["cell", "membran"]), [1, 2])
+        self.assertEqual(self.index.search(["cell", "protein"]), [])
+        self.assertEqual(self.index.search(["cell", "unknown"]), [])
+
+    def test_query_of_stop_words_matches_nothing(self):
+        self.assertEqual(self.index.search(()), [])
+
+    def test_verified_filter(self):
+        self.assertEqual(self.index.search(verified=True), [1, 2, 5, 4])
+        self.assertEqual(self.index.search(verified=False), [3])
+        self.assertEqual(self.index.search(["membran"], verified=False), [3])
+
+    def test_source_filter(self):
+        self.assertEqual(self.index.search(source_id=1), [1, 5, 3])
+        self.assertEqual(self.index.search(["cell"], source_id=2), [2])
+
+    def test_topics_filter_matches_any_topic(self):
+        self.assertEqual(self.index.search(topic_ids=[20]), [2, 3])
+        self.assertEqual(self.index.search(topic_ids=[10, 20]), [1, 2, 5, 3])
+        self.assertEqual(self.index.search(topic_ids=[30]), [])
+        self.assertEqual(self.index.search(["cell"], topic_ids=[20]), [2])
+
+    def test_startswith_filter_ignores_case(self):
+        self.assertEqual(self.index.search(startswith=["c"]), [1, 2, 5])
+        self.assertEqual(self.index.search(startswith=["M", "n"]), [3, 4])
+        self.assertEqual(self.index.search(["cell"], startswith=["N"]), [4])
+
+    def test_combined_filters(self):
+        self.assertEqual(
+            self.index.search(
+                ["membran"], topic_ids=[20], source_id=1, startswith=["m"]
+            ),
+            [3],
+        )
+        self.assertEqual(
+            self.index.search(["membran"], topic_ids=[20], verified=True), [2]
+        )
+
+    def test_term_without_topics_or_lexemes(self):
+        index = build_index([(1, "Cell", None, None, None, None)])
+
+        self.assertEqual(index.search(), [1])
+        self.assertEqual(index.search(verified=False), [1])
+        self.assertEqual(index.search(topic_ids=[10]), [])
+        self.assertEqual(index.search(["cell"]), [])
+
+
+class FakeResult:
+    def __init__(self, value: typing.Optional[str]) -> None:
+        self.value = value
+
+    def scalar_one(self) -> typing.Optional[str]:
+        return self.value
+
+
+class FakeSession:
+    """Stands in for a database session that parses queries into the given tsquery."""
+
+    def __init__(self, tsquery: typing.Optional[str]) -> None:
+        self.tsquery = tsquery
+        self.execute_count = 0
+
+    async def execute(self, statement: typing.Any) -> FakeResult:
+        self.execute_count += 1
+        return FakeResult(self.tsquery)
+
+
+async def parse_query(
+    index: GlossarySearchIndex, query: str, tsquery: typing.Optional[str]
+) -> typing.Optional[typing.Tuple[str, ...]]:
+    session = FakeSession(tsquery)
+    return await index.parse_query(session, query)  # type: ignore[arg-type]
+
+
+class ParseQueryTests(unittest.IsolatedAsyncioTestCase):
+    async def test_conjunctions_of_lexemes(self):
+        index = GlossarySearchIndex()
+
+        self.assertEqual(
+            await parse_query(index, "cell membranes", "'cell' & 'membran'"),
+            ("cell", "membran"),
+        )
+        self.assertEqual(
+            await parse_query(index, "o'brien", "'o''brien'"), ("o'brien",)
+        )
+
+    async def test_stop_words_only(self):
+        index = GlossarySearchIndex()
+
+        self.assertEqual(await parse_query(index, "the", ""), ())
+        self.assertEqual(await parse_query(index, "a", None), ())
+
+    async def test_other_operators_are_not_answered_from_index(self):
+        index = GlossarySearchIndex()
+        tsqueries = {
+            "cell or membrane": "'cell' | 'membran'",
+            "-cell": "!'cell'",
+            '"cell membrane"': "'cell' <-> 'membran'",
+            "cell membrane*": "'cell' & 'membran':*",
+        }
+        for query, tsquery in tsqueries.items():
+            with self.subTest(query=query):
+                self.assertIsNone(await parse_query(index, query, tsquery))
+
+    async def test_caches_parsed_queries(self):
+        index = GlossarySearchIndex()
+        session = FakeSession("'cell'")
+
+        for _ in range(3):
+            self.assertEqual(
+                await index.parse_query(session, "cells"),  # type: ignore[arg-type]
+                ("cell",),
+            )
+        self.assertEqual(session.execute_count, 1)
@@ -0,0 +1,221 @@
+"""
+Tests that the quiz attempt progress (attempted questions and score) maintained
+by the answers' triggers agrees with `reconcile_quiz_attempt_progress`.
+
+Requires a migrated database, and is skipped without one. Changes are rolled back.
+Run from the project root:
+
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import contextlib
+import typing
+import unittest
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import tests.environment  # noqa: F401
+from helpers.fastapi.apps import configure_apps
+from helpers.fastapi.sqlalchemy.models import ModelBase
+from helpers.fastapi.sqlalchemy.setup import (
+    bind_db_to_model_base,
+    engine,
+    get_async_session,
+)
+from apps.accounts.models import Account
+from apps.quizzes.crud import reconcile_quiz_attempt_progress
+from apps.quizzes.models import (
+    Question,
+    Quiz,
+    QuizAttempt,
+    QuizAttemptQuestionAnswer as Answer,
+)
+
+
+class QuizAttemptProgressTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        bind_db_to_model_base(db_engine=engine, model_base=ModelBase)
+        await configure_apps()
+
+        stack = contextlib.AsyncExitStack()
+        try:
+            self.session: AsyncSession = await stack.enter_async_context(
+                get_async_session()
+            )
+            has_trigger = await self.session.execute(
+                sa.text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_trigger "
+                    "WHERE tgname = 'add_quiz_attempt_progress_trigger')"
+                )
+            )
+            if not has_trigger.scalar_one():
+                raise LookupError("Quiz attempt progress triggers are not installed")
+        except Exception as exc:
+            await stack.aclose()
+            self.skipTest(f"No migrated database available: {exc}")
+
+        async def close_session() -> None:
+            await self.session.rollback()
+            await stack.aclose()
+
+        self.addAsyncCleanup(close_session)
+
+        suffix = uuid.uuid4().hex[:12]
+        self.account = Account(  # type: ignore
+            email=f"{suffix}@example.com", name=f"test_{suffix}"
+        )
+        self.account.set_password(uuid.uuid4().hex)
+        self.session.add(self.account)
+        await self.session.flush()
+
+        self.questions = [
+            Question(
+                question=f"Question {number}",
+                options=["A", "B", "C"],
+                correct_option_index=0,
+                created_by_id=self.account.id,
+            )
+            for number in range(3)
+        ]
+        quiz = Quiz(title=f"Quiz {suffix}", created_by_id=self.account.id)
+        self.session.add_all([*self.questions, quiz])
+        await self.session.flush()
+
+        self.attempt = QuizAttempt(quiz_id=quiz.id, attempted_by_id=self.account.id)
+        self.session.add(self.attempt)
+        await self.session.flush()
+
+    def answer(
+        self,
+        question: int,
+        *,
+        answered_by: typing.Optional[uuid.UUID] = None,
+        is_final: bool = False,
+        is_correct: bool = False,
+    ) -> typing.Dict[str, typing.Any]:
+        return {
+            "answer_index": 0 if is_correct else 1,
+            "is_final": is_final,
+            "is_correct": is_correct,
+            "question_id": self.questions[question].id,
+            "quiz_attempt_id": self.attempt.id,
+            "answered_by_id": answered_by,
+        }
+
+    async def assertProgress(
+        self, attempted_questions: int, score: typing.Optional[int]
+    ) -> None:
+        """
+        Check the attempt's progress, as maintained by the triggers,
+        and that reconciling finds nothing to correct.
+        """
+        result = await self.session.execute(
+            sa.select(QuizAttempt.attempted_questions, QuizAttempt.score).where(
+                QuizAttempt.id == self.attempt.id
+            )
+        )
+        self.assertEqual(tuple(result.one()), (attempted_questions, score))
+        drifted = await reconcile_quiz_attempt_progress(
+            self.session,
+            start_id=self.attempt.id,
+            end_id=self.attempt.id,
+            dry_run=True,
+        )
+        self.assertEqual(drifted, [])
+
+    async def test_answers_to_the_same_question_count_once(self):
+        # The unique constraint includes the nullable `answered_by_id`,
+        # so a question can have several answers in an attempt
+        await self.session.execute(
+            sa.insert(Answer),
+            [self.answer(0), self.answer(0), self.answer(1)],
+        )
+        await self.assertProgress(2, None)
+
+        await self.session.execute(
+            sa.insert(Answer), [self.answer(0, answered_by=self.account.id)]
+        )
+        await self.assertProgress(2, None)
+
+    async def test_question_is_attempted_until_its_last_answer_is_deleted(self):
+        await self.session.execute(
+            sa.insert(Answer), [self.answer(0), self.answer(0), self.answer(1)]
+        )
+        answer_ids = (
+            await self.session.execute(
+                sa.select(Answer.id)
+                .where(Answer.question_id == self.questions[0].id)
+                .order_by(Answer.id)
+            )
+        ).scalars().all()
+
+        await self.session.execute(sa.delete(Answer).where(Answer.id == answer_ids[0]))
+        await self.assertProgress(2, None)
+
+        await self.session.execute(sa.delete(Answer).where(Answer.id == answer_ids[1]))
+        await self.assertProgress(1, None)
+
+        await self.session.execute(
+            sa.delete(Answer).where(Answer.quiz_attempt_id == self.attempt.id)
+        )
+        await self.assertProgress(0, None)
+
+    async def test_score_counts_final_correct_answers(self):
+        await self.session.execute(
+            sa.insert(Answer),
+            [
+                self.answer(0, is_correct=True),
+                self.answer(1, is_final=True),
+            ],
+        )
+        # A final answer sets the score, but only final correct answers score
+        await self.assertProgress(2, 0)
+
+        await self.session.execute(
+            sa.update(Answer)
+            .where(Answer.quiz_attempt_id == self.attempt.id)
+            .values(is_final=True)
+        )
+        await self.assertProgress(2, 1)
+
+        await self.session.execute(
+            sa.insert(Answer),
+            [self.answer(2, is_final=True, is_correct=True)],
+        )
+        await self.assertProgress(3, 2)
+
+        await self.session.execute(
+            sa.update(Answer)
+            .where(Answer.question_id == self.questions[0].id)
+            .values(is_correct=False, answer_index=1)
+        )
+        await self.assertProgress(3, 1)
+
+        await self.session.execute(
+            sa.delete(Answer).where(Answer.question_id == self.questions[2].id)
+        )
+        await self.assertProgress(2, 0)
+
+    async def test_updates_that_change_no_counts(self):
+        await self.session.execute(
+            sa.insert(Answer), [self.answer(0, is_final=True, is_correct=True)]
+        )
+        await self.session.execute(
+            sa.update(Answer)
+            .where(Answer.quiz_attempt_id == self.attempt.id)
+            .values(answer_index=2)
+        )
+        await self.assertProgress(1, 1)
+
+    async def test_moving_answers_between_questions(self):
+        await self.session.execute(
+            sa.insert(Answer), [self.answer(0), self.answer(1)]
+        )
+        await self.session.execute(
+            sa.update(Answer)
+            .where(Answer.question_id == self.questions[1].id)
+            .values(question_id=self.questions[0].id, answered_by_id=self.account.id)
+        )
+        await self.assertProgress(1, None)
@@ -0,0 +1,186 @@
+"""
+Tests for splitting search metrics periods into rollup and live parts.
+
+Run from the project root:
+
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import datetime
+import typing
+import unittest
+
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BooleanClauseList, Grouping
+
+import tests.environment  # noqa: F401
+from apps.search.crud import SearchMetricsPeriod, split_search_metrics_period
+
+
+def utc(*args: int) -> datetime.datetime:
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+def matches(clause, timestamp: datetime.datetime) -> bool:
+    """Evaluate a filter on `SearchRecord.timestamp` for the given timestamp."""
+    if isinstance(clause, Grouping):
+        return matches(clause.element, timestamp)
+    if isinstance(clause, BooleanClauseList):
+        results = [matches(part, timestamp) for part in clause.clauses]
+        return all(results) if clause.operator is operators.and_ else any(results)
+    return clause.operator(timestamp, clause.right.value)
+
+
+def rollups_covering(period: SearchMetricsPeriod, timestamp: datetime.datetime) -> int:
+    return sum(
+        (start is None or start <= timestamp) and timestamp < end
+        for _, start, end in period.rollup_ranges
+    )
+
+
+FAR_FUTURE = utc(2100, 1, 1)
+
+
+class SplitSearchMetricsPeriodTests(unittest.TestCase):
+    def assertCoveredOnce(
+        self,
+        period: SearchMetricsPeriod,
+        timestamp_lte: datetime.datetime,
+        timestamp_gte: typing.Optional[datetime.datetime] = None,
+        since: typing.Optional[datetime.datetime] = None,
+    ) -> None:
+        """
+        Check that every timestamp in the period is accounted for exactly once,
+        by either the live filter or a rollup, and none outside it are.
+
+        Timestamps are sampled every 15 minutes (and just before), from two hours
+        before the start of the period (or `since`) to two hours after its end.
+        """
+        timestamp = (since or timestamp_gte) - datetime.timedelta(hours=2)
+        while timestamp <= timestamp_lte + datetime.timedelta(hours=2):
+            for offset in (datetime.timedelta(0), datetime.timedelta(microseconds=1)):
+                moment = timestamp - offset
+                expected = int(
+                    (timestamp_gte is None or timestamp_gte <= moment)
+                    and moment <= timestamp_lte
+                )
+                covered = matches(period.live_filter, moment) + rollups_covering(
+                    period, moment
+                )
+                with self.subTest(timestamp=moment):
+                    self.assertEqual(covered, expected)
+            timestamp += datetime.timedelta(minutes=15)
+
+    def test_without_rollups_everything_is_live(self):
+        gte, lte = utc(2024, 1, 1, 10, 15), utc(2024, 1, 3, 12, 45)
+        period = split_search_metrics_period({"hour": None, "day": None}, lte, gte)
+
+        self.assertEqual(period.rollup_ranges, [])
+        self.assertCoveredOnce(period, lte, gte)
+
+    def test_period_within_an_hour_is_live(self):
+        gte, lte = utc(2024, 1, 1, 10, 15), utc(2024, 1, 1, 10, 45)
+        period = split_search_metrics_period(
+            {"hour": FAR_FUTURE, "day": FAR_FUTURE}, lte, gte
+        )
+
+        self.assertEqual(period.rollup_ranges, [])
+        self.assertCoveredOnce(period, lte, gte)
+
+    def test_whole_hours(self):
+        gte, lte = utc(2024, 1, 1, 10), utc(2024, 1, 1, 13)
+        watermarks = {"hour": FAR_FUTURE, "day": None}
+        period = split_search_metrics_period(watermarks, lte, gte)
+
+        self.assertEqual(period.rollup_ranges, [("hour", gte, lte)])
+        # The end of the period is inclusive, so it is live
+        self.assertTrue(matches(period.live_filter, lte))
+        self.assertFalse(matches(period.live_filter, gte))
+        self.assertCoveredOnce(period, lte, gte)
+
+    def test_partial_hours_at_edges_are_live(self):
+        gte, lte = utc(2024, 1, 1, 10, 15), utc(2024, 1, 1, 13, 30)
+        watermarks = {"hour": FAR_FUTURE, "day": None}
+        period = split_search_metrics_period(watermarks, lte, gte)
+
+        self.assertEqual(
+            period.rollup_ranges, [("hour", utc(2024, 1, 1, 11), utc(2024, 1, 1, 13))]
+        )
+        self.assertTrue(matches(period.live_filter, utc(2024, 1, 1, 10, 30)))
+        self.assertTrue(matches(period.live_filter, utc(2024, 1, 1, 13, 15)))
+        self.assertFalse(matches(period.live_filter, utc(2024, 1, 1, 11, 30)))
+        self.assertCoveredOnce(period, lte, gte)
+
+    def test_time_after_hourly_watermark_is_live(self):
+        gte, lte = utc(2024, 1, 1, 10), utc(2024, 1, 1, 15, 30)
+        watermark = utc(2024, 1, 1, 12)
+        period = split_search_metrics_period({"hour": watermark, "day": None}, lte, gte)
+
+        self.assertEqual(period.rollup_ranges, [("hour", gte, watermark)])
+        self.assertTrue(matches(period.live_filter, watermark))
+        self.assertCoveredOnce(period, lte, gte)
+
+    def test_whole_days_use_daily_rollups(self):
+        gte, lte = utc(2024, 1, 1, 22, 30), utc(2024, 1, 4, 1, 30)
+        period = split_search_metrics_period(
+            {"hour": FAR_FUTURE, "day": FAR_FUTURE}, lte, gte
+        )
+
+        self.assertEqual(
+            period.rollup_ranges,
+            [
+                ("day", utc(2024, 1, 2), utc(2024, 1, 4)),
+                ("hour", utc(2024, 1, 1, 23), utc(2024, 1, 2)),
+                ("hour", utc(2024, 1, 4), utc(2024, 1, 4, 1)),
+            ],
+        )
+        self.assertCoveredOnce(period, lte, gte)
+
+    def test_hours_after_daily_watermark_use_hourly_rollups(self):
+        gte, lte = utc(2024, 1, 1, 22, 30), utc(2024, 1, 4, 1, 30)
+        period = split_search_metrics_period(
+            {"hour": FAR_FUTURE, "day": utc(2024, 1, 3)}, lte, gte
+        )
+
+        self.assertEqual(
+            period.rollup_ranges,
+            [
+                ("day", utc(2024, 1, 2), utc(2024, 1, 3)),
+                ("hour", utc(2024, 1, 1, 23), utc(2024, 1, 2)),
+                ("hour", utc(2024, 1, 3), utc(2024, 1, 4, 1)),
+            ],
+        )
+        self.assertCoveredOnce(period, lte, gte)
+
+    def test_open_start(self):
+        lte = utc(2024, 1, 4, 1, 30)
+        period = split_search_metrics_period(
+            {"hour": FAR_FUTURE, "day": FAR_FUTURE}, lte
+        )
+
+        self.assertEqual(
+            period.rollup_ranges,
+            [
+                ("day", None, utc(2024, 1, 4)),
+                ("hour", utc(2024, 1, 4), utc(2024, 1, 4, 1)),
+            ],
+        )
+        self.assertCoveredOnce(period, lte, since=utc(2024, 1, 2))
+
+    def test_boundaries_are_in_utc(self):
+        tz = datetime.timezone(datetime.timedelta(hours=1, minutes=30))
+        gte = datetime.datetime(2024, 1, 2, 0, 0, tzinfo=tz)  # 2024-01-01 22:30 UTC
+        lte = datetime.datetime(2024, 1, 4, 3, 0, tzinfo=tz)  # 2024-01-04 01:30 UTC
+        period = split_search_metrics_period(
+            {"hour": FAR_FUTURE, "day": FAR_FUTURE}, lte, gte
+        )
+
+        self.assertEqual(
+            period.rollup_ranges,
+            [
+                ("day", utc(2024, 1, 2), utc(2024, 1, 4)),
+                ("hour", utc(2024, 1, 1, 23), utc(2024, 1, 2)),
+                ("hour", utc(2024, 1, 4), utc(2024, 1, 4, 1)),
+            ],
+        )
+        self.assertCoveredOnce(period, lte, gte)
@@ -0,0 +1,136 @@
+"""
+Tests that lean term rows are serialized exactly like `TermSchema` serializes terms.
+
+Run from the project root:
+
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import datetime
+import unittest
+
+import tests.environment  # noqa: F401
+from apps.search.models import Term, TermSource, Topic
+from apps.search.schemas import TermSchema, term_serializer
+
+
+def utc(*args: int) -> datetime.datetime:
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+class TermSerializerTests(unittest.TestCase):
+    def test_lean_row_matches_schema(self):
+        source = TermSource(
+            uid="petriz_term_source_1",
+            name="Biology Dictionary",
+            url="https://example.com",
+            description="A dictionary of biology terms",
+            created_at=utc(2024, 1, 2, 3, 4, 5, 123400),
+            updated_at=utc(2024, 1, 2, 3, 4, 5),
+        )
+        topic = Topic(
+            uid="petriz_topic_1",
+            name="Cells",
+            description="Cell biology",
+            created_at=utc(2024, 2, 3, 4, 5, 6, 500000),
+            updated_at=utc(2024, 2, 3, 4, 5, 6, 500000),
+        )
+        relative = Term(
+            uid="petriz_term_2",
+            name="Nucleus",
+            definition="The control center of the cell",
+            grammatical_label="noun",
+            verified=True,
+            created_at=utc(2024, 3, 4, 5, 6, 7),
+            updated_at=utc(2024, 3, 4, 5, 6, 7, 1),
+        )
+        term = Term(
+            uid="petriz_term_1",
+            name="Cell",
+            definition="The basic unit of life",
+            grammatical_label="noun",
+            verified=True,
+            created_at=utc(2024, 4, 5, 6, 7, 8, 90),
+            updated_at=utc(2024, 4, 5, 6, 7, 8, 90),
+            source=source,
+            topics={topic},
+            relatives={relative},
+        )
+        # As selected by `crud.term_projection`. Postgres renders timestamps
+        # in JSON aggregates as strings, in the session's time zone.
+        row = {
+            "id": 1,
+            "uid": term.uid,
+            "name": term.name,
+            "definition": term.definition,
+            "grammatical_label": term.grammatical_label,
+            "verified": term.verified,
+            "created_at": term.created_at,
+            "updated_at": term.updated_at,
+            "source": {
+                "uid": source.uid,
+                "name": source.name,
+                "url": source.url,
+                "description": source.description,
+                "created_at": "2024-01-02T04:04:05.1234+01:00",
+                "updated_at": "2024-01-02T04:04:05+01:00",
+            },
+            "topics": [
+                {
+                    "uid": topic.uid,
+                    "name": topic.name,
+                    "description": topic.description,
+                    "created_at": "2024-02-03T04:05:06.5+00:00",
+                    "updated_at": "2024-02-03T04:05:06.5+00:00",
+                }
+            ],
+            "relatives": [
+                {
+                    "uid": relative.uid,
+                    "name": relative.name,
+                    "definition": relative.definition,
+                    "grammatical_label": relative.grammatical_label,
+                    "verified": relative.verified,
+                    "created_at": "2024-03-04T05:06:07+00:00",
+                    "updated_at": "2024-03-04T05:06:07.000001+00:00",
+                }
+            ],
+        }
+
+        expected = TermSchema.model_validate(term).model_dump(
+            mode="json", by_alias=True
+        )
+        self.assertEqual(term_serializer(row), expected)
+
+    def test_lean_row_without_source(self):
+        term = Term(
+            uid="petriz_term_3",
+            name="Tissue",
+            definition="A group of similar cells",
+            verified=False,
+            created_at=utc(2024, 5, 6, 7, 8, 9),
+            updated_at=None,
+            source=None,
+        )
+        row = {
+            "id": 3,
+            "uid": term.uid,
+            "name": term.name,
+            "definition": term.definition,
+            "grammatical_label": None,
+            "verified": term.verified,
+            "created_at": term.created_at,
+            "updated_at": None,
+            "source": None,
+            "topics": [],
+            "relatives": [],
+        }
+
+        expected = TermSchema.model_validate(term).model_dump(
+            mode="json", by_alias=True
+        )
+        self.assertEqual(term_serializer(row), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
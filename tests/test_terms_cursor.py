@@ -0,0 +1,88 @@
+"""
+Tests for encoding, decoding and validating terms search pagination cursors.
+
+Run from the project root:
+
+    uv run python -m unittest discover -s tests -t .
+"""
+
+import base64
+import unittest
+
+import fastapi
+
+import tests.environment  # noqa: F401
+from api.pagination import decode_cursor, encode_cursor
+from apps.search.query import TermCursor, parse_terms_cursor_query
+from helpers.fastapi.requests.query import ParamNotSet
+
+
+def raw_cursor(payload: bytes) -> str:
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+class CursorEncodingTests(unittest.TestCase):
+    def test_round_trip(self):
+        values = [0.0607927, "Photosynthesis", 42]
+        cursor = encode_cursor(values)
+
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), values)
+
+    def test_round_trip_keeps_null_rank_and_unicode_names(self):
+        values = [None, "Ångström — ß", 1]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+    def test_decode_rejects_malformed_cursors(self):
+        malformed = ("not base64!", raw_cursor(b"{not json"), raw_cursor(b'{"a": 1}'))
+        for cursor in malformed:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    decode_cursor(cursor)
+
+
+class TermsCursorQueryTests(unittest.TestCase):
+    def assertRejected(self, cursor: str) -> None:
+        with self.assertRaises(fastapi.HTTPException) as context:
+            parse_terms_cursor_query(cursor)
+        self.assertEqual(context.exception.status_code, 422)
+
+    def test_missing_cursor_means_offset_pagination(self):
+        self.assertIs(parse_terms_cursor_query(None), ParamNotSet)
+
+    def test_empty_cursor_means_first_page(self):
+        self.assertIsNone(parse_terms_cursor_query(""))
+        self.assertIsNone(parse_terms_cursor_query("   "))
+
+    def test_valid_cursor(self):
+        cursor = encode_cursor(TermCursor(rank=0.5, name="Cell", id=7))
+        self.assertEqual(
+            parse_terms_cursor_query(cursor), TermCursor(rank=0.5, name="Cell", id=7)
+        )
+        cursor = encode_cursor(TermCursor(rank=None, name="Cell", id=7))
+        self.assertEqual(
+            parse_terms_cursor_query(cursor), TermCursor(rank=None, name="Cell", id=7)
+        )
+
+    def test_rejects_malformed_cursor(self):
+        self.assertRejected("not base64!")
+        self.assertRejected(raw_cursor(b"[0.5, 'Cell', 7]"))
+        self.assertRejected(raw_cursor(b'{"rank": 0.5, "name": "Cell", "id": 7}'))
+
+    def test_rejects_forged_cursors(self):
+        forged = [
+            [0.5, "Cell"],
+            [0.5, "Cell", 7, 8],
+            ["0.5", "Cell", 7],
+            [True, "Cell", 7],
+            [0.5, 1, 7],
+            [0.5, "Cell\x00", 7],
+            [0.5, "Cell", "7"],
+            [0.5, "Cell", 7.0],
+            [0.5, "Cell", False],
+            [0.5, "Cell", 2**31],
+            [0.5, "Cell", -(2**31) - 1],
+        ]
+        for values in forged:
+            with self.subTest(values=values):
+                self.assertRejected(encode_cursor(values))